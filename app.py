@@ -6,6 +6,23 @@ from tkinter import messagebox, simpledialog
 class PlanificadorRomanoApp:
     """Aplicación principal del Planificador Imperial Romano"""
     
+    # Segundos entre volcados de recursos.json (escritura diferida)
+    INTERVALO_GUARDADO_RECURSOS = 2.0
+    
+    RECURSOS_INICIALES = [
+        "Legionarios", 
+        "Centuriones", 
+        "Soldados de Caballería",
+        "Monedas de Oro", 
+        "Armaduras",
+        "Espadas", 
+        "Escudos", 
+        "Catapultas", 
+        "Ballestas",
+        "Provisiones", 
+        "Caballos"
+    ]
+    
     def __init__(self):
         
         # Configurar directorio actual
@@ -110,46 +127,36 @@ class PlanificadorRomanoApp:
     
     def _inicializar_componentes(self):
         """Inicializa todos los componentes de la aplicación"""
-        # Crear calendario con directorio de datos
-        self.calendario = self.Calendario(directorio_datos=self.directorio_datos)
+        # Eventos y recursos se cargan en hilos mientras se reproduce la
+        # introducción; el primer acceso a los datos espera a que la carga
+        # termine. Los recursos van primero: al terminar de cargar, el
+        # calendario les pasa las fechas de los eventos que los usan
+        self._inicializar_recursos(en_segundo_plano=True)
         
-        # Inicializar recursos
-        self._inicializar_recursos()
+        # Crear calendario con directorio de datos
+        self.calendario = self.Calendario(directorio_datos=self.directorio_datos,
+                                          carga_diferida=True)
         
         # Variables de estado
         self.ventana_actual = None
     
-    def _inicializar_recursos(self):
+    def _inicializar_recursos(self, en_segundo_plano=False):
         """Inicializa recursos por defecto"""
         if self.Recurso:
             try:
-                # Inicializar recursos (cargará desde archivo si existe)
-                self.Recurso.inicializar(self.directorio_datos)
+                # Inicializar recursos (cargará desde archivo si existe; si no
+                # hay ninguno, se crean los iniciales)
+                self.Recurso.inicializar(
+                    self.directorio_datos,
+                    recursos_iniciales=self.RECURSOS_INICIALES,
+                    en_segundo_plano=en_segundo_plano
+                )
                 
-                # Si no hay recursos, crear los iniciales
-                if len(self.Recurso.obtener_todos()) == 0:
-                    recursos_iniciales = [
-                        "Legionarios", 
-                        "Centuriones", 
-                        "Soldados de Caballería",
-                        "Monedas de Oro", 
-                        "Armaduras",
-                        "Espadas", 
-                        "Escudos", 
-                        "Catapultas", 
-                        "Ballestas",
-                        "Provisiones", 
-                        "Caballos"
-                    ]
-                    
-                    for recurso in recursos_iniciales:
-                        self.Recurso.agregar_recurso(recurso)
-                    
-                    print(f" {len(recursos_iniciales)} recursos iniciales creados")
-                else:
-                    print(f" {len(self.Recurso.obtener_todos())} recursos cargados desde archivo")
-                    
-                print(f"   Recursos disponibles: {len(self.Recurso.obtener_disponibles())}/{len(self.Recurso.obtener_todos())}")
+                if not en_segundo_plano:
+                    print(f"   Recursos disponibles: {len(self.Recurso.obtener_disponibles())}/{len(self.Recurso.obtener_todos())}")
+                
+                # Guardar recursos.json desde un hilo en lugar del hilo de Tk
+                self.Recurso.activar_escritura_diferida(self.INTERVALO_GUARDADO_RECURSOS)
                 
             except Exception as e:
                 print(f" Error inicializando recursos: {e}")
@@ -378,10 +385,10 @@ class PlanificadorRomanoApp:
                 try:
                     resultado = self.calendario.importar_datos(origen)
                     if resultado:
-                        # Recargar datos
-                        self.calendario.cargar_eventos()
+                        # Recargar datos (recursos primero: el calendario les pasa las fechas)
                         if self.Recurso:
                             self.Recurso.inicializar(self.directorio_datos)
+                        self.calendario.cargar_eventos()
                         
                         messagebox.showinfo(
                             "Importación exitosa",
@@ -411,11 +418,14 @@ class PlanificadorRomanoApp:
         
         if respuesta:
             try:
+                # Que la escritura diferida no recree recursos.json tras borrarlo
+                if self.Recurso and hasattr(self.Recurso, 'vaciar'):
+                    self.Recurso.vaciar()
+                
                 archivos_eliminados = self.calendario.limpiar_datos()
                 
-                # Reinicializar recursos
+                # Reinicializar recursos (la escritura diferida ya activa sigue en su hilo)
                 if self.Recurso:
-                    self.Recurso.inicializar(self.directorio_datos)
                     self._inicializar_recursos()
                 
                 messagebox.showinfo(
@@ -454,7 +464,14 @@ class PlanificadorRomanoApp:
         try:
             self.calendario.guardar_eventos()
             
-            if self.Recurso and hasattr(self.Recurso, 'guardar_estado'):
+            if self.Recurso and hasattr(self.Recurso, 'detener_escritura_diferida'):
+                # Volcar lo que el hilo de escritura diferida tenga pendiente
+                self.Recurso.detener_escritura_diferida()
+                metricas = self.Recurso.estadisticas_escritura()
+                print(f"💾 Recursos: {metricas['escrituras']} escrituras para "
+                      f"{metricas['solicitudes']} cambios "
+                      f"(media {metricas['latencia_media_ms']:.1f} ms)")
+            elif self.Recurso and hasattr(self.Recurso, 'guardar_estado'):
                 self.Recurso.guardar_estado()
                 
             print("💾 Datos imperiales guardados correctamente")
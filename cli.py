@@ -0,0 +1,282 @@
+# cli.py - Línea de comandos del Planificador Imperial (sin interfaz gráfica)
+#
+# No importa tkinter ni el paquete pantallas: arranca en milisegundos y sirve
+# para tareas programadas o servidores sin pantalla. Los resultados se
+# escriben en stdout como JSON por líneas (un objeto por línea, en cuanto
+# se obtiene); los mensajes informativos de los módulos van a stderr.
+#
+#   python cli.py listar
+#   python cli.py agregar eventos.json          (arreglo JSON o JSON por líneas)
+#   python cli.py eliminar "Sesión del Senado"
+#   python cli.py eliminar --id-evento 3f2a...   (por id: los nombres pueden repetirse)
+#   python cli.py buscar --recurso legion --desde 01/03/2024 --hasta 31/03/2024
+#   python cli.py informe
+#   python cli.py validar                       (eventos que incumplen restricciones.json)
+#   python cli.py exportar /ruta/copia
+import argparse
+import json
+import os
+import sys
+
+DIR_ACTUAL = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DIR_ACTUAL)
+
+from modelos.evento import Evento
+from modelos.recurso import Recurso
+from nucleo.backend import iterar_arreglo_json
+from nucleo.calendario import Calendario
+from nucleo.persistencia import FORMATOS, Persistencia
+from nucleo.servicio import buscar_eventos
+
+
+def escribir(salida, objeto):
+    salida.write(json.dumps(objeto, ensure_ascii=False))
+    salida.write("\n")
+
+
+def escribir_eventos(salida, eventos):
+    cantidad = 0
+    for evento in eventos:
+        escribir(salida, evento.a_diccionario())
+        cantidad += 1
+    salida.flush()
+    return cantidad
+
+
+def leer_objetos(ruta):
+    """Objetos de un arreglo JSON o de JSON por líneas ('-' para stdin)"""
+    if ruta != "-":
+        with open(ruta, 'r', encoding='utf-8') as f:
+            primero = f.read(1024).lstrip()[:1]
+        if primero == "[":
+            # Arreglo JSON: se recorre sin cargarlo entero
+            yield from iterar_arreglo_json(ruta)
+            return
+        lineas = open(ruta, 'r', encoding='utf-8')
+    else:
+        lineas = sys.stdin
+
+    try:
+        texto = None
+        for linea in lineas:
+            if texto is None and linea.lstrip().startswith("["):
+                texto = ""
+            if texto is not None:
+                texto += linea
+            elif linea.strip():
+                yield json.loads(linea)
+        if texto is not None:
+            yield from json.loads(texto)
+    finally:
+        if lineas is not sys.stdin:
+            lineas.close()
+
+
+def abrir_calendario(args, bajo_demanda=False):
+    Recurso.inicializar(args.datos)
+    return Calendario(directorio_datos=args.datos, bajo_demanda=bajo_demanda)
+
+
+# SUBCOMANDOS
+
+def cmd_listar(args, salida):
+    # Se lee del almacenamiento evento a evento, sin construir el calendario
+    persistencia = Persistencia(directorio_datos=args.datos)
+    try:
+        escribir_eventos(salida, persistencia.iterar_eventos())
+    finally:
+        persistencia.cerrar()
+    return 0
+
+
+def cmd_agregar(args, salida):
+    calendario = abrir_calendario(args)
+    eventos = [Evento.desde_diccionario(datos, estricto=True) for datos in leer_objetos(args.archivo)]
+
+    # Igual que la interfaz: guardar y marcar recursos en una sola transacción
+    # (primero el alta, que puede darle otro id si el suyo ya está en uso)
+    with calendario.lote():
+        for evento in eventos:
+            calendario.agregar_evento(evento)
+            for recurso in evento.recursos:
+                Recurso.marcar_como_usado(recurso, evento)
+
+    escribir(salida, {'agregados': len(eventos), 'total_eventos': calendario.total_eventos()})
+    return 0
+
+
+def cmd_eliminar(args, salida):
+    nombres = list(args.nombres)
+    ids = list(args.ids or [])
+    if args.archivo:
+        for datos in leer_objetos(args.archivo):
+            # Peticiones del servicio ('id_evento') o eventos tal como los emite `listar` ('id')
+            if isinstance(datos, dict) and (datos.get('id_evento') or datos.get('id')):
+                ids.append(datos.get('id_evento') or datos['id'])
+            else:
+                nombres.append(datos['nombre'] if isinstance(datos, dict) else datos)
+    if not nombres and not ids:
+        print("⚠️ No se indicó ningún evento para eliminar")
+        return 1
+
+    calendario = abrir_calendario(args)
+    with calendario.lote():
+        eliminados = calendario.eliminar_eventos_por_id(ids) + calendario.eliminar_eventos(nombres)
+        for evento in eliminados:
+            for recurso in evento.recursos:
+                Recurso.liberar_recurso(recurso, evento)
+
+    escribir_eventos(salida, eliminados)
+    print(f"🗑️ {len(eliminados)} de {len(nombres) + len(ids)} eventos eliminados")
+    return 0 if eliminados else 1
+
+
+def cmd_buscar(args, salida):
+    # Con sqlite o particionado, el primer filtro lo resuelve el almacenamiento
+    # (solo se leen los fragmentos que se solapan) sin cargar todos los eventos
+    calendario = abrir_calendario(args, bajo_demanda=True)
+    escribir_eventos(salida, buscar_eventos(calendario, vars(args)))
+    return 0
+
+
+def cmd_informe(args, salida):
+    calendario = abrir_calendario(args)
+    escribir(salida, calendario.generar_informe())
+    return 0
+
+
+def cmd_validar(args, salida):
+    calendario = abrir_calendario(args)
+    violaciones = calendario.validar_restricciones()
+    for evento, mensaje in violaciones:
+        escribir(salida, {'evento': evento.nombre, 'error': mensaje})
+    print(f"⚖️ {len(violaciones)} incumplimientos de {len(calendario.restricciones)} restricciones")
+    return 1 if violaciones else 0
+
+
+def cmd_recursos(args, salida):
+    Recurso.inicializar(args.datos)
+    for nombre in Recurso.obtener_todos():
+        escribir(salida, {
+            'nombre': nombre,
+            'disponible': Recurso.esta_disponible(nombre),
+            'eventos': Recurso.eventos_de_recurso(nombre)
+        })
+    return 0
+
+
+def cmd_exportar(args, salida):
+    persistencia = Persistencia(directorio_datos=args.datos)
+    try:
+        archivos = persistencia.exportar_datos(args.destino)
+    finally:
+        persistencia.cerrar()
+    escribir(salida, {'destino': args.destino, 'archivos': archivos})
+    return 0 if archivos else 1
+
+
+def cmd_importar(args, salida):
+    persistencia = Persistencia(directorio_datos=args.datos)
+    try:
+        archivos = persistencia.importar_datos(args.origen)
+    finally:
+        persistencia.cerrar()
+    escribir(salida, {'origen': args.origen, 'archivos': archivos})
+    return 0 if archivos else 1
+
+
+def cmd_convertir(args, salida):
+    persistencia = Persistencia(directorio_datos=args.datos)
+    try:
+        convertido = persistencia.convertir_formato(args.formato)
+    finally:
+        persistencia.cerrar()
+    escribir(salida, {'formato': args.formato, 'convertido': convertido})
+    return 0 if convertido else 1
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Planificador Imperial Romano desde la línea de comandos (salida JSON por líneas)"
+    )
+    parser.add_argument("--datos", default=os.path.join(DIR_ACTUAL, "datos"),
+                        help="directorio de datos (por defecto, datos/ junto al programa)")
+    subparsers = parser.add_subparsers(dest="comando")
+    subparsers.required = True
+
+    sub = subparsers.add_parser("listar", help="emite todos los eventos guardados")
+    sub.set_defaults(funcion=cmd_listar)
+
+    sub = subparsers.add_parser("agregar", help="agrega eventos desde un archivo")
+    sub.add_argument("archivo", help="arreglo JSON o JSON por líneas ('-' para stdin)")
+    sub.set_defaults(funcion=cmd_agregar)
+
+    sub = subparsers.add_parser("eliminar", help="elimina eventos por nombre o por id")
+    sub.add_argument("nombres", nargs="*", help="nombres de los eventos")
+    sub.add_argument("--id-evento", "--id", dest="ids", action="append", metavar="ID",
+                     help="id de un evento (repetible)")
+    sub.add_argument("--archivo", help="archivo con nombres (JSON por líneas, texto JSON u objetos con "
+                                       "'id_evento', 'id' o 'nombre')")
+    sub.set_defaults(funcion=cmd_eliminar)
+
+    sub = subparsers.add_parser("buscar", help="busca eventos (los filtros se combinan)")
+    sub.add_argument("--nombre", help="texto contenido en el nombre")
+    sub.add_argument("--recurso", help="texto contenido en algún recurso")
+    sub.add_argument("--fecha", help="eventos activos en la fecha DD/MM/AAAA")
+    sub.add_argument("--desde", help="inicio del rango DD/MM/AAAA")
+    sub.add_argument("--hasta", help="fin del rango DD/MM/AAAA")
+    sub.add_argument("--proximos", type=int, metavar="DIAS", help="eventos que empiezan en los próximos días")
+    sub.add_argument("--en-curso", action="store_true", help="eventos en curso")
+    sub.add_argument("--pasados", action="store_true", help="eventos terminados")
+    sub.add_argument("--sin-recursos", action="store_true", help="eventos sin recursos")
+    sub.add_argument("--orden", choices=("fecha", "nombre"), help="ordenar el resultado")
+    sub.add_argument("--limite", type=int, help="máximo de eventos a emitir")
+    sub.set_defaults(funcion=cmd_buscar)
+
+    sub = subparsers.add_parser("informe", help="informe completo en un objeto JSON")
+    sub.set_defaults(funcion=cmd_informe)
+
+    sub = subparsers.add_parser("validar", help="comprueba todos los eventos contra restricciones.json")
+    sub.set_defaults(funcion=cmd_validar)
+
+    sub = subparsers.add_parser("recursos", help="estado de los recursos")
+    sub.set_defaults(funcion=cmd_recursos)
+
+    sub = subparsers.add_parser("exportar", help="copia los datos a otro directorio")
+    sub.add_argument("destino")
+    sub.set_defaults(funcion=cmd_exportar)
+
+    sub = subparsers.add_parser("importar", help="importa los datos de otro directorio")
+    sub.add_argument("origen")
+    sub.set_defaults(funcion=cmd_importar)
+
+    sub = subparsers.add_parser("convertir", help="cambia el formato de almacenamiento")
+    sub.add_argument("formato", choices=FORMATOS)
+    sub.set_defaults(funcion=cmd_convertir)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    # stdout queda reservado para el JSON; los print() de los módulos van a stderr
+    salida = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        return args.funcion(args, salida)
+    except BrokenPipeError:
+        return 0  # p. ej. `cli.py listar | head`
+    except KeyError as e:
+        print(f"❌ Falta el campo {e}")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        sys.stdout = salida
+
+
+if __name__ == "__main__":
+    sys.exit(main())
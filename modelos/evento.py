@@ -1,8 +1,49 @@
 # modelos/evento.py
+import re
+import uuid
+from datetime import date, datetime
+from functools import lru_cache
+
+from modelos.recurso import Recurso
+
+FORMATO_FECHA = "%d/%m/%Y"
+
+# DD/MM/AAAA (día y mes de una o dos cifras, como acepta strptime)
+_PATRON_FECHA = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+@lru_cache(maxsize=8192)
+def _ordinal(fecha):
+    coincidencia = _PATRON_FECHA.fullmatch(fecha)
+    try:
+        if coincidencia:
+            dia, mes, anio = map(int, coincidencia.groups())
+            return date(anio, mes, dia).toordinal()
+        # Variantes raras que strptime también admite (p. ej. " 5/03/2024")
+        return datetime.strptime(fecha, FORMATO_FECHA).toordinal()
+    except ValueError:
+        return None
+
+
+def fecha_a_ordinal(fecha):
+    """Convierte una fecha DD/MM/AAAA en su ordinal de día, o None si no es válida"""
+    if not isinstance(fecha, str):
+        return None
+    return _ordinal(fecha)
+
+
+def nuevo_id():
+    """Identificador único para un evento nuevo"""
+    return uuid.uuid4().hex
+
+
 class Evento:
     """Clase que representa un evento en el calendario romano"""
     
-    def __init__(self, nombre, inicio, fin, recursos=None):
+    # Sin __dict__ por instancia: los calendarios grandes tienen muchos eventos
+    __slots__ = ('id', 'nombre', '_inicio', '_fin', 'inicio_ord', 'fin_ord', '_recursos', 'mascara_recursos')
+    
+    def __init__(self, nombre, inicio, fin, recursos=None, estricto=False, id=None):
         """
         Inicializa un nuevo evento
         
@@ -11,11 +52,64 @@ class Evento:
             inicio (str): Fecha de inicio (DD/MM/AAAA)
             fin (str): Fecha de fin (DD/MM/AAAA)
             recursos (list): Lista de recursos asignados (opcional)
+            estricto (bool): Si es True, lanza ValueError si una fecha no es
+                válida o el fin es anterior al inicio
+            id (str): Identificador guardado del evento; si no se indica se
+                genera uno nuevo. Los nombres pueden repetirse, el id no.
+        
+        Las fechas se analizan una sola vez: inicio_ord y fin_ord guardan su
+        ordinal de día (None si la fecha no es válida) y se recalculan al
+        asignar inicio o fin.
+        
+        Los recursos se guardan también como máscara de bits sobre los ids de
+        Recurso (mascara_recursos). La lista no debe modificarse directamente:
+        use agregar_recurso/quitar_recurso o asigne una lista nueva.
         """
+        self.id = id or nuevo_id()
         self.nombre = nombre
         self.inicio = inicio
         self.fin = fin
-        self.recursos = recursos if recursos else []
+        self.recursos = recursos
+        
+        if estricto:
+            self.validar()
+    
+    @property
+    def inicio(self):
+        return self._inicio
+    
+    @inicio.setter
+    def inicio(self, valor):
+        self._inicio = valor
+        self.inicio_ord = fecha_a_ordinal(valor)
+    
+    @property
+    def fin(self):
+        return self._fin
+    
+    @fin.setter
+    def fin(self, valor):
+        self._fin = valor
+        self.fin_ord = fecha_a_ordinal(valor)
+    
+    @property
+    def recursos(self):
+        return self._recursos
+    
+    @recursos.setter
+    def recursos(self, valor):
+        self._recursos = valor if valor else []
+        self.mascara_recursos = Recurso.mascara(self._recursos)
+    
+    def validar(self):
+        """Comprueba el formato de las fechas y que el fin no sea anterior al inicio"""
+        if self.inicio_ord is None:
+            raise ValueError(f"Fecha de inicio inválida: '{self.inicio}' (use DD/MM/AAAA)")
+        if self.fin_ord is None:
+            raise ValueError(f"Fecha de fin inválida: '{self.fin}' (use DD/MM/AAAA)")
+        if self.fin_ord < self.inicio_ord:
+            raise ValueError(f"La fecha de fin ({self.fin}) es anterior a la de inicio ({self.inicio})")
+        return True
     
     def __str__(self):
         """Representación en string del evento"""
@@ -24,18 +118,57 @@ class Evento:
     
     def agregar_recurso(self, recurso):
         """Agrega un recurso al evento"""
-        if recurso not in self.recursos:
-            self.recursos.append(recurso)
-            return True
-        return False
+        bit = Recurso.bit(recurso)
+        if self.mascara_recursos & bit:
+            return False
+        self._recursos.append(recurso)
+        self.mascara_recursos |= bit
+        return True
     
     def quitar_recurso(self, recurso):
         """Quita un recurso del evento"""
-        if recurso in self.recursos:
-            self.recursos.remove(recurso)
-            return True
-        return False
+        bit = Recurso.bit(recurso, registrar=False)
+        if not self.mascara_recursos & bit:
+            return False
+        self._recursos.remove(recurso)
+        if recurso not in self._recursos:
+            self.mascara_recursos &= ~bit
+        return True
+    
+    def usa_recurso(self, recurso):
+        """Verifica si el evento usa un recurso"""
+        return bool(self.mascara_recursos & Recurso.bit(recurso, registrar=False))
+    
+    def usa_alguno(self, mascara):
+        """Verifica si el evento usa alguno de los recursos de una máscara"""
+        return bool(self.mascara_recursos & mascara)
+    
+    def comparte_recursos(self, otro):
+        """Verifica si dos eventos tienen algún recurso en común"""
+        return bool(self.mascara_recursos & otro.mascara_recursos)
     
     def tiene_recursos(self):
         """Verifica si el evento tiene recursos asignados"""
-        return len(self.recursos) > 0# modelos/evento.py
+        return self.mascara_recursos != 0
+    
+    def a_diccionario(self):
+        """Convierte el evento en un diccionario serializable"""
+        return {
+            'id': self.id,
+            'nombre': self.nombre,
+            'inicio': self.inicio,
+            'fin': self.fin,
+            'recursos': self.recursos
+        }
+    
+    @classmethod
+    def desde_diccionario(cls, datos, estricto=False):
+        """Construye un evento a partir de su diccionario"""
+        return cls(
+            nombre=datos['nombre'],
+            inicio=datos['inicio'],
+            fin=datos['fin'],
+            recursos=datos.get('recursos', []),
+            estricto=estricto,
+            id=datos.get('id')
+        )
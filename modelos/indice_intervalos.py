@@ -0,0 +1,182 @@
+# modelos/indice_intervalos.py
+import random
+
+# Árbol de intervalos: un treap ordenado por (inicio, clave) en el que cada
+# nodo guarda además el mayor fin de su subárbol. Con ese dato, saber si algún
+# intervalo se solapa con [a, b] recorre un solo camino de la raíz a una hoja
+# (O(log n) esperado), y listar los solapados poda los subárboles que acaban
+# antes de a o empiezan después de b. Los extremos son cerrados y cualquier
+# valor comparable sirve (aquí, ordinales de día).
+#
+# Vive en modelos porque lo usan Recurso (ocupación por franjas) y los índices
+# del núcleo; modelos no depende de nucleo.
+
+
+class _Nodo:
+    __slots__ = ('clave', 'inicio', 'fin', 'prioridad', 'max_fin', 'izq', 'der')
+
+    def __init__(self, clave, inicio, fin):
+        self.clave = clave
+        self.inicio = inicio
+        self.fin = fin
+        self.prioridad = random.random()
+        self.max_fin = fin
+        self.izq = None
+        self.der = None
+
+    def actualizar(self):
+        max_fin = self.fin
+        if self.izq is not None and self.izq.max_fin > max_fin:
+            max_fin = self.izq.max_fin
+        if self.der is not None and self.der.max_fin > max_fin:
+            max_fin = self.der.max_fin
+        self.max_fin = max_fin
+
+
+def _dividir(nodo, orden):
+    """Parte el subárbol en (menores que orden, mayores o iguales)"""
+    if nodo is None:
+        return None, None
+    if (nodo.inicio, nodo.clave) < orden:
+        nodo.der, derecha = _dividir(nodo.der, orden)
+        nodo.actualizar()
+        return nodo, derecha
+    izquierda, nodo.izq = _dividir(nodo.izq, orden)
+    nodo.actualizar()
+    return izquierda, nodo
+
+
+def _unir(izquierda, derecha):
+    """Une dos subárboles en los que todo izquierda precede a todo derecha"""
+    if izquierda is None:
+        return derecha
+    if derecha is None:
+        return izquierda
+    if izquierda.prioridad > derecha.prioridad:
+        izquierda.der = _unir(izquierda.der, derecha)
+        izquierda.actualizar()
+        return izquierda
+    derecha.izq = _unir(izquierda, derecha.izq)
+    derecha.actualizar()
+    return derecha
+
+
+def _construir(ordenados, desde, hasta, profundidad, altura):
+    """Subárbol equilibrado con ordenados[desde:hasta] (ya ordenados por (inicio, clave))"""
+    if desde >= hasta:
+        return None
+    medio = (desde + hasta) // 2
+    clave, inicio, fin = ordenados[medio]
+    nodo = _Nodo(clave, inicio, fin)
+    # Prioridad dentro de la franja de su profundidad: siempre menor que la del padre
+    nodo.prioridad = 1.0 - (profundidad + random.random()) / altura
+    nodo.izq = _construir(ordenados, desde, medio, profundidad + 1, altura)
+    nodo.der = _construir(ordenados, medio + 1, hasta, profundidad + 1, altura)
+    nodo.actualizar()
+    return nodo
+
+
+def _quitar(nodo, orden):
+    if nodo is None:
+        return None
+    actual = (nodo.inicio, nodo.clave)
+    if orden < actual:
+        nodo.izq = _quitar(nodo.izq, orden)
+    elif actual < orden:
+        nodo.der = _quitar(nodo.der, orden)
+    else:
+        return _unir(nodo.izq, nodo.der)
+    nodo.actualizar()
+    return nodo
+
+
+class IndiceIntervalos:
+    """Conjunto de intervalos cerrados [inicio, fin] identificados por una clave única"""
+
+    def __init__(self, intervalos=None):
+        """
+        Args:
+            intervalos (iterable): Tuplas (clave, inicio, fin) iniciales (opcional)
+        """
+        self._raiz = None
+        self._intervalos = {}  # {clave: (inicio, fin)}
+        if intervalos:
+            self._construir(intervalos)
+
+    def _construir(self, intervalos):
+        # Carga inicial: ordenar una vez y montar el árbol equilibrado en O(n)
+        for clave, inicio, fin in intervalos:
+            self._intervalos[clave] = (inicio, fin) if inicio <= fin else (fin, inicio)
+        ordenados = sorted(
+            ((clave, inicio, fin) for clave, (inicio, fin) in self._intervalos.items()),
+            key=lambda intervalo: (intervalo[1], intervalo[0])
+        )
+        altura = len(ordenados).bit_length() + 1
+        self._raiz = _construir(ordenados, 0, len(ordenados), 0, altura)
+
+    def __len__(self):
+        return len(self._intervalos)
+
+    def __contains__(self, clave):
+        return clave in self._intervalos
+
+    def intervalo(self, clave):
+        """(inicio, fin) de una clave, o None si no está"""
+        return self._intervalos.get(clave)
+
+    def insertar(self, clave, inicio, fin):
+        """Agrega el intervalo de una clave (sustituye el anterior si ya estaba)"""
+        if fin < inicio:
+            inicio, fin = fin, inicio
+        if clave in self._intervalos:
+            self.eliminar(clave)
+        izquierda, derecha = _dividir(self._raiz, (inicio, clave))
+        self._raiz = _unir(_unir(izquierda, _Nodo(clave, inicio, fin)), derecha)
+        self._intervalos[clave] = (inicio, fin)
+
+    def eliminar(self, clave):
+        """Quita el intervalo de una clave; devuelve False si no estaba"""
+        intervalo = self._intervalos.pop(clave, None)
+        if intervalo is None:
+            return False
+        self._raiz = _quitar(self._raiz, (intervalo[0], clave))
+        return True
+
+    def solapa(self, inicio, fin):
+        """Indica si algún intervalo se solapa con [inicio, fin]"""
+        nodo = self._raiz
+        while nodo is not None and nodo.max_fin >= inicio:
+            if nodo.inicio <= fin and nodo.fin >= inicio:
+                return True
+            # Si algún intervalo de la izquierda llega hasta inicio y no se
+            # solapa, empieza después de fin, igual que todos los de la derecha
+            if nodo.izq is not None and nodo.izq.max_fin >= inicio:
+                nodo = nodo.izq
+            elif nodo.inicio > fin:
+                return False
+            else:
+                nodo = nodo.der
+        return False
+
+    def solapados(self, inicio, fin):
+        """Claves de los intervalos que se solapan con [inicio, fin], por orden de inicio"""
+        resultado = []
+        pendientes = []
+        nodo = self._raiz
+        # Recorrido en orden con poda, sin recursión
+        while pendientes or nodo is not None:
+            if nodo is not None:
+                if nodo.max_fin < inicio:
+                    nodo = None
+                    continue
+                pendientes.append(nodo)
+                nodo = nodo.izq
+                continue
+            nodo = pendientes.pop()
+            if nodo.inicio > fin:
+                # Este y todo lo que queda por la derecha empieza después de fin
+                break
+            if nodo.fin >= inicio:
+                resultado.append(nodo.clave)
+            nodo = nodo.der
+        return resultado
@@ -1,16 +1,71 @@
 # modelos/recurso.py
 import os
 import json
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from modelos.indice_intervalos import IndiceIntervalos
 
 class Recurso:
     """Clase para gestionar recursos con disponibilidad"""
     
     recursos_disponibles = []  # Lista global de recursos disponibles
-    recursos_usados = {}  # Diccionario: {nombre_recurso: [eventos_que_lo_usaron]}
+    # Los eventos se identifican por su id (Evento.id). Un recursos.json
+    # anterior a los ids guarda nombres: reconstruir_ocupacion los traduce,
+    # y mientras tanto liberar_recurso también los reconoce
+    recursos_usados = {}  # Diccionario: {nombre_recurso: {ids_de_eventos_que_lo_usan}}
+    eventos_recursos = {}  # Índice inverso: {id_evento: {recursos_que_usa}}
+    _libres = set()  # Recursos sin eventos, mantenido en cada cambio
+    _posiciones = {}  # {nombre_recurso: posición en recursos_disponibles}
+    
+    # Ocupación en el tiempo: un recurso solo está ocupado durante [inicio, fin]
+    # de los eventos que lo usan. Un uso cuyo intervalo no se conoce (evento sin
+    # fechas válidas, o aún no sincronizado con reconstruir_ocupacion) cuenta
+    # como ocupación permanente, igual que antes.
+    _ocupacion = {}  # {nombre_recurso: IndiceIntervalos de id_evento}
+    _intervalos = {}  # {id_evento: (inicio_ord, fin_ord)}
+    directorio_datos = "datos"  # Directorio usado por el guardado automático
+    
+    _nivel_lote = 0  # Profundidad de lotes abiertos con Recurso.lote()
+    _guardado_pendiente = False
+    
+    # Escritura diferida (write-behind): un hilo vuelca el estado sucio periódicamente
+    _cerrojo = threading.RLock()  # Protege el estado en memoria
+    _cerrojo_escritura = threading.Lock()  # Serializa las escrituras de recursos.json
+    _sucio = False
+    _hilo_escritura = None
+    _parar_escritura = None
+    intervalo_escritura = 2.0  # Segundos entre volcados
+    _carga = None  # Future de inicializar(en_segundo_plano=True) mientras está en curso
+    _hilo_carga = None
+    
+    # Registro de identificadores: cada nombre recibe un entero denso la primera
+    # vez que se ve y lo conserva durante todo el proceso (solo se añaden nombres).
+    # Los eventos guardan sus recursos como una máscara de bits sobre estos ids.
+    _ids = {}  # {nombre_recurso: id}
+    _nombres_por_id = []  # [nombre_recurso] indexado por id
+    _cerrojo_ids = threading.Lock()
+    _metricas = {
+        'solicitudes': 0,
+        'escrituras': 0,
+        'latencia_total_ms': 0.0,
+        'latencia_max_ms': 0.0,
+        'ultima_latencia_ms': 0.0
+    }
     
     @classmethod
-    def inicializar(cls, directorio_datos="datos"):
-        """Inicializa recursos desde archivo"""
+    def inicializar(cls, directorio_datos="datos", recursos_iniciales=None, en_segundo_plano=False):
+        """
+        Inicializa recursos desde archivo
+        
+        Args:
+            recursos_iniciales (list): Recursos a crear si no hay ninguno guardado
+            en_segundo_plano (bool): Carga en un hilo y devuelve un Future; los
+                métodos de la clase esperan a que termine antes de usar el estado
+        """
+        cls.esperar_carga()
+        cls.directorio_datos = directorio_datos
         archivo_recursos = os.path.join(directorio_datos, "recursos.json")
         
         # Asegurar que el directorio existe
@@ -18,89 +73,563 @@ class Recurso:
             os.makedirs(directorio_datos)
             print(f"📁 Directorio '{directorio_datos}' creado")
         
+        if not en_segundo_plano:
+            cls._cargar(archivo_recursos, recursos_iniciales)
+            return None
+        
+        carga = Future()
+        carga.set_running_or_notify_cancel()
+        
+        def cargar():
+            try:
+                cls._cargar(archivo_recursos, recursos_iniciales)
+            except BaseException as e:
+                carga.set_exception(e)
+            else:
+                carga.set_result(len(cls.recursos_disponibles))
+        
+        cls._carga = carga
+        cls._hilo_carga = threading.Thread(target=cargar, name="carga-recursos", daemon=True)
+        cls._hilo_carga.start()
+        return carga
+    
+    @classmethod
+    def _cargar(cls, archivo_recursos, recursos_iniciales):
         # Cargar recursos si el archivo existe
+        with cls._cerrojo:
+            cls._cargar_archivo(archivo_recursos)
+            cls._sucio = False
+            
+            if recursos_iniciales and not cls.recursos_disponibles:
+                for recurso in recursos_iniciales:
+                    cls._registrar_recurso(recurso)
+                print(f"🏛️ {len(cls.recursos_disponibles)} recursos iniciales creados")
+                crear_archivo = True
+            else:
+                crear_archivo = False
+            
+            # Ids estables para los recursos conocidos, en el orden del archivo
+            cls.mascara(cls.recursos_disponibles)
+        
+        if crear_archivo:
+            cls._programar_escritura()
+    
+    # IDENTIFICADORES Y MÁSCARAS
+    
+    @classmethod
+    def id_de(cls, nombre_recurso, registrar=True):
+        """Id entero del recurso (se asigna si es nuevo), o None si no está registrado y registrar=False"""
+        id_recurso = cls._ids.get(nombre_recurso)
+        if id_recurso is None and registrar:
+            with cls._cerrojo_ids:
+                id_recurso = cls._ids.get(nombre_recurso)
+                if id_recurso is None:
+                    id_recurso = len(cls._nombres_por_id)
+                    cls._nombres_por_id.append(nombre_recurso)
+                    cls._ids[nombre_recurso] = id_recurso
+        return id_recurso
+    
+    @classmethod
+    def bit(cls, nombre_recurso, registrar=True):
+        """Bit del recurso en las máscaras (0 si no está registrado y registrar=False)"""
+        id_recurso = cls.id_de(nombre_recurso, registrar)
+        return 0 if id_recurso is None else 1 << id_recurso
+    
+    @classmethod
+    def mascara(cls, nombres_recursos, registrar=True):
+        """Máscara de bits de un conjunto de recursos"""
+        mascara = 0
+        for nombre in nombres_recursos:
+            mascara |= cls.bit(nombre, registrar)
+        return mascara
+    
+    @classmethod
+    def nombres_de_mascara(cls, mascara):
+        """Nombres de los recursos de una máscara, por orden de id"""
+        nombres = []
+        id_recurso = 0
+        while mascara:
+            if mascara & 1:
+                nombres.append(cls._nombres_por_id[id_recurso])
+            mascara >>= 1
+            id_recurso += 1
+        return nombres
+    
+    @classmethod
+    def mascara_coincidentes(cls, texto):
+        """Máscara de los recursos registrados cuyo nombre contiene el texto (sin distinguir mayúsculas)"""
+        texto = texto.lower()
+        mascara = 0
+        for id_recurso, nombre in enumerate(list(cls._nombres_por_id)):
+            if texto in nombre.lower():
+                mascara |= 1 << id_recurso
+        return mascara
+    
+    @classmethod
+    def _esperar_si_cargando(cls):
+        # El hilo de carga usa el estado mientras lo construye: no debe esperarse a sí mismo
+        if cls._carga is not None and threading.current_thread() is not cls._hilo_carga:
+            cls.esperar_carga()
+    
+    @classmethod
+    def esperar_carga(cls, timeout=None):
+        """Espera a una inicialización en segundo plano; relanza su excepción si falló"""
+        carga = cls._carga
+        if carga is None:
+            return
+        try:
+            carga.result(timeout)
+        finally:
+            if carga.done():
+                cls._carga = None
+    
+    @classmethod
+    def carga_completa(cls):
+        """Indica si el estado de recursos ya está cargado"""
+        return cls._carga is None or cls._carga.done()
+    
+    @classmethod
+    def _cargar_archivo(cls, archivo_recursos):
+        """Carga recursos.json en memoria"""
         if os.path.exists(archivo_recursos):
             try:
                 with open(archivo_recursos, 'r', encoding='utf-8') as f:
                     datos = json.load(f)
                 
-                cls.recursos_disponibles = datos.get('disponibles', [])
-                cls.recursos_usados = datos.get('usados', {})
+                cls._establecer_estado(datos.get('disponibles', []), datos.get('usados', {}))
                 print(f"✅ Recursos cargados desde {archivo_recursos}")
             except Exception as e:
                 print(f"⚠️ Error cargando recursos: {e}")
-                cls.recursos_disponibles = []
-                cls.recursos_usados = {}
+                cls._establecer_estado([], {})
         else:
             print(f"ℹ️ No existe archivo {archivo_recursos}, se usará lista vacía")
-            cls.recursos_disponibles = []
-            cls.recursos_usados = {}
+            cls._establecer_estado([], {})
+    
+    @classmethod
+    def _establecer_estado(cls, disponibles, usados):
+        """
+        Sustituye el estado a partir de la forma de recursos.json (listas) y
+        reconstruye los índices: conjuntos por recurso, índice inverso por
+        evento y conjunto de recursos libres.
+        """
+        cls.recursos_disponibles = []
+        cls.recursos_usados = {}
+        cls.eventos_recursos = {}
+        cls._libres = set()
+        cls._posiciones = {}
+        cls._ocupacion = {}
+        
+        for recurso in disponibles:
+            cls._registrar_recurso(recurso)
+        for recurso, eventos in usados.items():
+            if recurso not in cls.recursos_usados:
+                cls.recursos_usados[recurso] = set()
+                cls._libres.add(recurso)
+            for id_evento in eventos:
+                cls._anotar_uso(recurso, id_evento)
+        
+        # Los intervalos conocidos se conservan (p. ej. al deshacer un lote)
+        cls._intervalos = {
+            id_evento: intervalo for id_evento, intervalo in cls._intervalos.items()
+            if id_evento in cls.eventos_recursos
+        }
+    
+    @classmethod
+    def _registrar_recurso(cls, nombre):
+        if nombre in cls._posiciones:
+            return False
+        cls._posiciones[nombre] = len(cls.recursos_disponibles)
+        cls.recursos_disponibles.append(nombre)
+        if nombre not in cls.recursos_usados:
+            cls.recursos_usados[nombre] = set()
+            cls._libres.add(nombre)
+        return True
+    
+    @classmethod
+    def _anotar_uso(cls, nombre_recurso, id_evento):
+        eventos = cls.recursos_usados[nombre_recurso]
+        if id_evento in eventos:
+            return False
+        eventos.add(id_evento)
+        cls._libres.discard(nombre_recurso)
+        cls.eventos_recursos.setdefault(id_evento, set()).add(nombre_recurso)
+        intervalo = cls._intervalos.get(id_evento)
+        if intervalo is not None:
+            cls._indice_ocupacion(nombre_recurso).insertar(id_evento, *intervalo)
+        return True
+    
+    @classmethod
+    def _quitar_uso(cls, nombre_recurso, id_evento):
+        eventos = cls.recursos_usados[nombre_recurso]
+        if id_evento not in eventos:
+            return False
+        eventos.remove(id_evento)
+        if not eventos:
+            cls._libres.add(nombre_recurso)
+        recursos = cls.eventos_recursos.get(id_evento)
+        if recursos is not None:
+            recursos.discard(nombre_recurso)
+            if not recursos:
+                del cls.eventos_recursos[id_evento]
+                # Dentro de un lote se conserva por si hay que deshacerlo
+                if cls._nivel_lote == 0:
+                    cls._intervalos.pop(id_evento, None)
+        indice = cls._ocupacion.get(nombre_recurso)
+        if indice is not None:
+            indice.eliminar(id_evento)
+        return True
+    
+    @classmethod
+    def _indice_ocupacion(cls, nombre_recurso):
+        indice = cls._ocupacion.get(nombre_recurso)
+        if indice is None:
+            indice = cls._ocupacion[nombre_recurso] = IndiceIntervalos()
+        return indice
+    
+    @staticmethod
+    def _intervalo_de(evento):
+        """(inicio_ord, fin_ord) de un evento, o None si sus fechas no son válidas"""
+        inicio = getattr(evento, 'inicio_ord', None)
+        fin = getattr(evento, 'fin_ord', None)
+        if inicio is None or fin is None:
+            return None
+        return (inicio, fin) if inicio <= fin else (fin, inicio)
     
     @classmethod
-    def guardar_estado(cls, directorio_datos="datos"):
+    def _libre_en(cls, nombre_recurso, inicio, fin):
+        eventos = cls.recursos_usados.get(nombre_recurso)
+        if eventos is None:
+            return False
+        if not eventos:
+            return True
+        indice = cls._ocupacion.get(nombre_recurso)
+        if indice is None or len(indice) < len(eventos):
+            return False  # Algún uso sin intervalo conocido
+        return not indice.solapa(inicio, fin)
+    
+    @classmethod
+    def guardar_estado(cls, directorio_datos=None):
         """Guarda el estado actual de los recursos"""
+        cls._esperar_si_cargando()
+        if directorio_datos is None:
+            directorio_datos = cls.directorio_datos
         try:
             archivo_recursos = os.path.join(directorio_datos, "recursos.json")
             
+            # Copiar el estado bajo cerrojo y escribir fuera de él
+            with cls._cerrojo:
+                disponibles, usados = cls.instantanea()
+                cls._sucio = False
+            
             datos = {
-                'disponibles': cls.recursos_disponibles,
-                'usados': cls.recursos_usados
+                'disponibles': disponibles,
+                'usados': usados
             }
             
-            with open(archivo_recursos, 'w', encoding='utf-8') as f:
-                json.dump(datos, f, indent=2, ensure_ascii=False)
+            with cls._cerrojo_escritura:
+                comienzo = time.perf_counter()
+                with open(archivo_recursos, 'w', encoding='utf-8') as f:
+                    json.dump(datos, f, indent=2, ensure_ascii=False)
+                cls._registrar_escritura((time.perf_counter() - comienzo) * 1000)
             
             return True
         except Exception as e:
             print(f"❌ Error guardando recursos: {e}")
+            with cls._cerrojo:
+                cls._sucio = True
             return False
     
     @classmethod
-    def obtener_disponibles(cls):
-        """Retorna recursos no utilizados"""
-        disponibles = []
-        for recurso in cls.recursos_disponibles:
-            if len(cls.recursos_usados.get(recurso, [])) == 0:
-                disponibles.append(recurso)
-        return disponibles
+    def _registrar_escritura(cls, latencia_ms):
+        metricas = cls._metricas
+        metricas['escrituras'] += 1
+        metricas['latencia_total_ms'] += latencia_ms
+        metricas['ultima_latencia_ms'] = latencia_ms
+        metricas['latencia_max_ms'] = max(metricas['latencia_max_ms'], latencia_ms)
+    
+    @classmethod
+    def _guardar_automaticamente(cls):
+        """Guarda tras una mutación, salvo dentro de un lote (se guarda al confirmarlo)"""
+        cls._metricas['solicitudes'] += 1
+        if cls._nivel_lote > 0:
+            cls._guardado_pendiente = True
+            return True
+        return cls._programar_escritura()
+    
+    @classmethod
+    def _programar_escritura(cls):
+        """Escribe ya, o marca el estado como sucio si hay escritura diferida"""
+        if cls._hilo_escritura is not None:
+            cls._sucio = True
+            return True
+        return cls.guardar_estado()
+    
+    # ESCRITURA DIFERIDA
+    
+    @classmethod
+    def activar_escritura_diferida(cls, intervalo=None):
+        """
+        Las mutaciones solo marcan el estado como sucio; un hilo en segundo
+        plano escribe recursos.json cada `intervalo` segundos si hay cambios.
+        """
+        if intervalo is not None:
+            cls.intervalo_escritura = intervalo
+        # Volver a activarla (p. ej. al reinicializar los recursos) no lanza
+        # otro hilo: el que ya corre sigue volcando con el nuevo intervalo
+        with cls._cerrojo:
+            if cls._hilo_escritura is not None:
+                return False
+            
+            cls._parar_escritura = threading.Event()
+            cls._hilo_escritura = threading.Thread(
+                target=cls._bucle_escritura,
+                args=(cls._parar_escritura,),
+                name="escritura-recursos",
+                daemon=True
+            )
+            cls._hilo_escritura.start()
+        return True
+    
+    @classmethod
+    def _bucle_escritura(cls, parar):
+        while not parar.wait(cls.intervalo_escritura):
+            cls.vaciar()
+    
+    @classmethod
+    def vaciar(cls):
+        """Escribe recursos.json si hay cambios pendientes"""
+        if cls._sucio:
+            return cls.guardar_estado()
+        return True
+    
+    @classmethod
+    def detener_escritura_diferida(cls):
+        """Detiene el hilo de escritura y vuelca los cambios pendientes"""
+        hilo = cls._hilo_escritura
+        if hilo is not None:
+            cls._parar_escritura.set()
+            hilo.join()
+            cls._hilo_escritura = None
+            cls._parar_escritura = None
+        return cls.vaciar()
+    
+    @classmethod
+    def estadisticas_escritura(cls):
+        """Métricas de guardado: cambios solicitados frente a escrituras reales"""
+        metricas = cls._metricas
+        escrituras = metricas['escrituras']
+        return {
+            'escritura_diferida': cls._hilo_escritura is not None,
+            'intervalo_s': cls.intervalo_escritura,
+            'solicitudes': metricas['solicitudes'],
+            'escrituras': escrituras,
+            'coalescidas': max(0, metricas['solicitudes'] - escrituras),
+            'pendiente': cls._sucio,
+            'latencia_media_ms': metricas['latencia_total_ms'] / escrituras if escrituras else 0.0,
+            'latencia_max_ms': metricas['latencia_max_ms'],
+            'ultima_latencia_ms': metricas['ultima_latencia_ms']
+        }
+    
+    @classmethod
+    def instantanea(cls):
+        """Copia del estado en memoria (con la forma de recursos.json), para poder deshacer cambios"""
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            return (
+                list(cls.recursos_disponibles),
+                {recurso: sorted(eventos) for recurso, eventos in cls.recursos_usados.items()}
+            )
+    
+    @classmethod
+    def restaurar(cls, instantanea):
+        """Restaura un estado obtenido con instantanea()"""
+        cls._esperar_si_cargando()
+        disponibles, usados = instantanea
+        with cls._cerrojo:
+            cls._establecer_estado(disponibles, usados)
+    
+    @classmethod
+    @contextmanager
+    def lote(cls):
+        """
+        Agrupa mutaciones: recursos.json se escribe una sola vez al salir del bloque.
+        Si el bloque lanza una excepción, el estado en memoria se restaura.
+        """
+        if cls._nivel_lote > 0:
+            # Lote anidado: se confirma o deshace con el exterior
+            cls._nivel_lote += 1
+            try:
+                yield cls
+            finally:
+                cls._nivel_lote -= 1
+            return
+        
+        cls._esperar_si_cargando()
+        estado_previo = cls.instantanea()
+        cls._nivel_lote = 1
+        cls._guardado_pendiente = False
+        try:
+            yield cls
+        except BaseException:
+            cls.restaurar(estado_previo)
+            raise
+        finally:
+            cls._nivel_lote = 0
+            pendiente, cls._guardado_pendiente = cls._guardado_pendiente, False
+        
+        if pendiente:
+            cls._programar_escritura()
+    
+    @classmethod
+    def obtener_disponibles(cls, inicio=None, fin=None):
+        """
+        Retorna recursos no utilizados
+        
+        Args:
+            inicio (int): Ordinal de día del inicio del periodo (opcional)
+            fin (int): Ordinal de día del fin del periodo (opcional)
+        
+        Con un periodo, retorna los recursos que no tienen ningún evento que se
+        solape con [inicio, fin] (O(log n) por recurso); sin él, los que no
+        tienen ningún evento.
+        """
+        cls._esperar_si_cargando()
+        if inicio is not None or fin is not None:
+            inicio = fin if inicio is None else inicio
+            fin = inicio if fin is None else fin
+            with cls._cerrojo:
+                return [recurso for recurso in cls.recursos_disponibles
+                        if cls._libre_en(recurso, inicio, fin)]
+        with cls._cerrojo:
+            # Solo se recorren los libres; se devuelven en el orden de registro
+            libres = [recurso for recurso in cls._libres if recurso in cls._posiciones]
+            libres.sort(key=cls._posiciones.__getitem__)
+        return libres
     
     @classmethod
     def obtener_todos(cls):
         """Retorna todos los recursos registrados"""
+        cls._esperar_si_cargando()
         return cls.recursos_disponibles.copy()
     
     @classmethod
     def agregar_recurso(cls, nombre):
         """Agrega un nuevo recurso al sistema"""
-        if nombre not in cls.recursos_disponibles:
-            cls.recursos_disponibles.append(nombre)
-            cls.recursos_usados[nombre] = []
-            cls.guardar_estado()  # Guardar automáticamente
-            return True
-        return False
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            if not cls._registrar_recurso(nombre):
+                return False
+        cls.id_de(nombre)
+        cls._guardar_automaticamente()
+        return True
     
     @classmethod
     def marcar_como_usado(cls, nombre_recurso, evento):
         """Marca un recurso como usado por un evento"""
-        if nombre_recurso in cls.recursos_usados:
-            if evento.nombre not in cls.recursos_usados[nombre_recurso]:
-                cls.recursos_usados[nombre_recurso].append(evento.nombre)
-                cls.guardar_estado()  # Guardar automáticamente
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            if nombre_recurso not in cls.recursos_usados:
+                return
+            intervalo = cls._intervalo_de(evento)
+            if intervalo is not None:
+                cls._intervalos[evento.id] = intervalo
+            if not cls._anotar_uso(nombre_recurso, evento.id):
+                if intervalo is not None:
+                    # Ya lo usaba: solo pueden haber cambiado sus fechas
+                    cls._indice_ocupacion(nombre_recurso).insertar(evento.id, *intervalo)
+                return
+        cls._guardar_automaticamente()
     
     @classmethod
     def liberar_recurso(cls, nombre_recurso, evento):
         """Libera un recurso usado por un evento"""
-        if nombre_recurso in cls.recursos_usados:
-            if evento.nombre in cls.recursos_usados[nombre_recurso]:
-                cls.recursos_usados[nombre_recurso].remove(evento.nombre)
-                cls.guardar_estado()  # Guardar automáticamente
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            if nombre_recurso not in cls.recursos_usados:
+                return
+            # Por id; si no, un uso anterior a los ids guardado con el nombre
+            if (not cls._quitar_uso(nombre_recurso, evento.id)
+                    and not cls._quitar_uso(nombre_recurso, evento.nombre)):
+                return
+        cls._guardar_automaticamente()
     
     @classmethod
     def esta_disponible(cls, nombre_recurso):
         """Verifica si un recurso está disponible"""
-        if nombre_recurso in cls.recursos_usados:
-            return len(cls.recursos_usados[nombre_recurso]) == 0
-        return False
+        cls._esperar_si_cargando()
+        return nombre_recurso in cls._libres
+    
+    @classmethod
+    def esta_libre(cls, nombre_recurso, inicio, fin):
+        """Verifica si un recurso está libre durante [inicio, fin] (ordinales de día)"""
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            return cls._libre_en(nombre_recurso, inicio, fin)
+    
+    @classmethod
+    def reconstruir_ocupacion(cls, eventos):
+        """
+        Toma las fechas de los eventos del calendario y reconstruye los índices
+        de ocupación. recursos.json solo guarda ids de eventos, así que el
+        Calendario la llama cada vez que termina de cargar sus eventos (los
+        recursos deben estar ya inicializados) para que la disponibilidad por
+        fechas conozca los usos anteriores. Los usos guardados con el nombre
+        del evento (anteriores a los ids) pasan al id del primer evento con
+        ese nombre que use el recurso.
+        """
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            migrados = cls._migrar_nombres(eventos)
+            for evento in eventos:
+                if evento.id in cls.eventos_recursos:
+                    intervalo = cls._intervalo_de(evento)
+                    if intervalo is not None:
+                        cls._intervalos[evento.id] = intervalo
+            
+            cls._ocupacion = {}
+            for recurso, ids_eventos in cls.recursos_usados.items():
+                intervalos = [
+                    (id_evento,) + cls._intervalos[id_evento]
+                    for id_evento in ids_eventos if id_evento in cls._intervalos
+                ]
+                if intervalos:
+                    cls._ocupacion[recurso] = IndiceIntervalos(intervalos)
+        if migrados:
+            print(f"🆔 {migrados} usos de recursos pasados de nombre a id de evento")
+            cls._guardar_automaticamente()
+    
+    @classmethod
+    def _migrar_nombres(cls, eventos):
+        """Traduce a ids los usos guardados con nombres de evento; devuelve cuántos"""
+        por_nombre = {}
+        for evento in eventos:
+            por_nombre.setdefault(evento.nombre, []).append(evento)
+        
+        migrados = 0
+        for clave in [clave for clave in cls.eventos_recursos if clave in por_nombre]:
+            for recurso in list(cls.eventos_recursos[clave]):
+                candidatos = por_nombre[clave]
+                evento = next((e for e in candidatos if e.usa_recurso(recurso)), candidatos[0])
+                cls._quitar_uso(recurso, clave)
+                cls._anotar_uso(recurso, evento.id)
+                migrados += 1
+        return migrados
+    
+    @classmethod
+    def recursos_de_evento(cls, id_evento):
+        """Recursos que usa un evento (por id), en el orden de registro"""
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            recursos = list(cls.eventos_recursos.get(id_evento, ()))
+        recursos.sort(key=lambda recurso: cls._posiciones.get(recurso, len(cls._posiciones)))
+        return recursos
+    
+    @classmethod
+    def eventos_de_recurso(cls, nombre_recurso):
+        """Ids de los eventos que usan un recurso, ordenados"""
+        cls._esperar_si_cargando()
+        with cls._cerrojo:
+            return sorted(cls.recursos_usados.get(nombre_recurso, ()))
     
     def __str__(self):
         return self.nombre
\ No newline at end of file
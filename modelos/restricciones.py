@@ -1,27 +1,186 @@
+import os
+import json
+from modelos.recurso import Recurso
+
+ARCHIVO_RESTRICCIONES = "restricciones.json"
+
+
 class Restricciones:
+    """
+    Reglas entre recursos de un mismo evento: co-requisitos (quien usa a
+    debe usar b) y exclusiones (a y b no pueden ir juntos).
+    
+    Las reglas se compilan a máscaras de bits de Recurso: por cada recurso,
+    la máscara de todo lo que requiere (cierre transitivo: si a requiere b y
+    b requiere c, a requiere c) y la de lo que excluye. Validar un evento
+    cuesta así O(recursos del evento), no O(reglas). Al compilar se detectan
+    los conjuntos de reglas contradictorios, así que las reglas deben
+    agregarse con agregar_co_requisitos/agregar_exclusiones.
+    """
+    
     def __init__(self):
         self.co_requisitos = []
         self.exclusiones = []
+        self._requiere = {}  # {recurso: máscara de recursos requeridos (cierre)}
+        self._excluye = {}  # {recurso: máscara de recursos excluidos}
     
     def agregar_co_requisitos(self, recurso_a, recurso_b):
         """Si un evento usa recurso_a tambien debe usar recurso_b"""
-        self.co_requisitos.append((recurso_a, recurso_b))
-        
+        self._agregar_regla(self.co_requisitos, (recurso_a, recurso_b))
     
     def agregar_exclusiones(self, recurso_a, recurso_b):
         """recurso_a y recurso_b no pueden usarse en el mismo evento"""
-        self.exclusiones.append((recurso_a, recurso_b))
+        self._agregar_regla(self.exclusiones, (recurso_a, recurso_b))
+    
+    def _agregar_regla(self, reglas, regla):
+        # Una regla que vuelve contradictorio el conjunto se rechaza
+        reglas.append(regla)
+        try:
+            self.compilar()
+        except ValueError:
+            reglas.pop()
+            self.compilar()
+            raise
+    
+    def __len__(self):
+        return len(self.co_requisitos) + len(self.exclusiones)
+    
+    # COMPILACIÓN
+    
+    def compilar(self):
+        """
+        Construye las máscaras de requisitos y exclusiones. Lanza ValueError
+        si algún recurso acaba requiriendo dos recursos que se excluyen (o
+        uno que él mismo excluye), porque ningún evento podría usarlo.
+        """
+        adyacencia = {}
+        for a, b in self.co_requisitos:
+            adyacencia.setdefault(a, set()).add(b)
+        
+        excluidos = {}
+        for a, b in self.exclusiones:
+            excluidos.setdefault(a, set()).add(b)
+            excluidos.setdefault(b, set()).add(a)
+        
+        cierres = {recurso: self._cierre(recurso, adyacencia) for recurso in adyacencia}
+        
+        contradicciones = []
+        for recurso in set(adyacencia) | set(excluidos):
+            conjunto = cierres.get(recurso, set()) | {recurso}
+            for x in sorted(conjunto):
+                choques = excluidos.get(x, set()) & conjunto
+                if choques:
+                    y = min(choques)
+                    if recurso in (x, y):
+                        otro = y if recurso == x else x
+                        contradicciones.append(f"'{recurso}' requiere '{otro}', que lo excluye")
+                    else:
+                        contradicciones.append(f"'{recurso}' requiere '{x}' y '{y}', que se excluyen")
+                    break
+        if contradicciones:
+            raise ValueError("Restricciones contradictorias: " + "; ".join(sorted(contradicciones)))
+        
+        self._requiere = {recurso: Recurso.mascara(cierre) for recurso, cierre in cierres.items()}
+        self._excluye = {recurso: Recurso.mascara(otros) for recurso, otros in excluidos.items()}
+        return True
+    
+    @staticmethod
+    def _cierre(recurso, adyacencia):
+        """Recursos alcanzables desde uno siguiendo los co-requisitos"""
+        alcanzados = set()
+        pendientes = list(adyacencia.get(recurso, ()))
+        while pendientes:
+            siguiente = pendientes.pop()
+            if siguiente in alcanzados:
+                continue
+            alcanzados.add(siguiente)
+            pendientes.extend(adyacencia.get(siguiente, ()))
+        alcanzados.discard(recurso)  # Un ciclo no hace que se requiera a sí mismo
+        return alcanzados
     
+    # VALIDACIÓN
+    
+    def violaciones(self, evento):
+        """Lista de mensajes con todas las reglas que incumple un evento"""
+        mascara = evento.mascara_recursos
+        mensajes = []
+        exclusiones_vistas = set()
+        
+        for recurso in evento.recursos:
+            faltan = self._requiere.get(recurso, 0) & ~mascara
+            if faltan:
+                for requerido in Recurso.nombres_de_mascara(faltan):
+                    mensajes.append(f"El recurso '{recurso}' requiere tambien el recurso '{requerido}'")
+        
+            choques = self._excluye.get(recurso, 0) & mascara
+            if choques:
+                for otro in Recurso.nombres_de_mascara(choques):
+                    par = frozenset((recurso, otro))
+                    if par not in exclusiones_vistas:
+                        exclusiones_vistas.add(par)
+                        mensajes.append(f"El recurso '{recurso}' no puede usarse junto con '{otro}'")
+        
+        return mensajes
     
     def validar(self, evento):
-        # Validar co_requisitos
-        for (a, b) in self.co_requisitos:
-            if a in evento.recursos and b not in evento.recursos:
-                raise ValueError(f"El recurso '{a}' requiere tambien el recurso '{b}'")
-            
-        # Validar exclusiones
-        for (a, b) in self.exclusiones:
-            if a in evento.recursos and b in evento.recursos:
-                raise ValueError(f"El recurso '{a}' no puede usarse junto con '{b}'")
-        
-    
\ No newline at end of file
+        """Lanza ValueError con la primera regla que incumple el evento"""
+        mensajes = self.violaciones(evento)
+        if mensajes:
+            raise ValueError(mensajes[0])
+        return True
+    
+    def validar_todos(self, eventos):
+        """
+        Valida un calendario entero en una pasada
+        
+        Returns:
+            list: Tuplas (evento, mensaje) con todas las reglas incumplidas
+        """
+        if not self._requiere and not self._excluye:
+            return []
+        
+        resultado = []
+        for evento in eventos:
+            if evento.mascara_recursos:
+                for mensaje in self.violaciones(evento):
+                    resultado.append((evento, mensaje))
+        return resultado
+    
+    # PERSISTENCIA
+    
+    def a_diccionario(self):
+        return {
+            'co_requisitos': [list(regla) for regla in self.co_requisitos],
+            'exclusiones': [list(regla) for regla in self.exclusiones]
+        }
+    
+    def guardar(self, directorio_datos="datos"):
+        """Guarda las reglas en restricciones.json, junto a recursos.json"""
+        ruta = os.path.join(directorio_datos, ARCHIVO_RESTRICCIONES)
+        try:
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump(self.a_diccionario(), f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"❌ Error guardando restricciones: {e}")
+            return False
+    
+    @classmethod
+    def cargar(cls, directorio_datos="datos"):
+        """Lee restricciones.json; sin archivo (o si no es válido) no hay reglas"""
+        restricciones = cls()
+        ruta = os.path.join(directorio_datos, ARCHIVO_RESTRICCIONES)
+        if not os.path.exists(ruta):
+            return restricciones
+        
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            restricciones.co_requisitos = [tuple(regla) for regla in datos.get('co_requisitos', [])]
+            restricciones.exclusiones = [tuple(regla) for regla in datos.get('exclusiones', [])]
+            restricciones.compilar()
+            print(f"✅ {len(restricciones)} restricciones cargadas desde {ruta}")
+            return restricciones
+        except Exception as e:
+            print(f"⚠️ Error cargando restricciones, se ignoran: {e}")
+            return cls()
@@ -0,0 +1,382 @@
+# nucleo/backend.py
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import Counter
+from modelos.evento import Evento
+from nucleo.diario import Diario
+
+
+def iterar_arreglo_json(ruta_archivo, tamano_bloque=64 * 1024):
+    """
+    Recorre un archivo con un arreglo JSON de nivel superior elemento a elemento,
+    sin cargar el arreglo completo en memoria.
+
+    ruta_archivo puede ser también un archivo de texto ya abierto: se lee desde
+    su posición actual y no se cierra.
+    """
+    if hasattr(ruta_archivo, 'read'):
+        yield from _recorrer_arreglo_json(ruta_archivo, tamano_bloque)
+        return
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        yield from _recorrer_arreglo_json(f, tamano_bloque)
+
+
+def _recorrer_arreglo_json(f, tamano_bloque):
+    decodificador = json.JSONDecoder()
+    espacios = " \t\r\n"
+
+    buffer = f.read(tamano_bloque)
+    posicion = 0
+    fin_archivo = not buffer
+
+    # Saltar hasta el corchete de apertura
+    buffer = buffer.lstrip(espacios)
+    if not buffer:
+        return
+    if buffer[0] != '[':
+        raise json.JSONDecodeError("Se esperaba un arreglo JSON", buffer, 0)
+    posicion = 1
+
+    while True:
+        # Saltar espacios y separadores entre elementos
+        while posicion < len(buffer) and buffer[posicion] in espacios + ",":
+            posicion += 1
+
+        if posicion < len(buffer) and buffer[posicion] == ']':
+            return
+
+        try:
+            if posicion >= len(buffer):
+                raise json.JSONDecodeError("Fin de bloque", buffer, posicion)
+            elemento, posicion = decodificador.raw_decode(buffer, posicion)
+        except json.JSONDecodeError:
+            if fin_archivo:
+                raise
+            # Elemento partido entre bloques: descartar lo consumido y leer más
+            bloque = f.read(tamano_bloque)
+            fin_archivo = not bloque
+            buffer = buffer[posicion:] + bloque
+            posicion = 0
+            continue
+
+        yield elemento
+
+
+class BackendAlmacenamiento(ABC):
+    """Interfaz común de los motores de almacenamiento de eventos"""
+
+    nombre = None
+    incremental = False  # Puede persistir altas/bajas sueltas sin reescribir todo
+    consultable = False  # Resuelve búsquedas sin cargar todos los eventos
+
+    def __init__(self, directorio_datos):
+        self.directorio_datos = directorio_datos
+        # Eventos leídos sin id guardado (datos anteriores a los ids): reciben
+        # uno nuevo en cada lectura hasta que se vuelven a guardar
+        self.eventos_sin_id = 0
+
+    def _ruta(self, nombre_archivo):
+        return os.path.join(self.directorio_datos, nombre_archivo)
+
+    def _evento_desde_diccionario(self, evento_dict):
+        """Evento a partir de su diccionario, contando los que no traen id"""
+        if not evento_dict.get('id'):
+            self.eventos_sin_id += 1
+        return Evento.desde_diccionario(evento_dict)
+
+    @abstractmethod
+    def iterar_eventos(self):
+        """Genera los eventos almacenados uno a uno, en orden"""
+
+    def cargar_eventos(self):
+        """Devuelve la lista completa de eventos almacenados"""
+        return list(self.iterar_eventos())
+
+    @abstractmethod
+    def guardar_eventos(self, eventos):
+        """Reemplaza el contenido almacenado por la lista de eventos"""
+
+    def registrar_cambios(self, operaciones):
+        """
+        Persiste tuplas ('alta' | 'baja', evento); las bajas, por id. Los
+        backends incrementales lo hacen sin reescribir todo; por defecto se
+        aplican a los eventos almacenados y se guardan completos
+        """
+        eventos = self.cargar_eventos()
+        posiciones = {evento.id: posicion for posicion, evento in enumerate(eventos)}
+        for operacion, evento in operaciones:
+            if operacion == 'alta':
+                posiciones[evento.id] = len(eventos)
+                eventos.append(evento)
+            elif operacion == 'baja':
+                posicion = posiciones.pop(evento.id, None)
+                if posicion is not None:
+                    eventos[posicion] = None
+            else:
+                raise ValueError(f"Operación desconocida: {operacion}")
+        return self.guardar_eventos([evento for evento in eventos if evento is not None])
+
+    @abstractmethod
+    def archivos_exportables(self):
+        """Nombres de los archivos que contienen los eventos"""
+    
+    def archivos_en(self, directorio):
+        """Archivos de este formato presentes en otro directorio (para importar)"""
+        return [
+            nombre_archivo for nombre_archivo in self.archivos_exportables()
+            if os.path.exists(os.path.join(directorio, nombre_archivo))
+        ]
+
+    def consolidar(self):
+        """Deja los archivos exportables completos y al día en disco"""
+        pass
+
+    def tras_importar(self):
+        """Se invoca después de sobrescribir los archivos exportables"""
+        pass
+
+    def limpiar(self):
+        """Elimina los archivos del backend y devuelve cuántos se borraron"""
+        eliminados = 0
+        for nombre_archivo in self.archivos_exportables():
+            ruta = self._ruta(nombre_archivo)
+            if os.path.exists(ruta):
+                os.remove(ruta)
+                eliminados += 1
+                print(f"🗑️ Archivo {nombre_archivo} eliminado")
+        return eliminados
+
+    def cerrar(self):
+        """Libera conexiones o hilos del backend"""
+        pass
+
+    # CONSULTAS DELEGABLES (None = no soportada, usar el Buscador)
+
+    def buscar_por_rango_fechas(self, inicio_ordinal, fin_ordinal):
+        return None
+
+    def buscar_por_inicio(self, desde_ordinal, hasta_ordinal):
+        """Eventos que empiezan en [desde, hasta], ordenados por fecha de inicio"""
+        return None
+    
+    def buscar_por_recurso(self, texto_recurso):
+        return None
+
+    def contar_eventos_por_mes(self):
+        return None
+
+
+class BackendJSON(BackendAlmacenamiento):
+    """Almacena los eventos en eventos.json, con diario opcional de solo-anexado"""
+
+    nombre = "json"
+
+    def __init__(self, directorio_datos, diario=False, umbral_compactacion=500,
+                 nombre_archivo="eventos.json"):
+        super().__init__(directorio_datos)
+        self.nombre_archivo = nombre_archivo
+
+        self.diario = None
+        if diario:
+            self.diario = Diario(
+                self._ruta("eventos.diario"),
+                cargar_snapshot=self._leer_snapshot,
+                guardar_snapshot=self._escribir_snapshot,
+                umbral_compactacion=umbral_compactacion
+            )
+
+    @property
+    def incremental(self):
+        return self.diario is not None
+
+    def _escribir_snapshot(self, eventos, reemplazar=os.replace):
+        """Escribe el snapshot JSON de forma atómica (archivo temporal + rename)"""
+        try:
+            ruta_archivo = self._ruta(self.nombre_archivo)
+            ruta_temporal = ruta_archivo + ".tmp"
+
+            # Convertir eventos a diccionarios
+            eventos_dict = [evento.a_diccionario() for evento in eventos]
+
+            # Guardar en archivo
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                json.dump(eventos_dict, f, indent=2, ensure_ascii=False)
+            reemplazar(ruta_temporal, ruta_archivo)
+
+            print(f"✅ Eventos guardados en {ruta_archivo}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error guardando eventos: {e}")
+            return False
+
+    def _abrir_snapshot(self):
+        """Abre el snapshot JSON (None si aún no existe)"""
+        try:
+            return open(self._ruta(self.nombre_archivo), 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    def _iterar_snapshot(self, archivo=None):
+        """Genera los diccionarios del snapshot JSON sin aplicar el diario"""
+        if archivo is not None:
+            # Un snapshot ya abierto se recorre desde el principio cada vez
+            archivo.seek(0)
+            return iterar_arreglo_json(archivo)
+
+        ruta_archivo = self._ruta(self.nombre_archivo)
+        if not os.path.exists(ruta_archivo):
+            return iter(())
+        return iterar_arreglo_json(ruta_archivo)
+
+    def _leer_snapshot(self):
+        """Lee el snapshot JSON sin aplicar el diario"""
+        return [self._evento_desde_diccionario(evento_dict) for evento_dict in self._iterar_snapshot()]
+
+    def guardar_eventos(self, eventos):
+        if self.diario:
+            # Un snapshot completo hace innecesario el diario acumulado
+            self.diario.esperar_compactacion()
+            if not self._escribir_snapshot(eventos):
+                return False
+            self.diario.reiniciar()
+            return True
+
+        return self._escribir_snapshot(eventos)
+
+    def registrar_cambios(self, operaciones):
+        if not self.diario:
+            return super().registrar_cambios(operaciones)
+
+        registros = []
+        for operacion, evento in operaciones:
+            if operacion == 'alta':
+                registros.append({'op': 'alta', 'evento': evento.a_diccionario()})
+            elif operacion == 'baja':
+                registros.append({'op': 'baja', 'id': evento.id, 'nombre': evento.nombre})
+            else:
+                raise ValueError(f"Operación desconocida: {operacion}")
+
+        try:
+            return self.diario.anexar(registros)
+        except Exception as e:
+            print(f"❌ Error anexando al diario: {e}")
+            return False
+
+    def iterar_eventos(self):
+        if not self.diario:
+            for evento_dict in self._iterar_snapshot():
+                yield self._evento_desde_diccionario(evento_dict)
+            return
+
+        # El snapshot se abre junto con la lectura del diario: una compactación
+        # que termine mientras se recorre no cambia el archivo ya abierto
+        archivo, registros = self.diario.leer_con_snapshot(self._abrir_snapshot)
+        if archivo is None:
+            archivo = io.StringIO()
+        with archivo:
+            yield from self._iterar_con_diario(archivo, registros)
+
+    def _iterar_con_diario(self, archivo, registros):
+        if not registros:
+            for evento_dict in self._iterar_snapshot(archivo):
+                yield self._evento_desde_diccionario(evento_dict)
+            return
+
+        # Con diario: decidir qué eventos del snapshot siguen vivos sin cargarlo.
+        # Las bajas llevan el id del evento; las de diarios anteriores a los ids
+        # solo el nombre, y quitan el primer evento con ese nombre. Los del
+        # snapshot van antes que los anexados, así que para esas basta con
+        # contar cuántos hay por nombre.
+        nombres_baja = set(r['nombre'] for r in registros
+                           if r.get('op') == 'baja' and not r.get('id'))
+        en_snapshot = Counter()
+        if nombres_baja:
+            for evento_dict in self._iterar_snapshot(archivo):
+                if evento_dict['nombre'] in nombres_baja:
+                    en_snapshot[evento_dict['nombre']] += 1
+
+        quitar_de_snapshot = Counter()
+        ids_baja = set()
+        altas = []  # None donde una baja quitó el evento anexado
+        posiciones_altas = {}  # {id: [posiciones en altas]}
+        for registro in registros:
+            if registro.get('op') == 'alta':
+                posiciones_altas.setdefault(registro['evento'].get('id'), []).append(len(altas))
+                altas.append(registro['evento'])
+            elif registro.get('op') == 'baja':
+                id_evento = registro.get('id')
+                if id_evento:
+                    if posiciones_altas.get(id_evento):
+                        altas[posiciones_altas[id_evento].pop(0)] = None
+                    else:
+                        ids_baja.add(id_evento)
+                    continue
+                nombre = registro['nombre']
+                if quitar_de_snapshot[nombre] < en_snapshot[nombre]:
+                    quitar_de_snapshot[nombre] += 1
+                else:
+                    for i, evento_dict in enumerate(altas):
+                        if evento_dict is not None and evento_dict['nombre'] == nombre:
+                            altas[i] = None
+                            posiciones_altas[evento_dict.get('id')].remove(i)
+                            break
+
+        for evento_dict in self._iterar_snapshot(archivo):
+            if ids_baja and evento_dict.get('id') in ids_baja:
+                continue
+            nombre = evento_dict['nombre']
+            if quitar_de_snapshot[nombre] > 0:
+                quitar_de_snapshot[nombre] -= 1
+                continue
+            yield self._evento_desde_diccionario(evento_dict)
+
+        for evento_dict in altas:
+            if evento_dict is not None:
+                yield self._evento_desde_diccionario(evento_dict)
+
+    def cargar_eventos(self):
+        ruta_archivo = self._ruta(self.nombre_archivo)
+
+        registros = self.diario.leer() if self.diario else []
+
+        if not os.path.exists(ruta_archivo) and not registros:
+            print(f"ℹ️ No existe archivo {ruta_archivo}, se creará uno nuevo")
+            return []
+
+        eventos = list(self.iterar_eventos())
+
+        if registros:
+            print(f"📜 {len(registros)} registros del diario aplicados")
+
+        print(f"✅ {len(eventos)} eventos cargados desde {ruta_archivo}")
+        return eventos
+
+    def archivos_exportables(self):
+        return [self.nombre_archivo]
+
+    def consolidar(self):
+        if self.diario and self.diario.archivos():
+            # Incorporar el diario para dejar un eventos.json completo
+            self.guardar_eventos(self.cargar_eventos())
+
+    def tras_importar(self):
+        if self.diario:
+            # El diario local se refería al snapshot que se reemplazó
+            self.diario.reiniciar()
+
+    def limpiar(self):
+        eliminados = super().limpiar()
+        if self.diario:
+            archivos_diario = len(self.diario.archivos())
+            self.diario.reiniciar()
+            if archivos_diario:
+                eliminados += archivos_diario
+                print(f"🗑️ Diario de eventos eliminado")
+        return eliminados
+
+    def cerrar(self):
+        if self.diario:
+            self.diario.esperar_compactacion()
@@ -0,0 +1,214 @@
+# nucleo/backend_binario.py
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+from itertools import accumulate, repeat
+from modelos.evento import Evento, fecha_a_ordinal, FORMATO_FECHA
+from nucleo.backend import BackendAlmacenamiento
+
+# Formato de eventos.bin (enteros little-endian de 32 bits):
+#   cabecera:  b"PRIB" | versión u16 | reservado u16
+#   cadenas:   cantidad | bytes | longitud en caracteres * cantidad | utf-8
+#   bloques:   (bytes del bloque | cuerpo del bloque) * N, terminados por un 0
+#   bloque:    n | id * n | nombre * n | inicio * n | fin * n | n_recursos * n | recurso * total
+# Ids, nombres y recursos son índices de la tabla de cadenas. La versión 1 no
+# tenía la columna de ids: sus eventos se leen con un id nuevo. Las fechas válidas se
+# guardan como ordinal de día (> 0); las que no se reconstruyen idénticas, como
+# -(índice + 1) en la tabla de cadenas. Cada bloque agrupa sus registros por
+# columnas para decodificarlos con operaciones en bloque.
+
+MAGICO = b"PRIB"
+VERSION = 2
+REGISTROS_POR_BLOQUE = 4096
+
+_CABECERA = struct.Struct("<4sHH")
+_U32 = struct.Struct("<I")
+
+
+def _arreglo(tipo, datos):
+    """array de 32 bits a partir de bytes little-endian"""
+    valores = array(tipo)
+    valores.frombytes(datos)
+    if sys.byteorder != "little":
+        valores.byteswap()
+    return valores
+
+
+def _a_bytes(tipo, valores):
+    arreglo = array(tipo, valores)
+    if sys.byteorder != "little":
+        arreglo.byteswap()
+    return arreglo.tobytes()
+
+
+class BackendBinario(BackendAlmacenamiento):
+    """Almacena los eventos en un archivo binario compacto con tabla de cadenas"""
+
+    nombre = "binario"
+
+    def __init__(self, directorio_datos, nombre_archivo="eventos.bin"):
+        super().__init__(directorio_datos)
+        self.nombre_archivo = nombre_archivo
+
+    @staticmethod
+    def _codificar_fecha(fecha, indice_cadena):
+        """Ordinal si la fecha se reconstruye idéntica; si no, referencia a la cadena"""
+        ordinal = fecha_a_ordinal(fecha)
+        if ordinal is not None and date.fromordinal(ordinal).strftime(FORMATO_FECHA) == fecha:
+            return ordinal
+        return -(indice_cadena(fecha) + 1)
+
+    def guardar_eventos(self, eventos):
+        try:
+            ruta_archivo = self._ruta(self.nombre_archivo)
+            ruta_temporal = ruta_archivo + ".tmp"
+
+            cadenas = []
+            indices = {}
+
+            def indice_cadena(texto):
+                indice = indices.get(texto)
+                if indice is None:
+                    indice = indices[texto] = len(cadenas)
+                    cadenas.append(texto)
+                return indice
+
+            # Las fechas se repiten mucho: codificar cada texto una sola vez
+            fechas = {}
+
+            def codificar_fecha(fecha):
+                valor = fechas.get(fecha)
+                if valor is None:
+                    valor = fechas[fecha] = self._codificar_fecha(fecha, indice_cadena)
+                return valor
+
+            bloques = []
+            columnas = ([], [], [], [], [], [])
+            for evento in eventos:
+                ids, nombres, inicios, fines, cantidades, recursos = columnas
+                ids.append(indice_cadena(evento.id))
+                nombres.append(indice_cadena(evento.nombre))
+                inicios.append(codificar_fecha(evento.inicio))
+                fines.append(codificar_fecha(evento.fin))
+                cantidades.append(len(evento.recursos))
+                recursos.extend(indice_cadena(recurso) for recurso in evento.recursos)
+                if len(nombres) == REGISTROS_POR_BLOQUE:
+                    bloques.append(self._codificar_bloque(columnas))
+                    columnas = ([], [], [], [], [], [])
+            if columnas[0]:
+                bloques.append(self._codificar_bloque(columnas))
+
+            texto_cadenas = "".join(cadenas).encode('utf-8')
+            with open(ruta_temporal, 'wb') as f:
+                f.write(_CABECERA.pack(MAGICO, VERSION, 0))
+                f.write(_a_bytes('I', [len(cadenas), len(texto_cadenas)]))
+                f.write(_a_bytes('I', [len(texto) for texto in cadenas]))
+                f.write(texto_cadenas)
+                for bloque in bloques:
+                    f.write(_U32.pack(len(bloque)))
+                    f.write(bloque)
+                f.write(_U32.pack(0))
+            os.replace(ruta_temporal, ruta_archivo)
+
+            print(f"✅ Eventos guardados en {ruta_archivo}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error guardando eventos: {e}")
+            return False
+
+    @staticmethod
+    def _codificar_bloque(columnas):
+        ids, nombres, inicios, fines, cantidades, recursos = columnas
+        return b"".join((
+            _U32.pack(len(nombres)),
+            _a_bytes('I', ids),
+            _a_bytes('I', nombres),
+            _a_bytes('i', inicios),
+            _a_bytes('i', fines),
+            _a_bytes('I', cantidades),
+            _a_bytes('I', recursos)
+        ))
+
+    @staticmethod
+    def _leer_exacto(f, cantidad):
+        datos = f.read(cantidad)
+        if len(datos) != cantidad:
+            raise ValueError("Archivo binario de eventos truncado")
+        return datos
+
+    def iterar_eventos(self):
+        ruta_archivo = self._ruta(self.nombre_archivo)
+        if not os.path.exists(ruta_archivo):
+            return
+
+        with open(ruta_archivo, 'rb') as f:
+            magico, version, _ = _CABECERA.unpack(self._leer_exacto(f, _CABECERA.size))
+            if magico != MAGICO:
+                raise ValueError(f"{ruta_archivo} no es un archivo de eventos binario")
+            if version > VERSION:
+                raise ValueError(f"Versión de formato binario no soportada: {version}")
+
+            n_cadenas, n_bytes = _arreglo('I', self._leer_exacto(f, 8))
+            longitudes = _arreglo('I', self._leer_exacto(f, 4 * n_cadenas))
+            texto_cadenas = self._leer_exacto(f, n_bytes).decode('utf-8')
+            cadenas = [texto_cadenas[fin - longitud:fin]
+                       for fin, longitud in zip(accumulate(longitudes), longitudes)]
+            del texto_cadenas
+            obtener_cadena = cadenas.__getitem__
+
+            # Muchos eventos comparten fechas: formatear cada valor una sola vez
+            fechas = {}
+
+            while True:
+                (tamano,) = _U32.unpack(self._leer_exacto(f, 4))
+                if tamano == 0:
+                    break
+                bloque = self._leer_exacto(f, tamano)
+
+                (n,) = _U32.unpack_from(bloque)
+                desde = 4
+                columnas = []
+                for tipo in ('I', 'I', 'i', 'i', 'I') if version >= 2 else ('I', 'i', 'i', 'I'):
+                    columnas.append(_arreglo(tipo, bloque[desde:desde + 4 * n]))
+                    desde += 4 * n
+                if version >= 2:
+                    ids = map(obtener_cadena, columnas.pop(0))
+                else:
+                    ids = repeat(None, n)
+                    self.eventos_sin_id += n
+                nombres, inicios, fines, cantidades = columnas
+                recursos = list(map(obtener_cadena, _arreglo('I', bloque[desde:])))
+
+                for valor in set(inicios).union(fines).difference(fechas):
+                    if valor < 0:
+                        fechas[valor] = cadenas[-valor - 1]
+                    else:
+                        fechas[valor] = date.fromordinal(valor).strftime(FORMATO_FECHA)
+
+                listas_recursos = [recursos[fin - cantidad:fin]
+                                   for fin, cantidad in zip(accumulate(cantidades), cantidades)]
+
+                for evento in map(Evento,
+                                  map(obtener_cadena, nombres),
+                                  map(fechas.__getitem__, inicios),
+                                  map(fechas.__getitem__, fines),
+                                  listas_recursos,
+                                  repeat(False),
+                                  ids):
+                    yield evento
+
+    def cargar_eventos(self):
+        ruta_archivo = self._ruta(self.nombre_archivo)
+        if not os.path.exists(ruta_archivo):
+            print(f"ℹ️ No existe archivo {ruta_archivo}, se creará uno nuevo")
+            return []
+
+        eventos = list(self.iterar_eventos())
+        print(f"✅ {len(eventos)} eventos cargados desde {ruta_archivo}")
+        return eventos
+
+    def archivos_exportables(self):
+        return [self.nombre_archivo]
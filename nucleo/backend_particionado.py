@@ -0,0 +1,404 @@
+# nucleo/backend_particionado.py
+import hashlib
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from modelos.evento import Evento, fecha_a_ordinal
+from nucleo.backend import BackendAlmacenamiento, iterar_arreglo_json
+
+# Los eventos se reparten en fragmentos por periodo de su fecha de inicio
+# (eventos-2024-03.json con partición mensual, eventos-2024.json con anual;
+# eventos-sin-fecha.json para inicios no válidos). El manifiesto guarda, por
+# fragmento, su archivo, tamaño y rango de fechas, de modo que una consulta
+# solo abre los fragmentos que se solapan con ella. Cada registro lleva un
+# número de secuencia que conserva el orden global de los eventos.
+
+PARTICIONES = ("mes", "anio")
+ARCHIVO_MANIFIESTO = "eventos.manifiesto.json"
+CLAVE_SIN_FECHA = "sin-fecha"
+
+
+class BackendParticionado(BackendAlmacenamiento):
+    """Almacena los eventos en un archivo JSON por mes o año, con manifiesto"""
+
+    nombre = "particionado"
+    incremental = True
+    consultable = True
+
+    def __init__(self, directorio_datos, particion="mes", presupuesto_memoria=32 * 1024 * 1024):
+        """
+        Args:
+            particion (str): "mes" o "anio" (solo se usa al crear el almacén;
+                uno existente conserva la partición de su manifiesto)
+            presupuesto_memoria (int): Bytes de fragmentos (según su tamaño en
+                disco) que se mantienen en caché; se descartan los menos usados
+        """
+        super().__init__(directorio_datos)
+        if particion not in PARTICIONES:
+            raise ValueError(f"Partición desconocida: {particion}")
+        self.presupuesto_memoria = presupuesto_memoria
+        self._cerrojo = threading.RLock()
+        self._cache = OrderedDict()  # clave -> [(secuencia, inicio_ord, fin_ord, dict)]
+        self._bytes_en_cache = 0
+        self._manifiesto = self._leer_manifiesto(directorio_datos) or self._manifiesto_vacio(particion)
+
+    # MANIFIESTO
+
+    @staticmethod
+    def _manifiesto_vacio(particion):
+        return {'version': 1, 'particion': particion, 'siguiente_secuencia': 0, 'fragmentos': {}}
+
+    @staticmethod
+    def _leer_manifiesto(directorio_datos):
+        ruta = os.path.join(directorio_datos, ARCHIVO_MANIFIESTO)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _guardar_manifiesto(self):
+        ruta = self._ruta(ARCHIVO_MANIFIESTO)
+        ruta_temporal = ruta + ".tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._manifiesto, f, indent=2, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta)
+
+    @property
+    def particion(self):
+        return self._manifiesto['particion']
+
+    def _clave(self, ordinal):
+        """Fragmento al que pertenece un evento según el ordinal de su inicio"""
+        if ordinal is None:
+            return CLAVE_SIN_FECHA
+        dia = date.fromordinal(ordinal)
+        if self.particion == "anio":
+            return f"{dia.year}"
+        return f"{dia.year}-{dia.month:02d}"
+
+    @staticmethod
+    def _archivo(clave):
+        return f"eventos-{clave}.json"
+
+    # CACHÉ DE FRAGMENTOS (LRU)
+
+    @staticmethod
+    def _registro(evento_dict):
+        return (
+            evento_dict.pop('secuencia'),
+            fecha_a_ordinal(evento_dict['inicio']),
+            fecha_a_ordinal(evento_dict['fin']),
+            evento_dict
+        )
+
+    @staticmethod
+    def _evento(evento_dict):
+        """Evento nuevo a partir de un registro en caché (sin compartir listas)"""
+        return Evento(evento_dict['nombre'], evento_dict['inicio'], evento_dict['fin'],
+                      list(evento_dict.get('recursos', [])), id=evento_dict.get('id'))
+
+    def _fragmento(self, clave):
+        """Registros de un fragmento, ordenados por secuencia (se cargan bajo demanda)"""
+        registros = self._cache.get(clave)
+        if registros is not None:
+            self._cache.move_to_end(clave)
+            return registros
+
+        datos = self._manifiesto['fragmentos'].get(clave)
+        if datos is None:
+            registros = []
+        else:
+            with open(self._ruta(datos['archivo']), 'r', encoding='utf-8') as f:
+                registros = [self._registro(evento_dict) for evento_dict in json.load(f)]
+        self._guardar_en_cache(clave, registros)
+        return registros
+
+    def _guardar_en_cache(self, clave, registros):
+        if clave in self._cache:
+            self._bytes_en_cache -= self._tamano(clave)
+            del self._cache[clave]
+        self._cache[clave] = registros
+        self._bytes_en_cache += self._tamano(clave)
+        # Descartar los menos usados, conservando siempre el último
+        while self._bytes_en_cache > self.presupuesto_memoria and len(self._cache) > 1:
+            clave_vieja, _ = self._cache.popitem(last=False)
+            self._bytes_en_cache -= self._tamano(clave_vieja)
+
+    def _tamano(self, clave):
+        datos = self._manifiesto['fragmentos'].get(clave)
+        return datos['bytes'] if datos else 0
+
+    def _vaciar_cache(self):
+        self._cache.clear()
+        self._bytes_en_cache = 0
+
+    def estadisticas_cache(self):
+        """Fragmentos en memoria frente al presupuesto configurado"""
+        with self._cerrojo:
+            return {
+                'fragmentos_en_cache': list(self._cache),
+                'bytes_en_cache': self._bytes_en_cache,
+                'presupuesto_memoria': self.presupuesto_memoria,
+                'fragmentos_totales': len(self._manifiesto['fragmentos'])
+            }
+
+    # ESCRITURA
+
+    def _escribir_fragmento(self, clave, registros):
+        """Reescribe un único fragmento y actualiza su entrada del manifiesto"""
+        fragmentos = self._manifiesto['fragmentos']
+        archivo = self._archivo(clave)
+        ruta = self._ruta(archivo)
+
+        if not registros:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            if clave in self._cache:
+                self._bytes_en_cache -= self._tamano(clave)
+                del self._cache[clave]
+            fragmentos.pop(clave, None)
+            return
+
+        lista = []
+        for secuencia, _, _, evento_dict in registros:
+            registro = {'secuencia': secuencia}
+            registro.update(evento_dict)
+            lista.append(registro)
+        texto = json.dumps(lista, indent=2, ensure_ascii=False)
+        huella = hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+        anterior = fragmentos.get(clave)
+        if anterior is None or anterior.get('huella') != huella or not os.path.exists(ruta):
+            ruta_temporal = ruta + ".tmp"
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(ruta_temporal, ruta)
+
+        inicios = [inicio for _, inicio, _, _ in registros if inicio is not None]
+        fines = [fin for _, _, fin, _ in registros if fin is not None]
+        if clave in self._cache:
+            self._bytes_en_cache -= self._tamano(clave)
+            del self._cache[clave]
+        fragmentos[clave] = {
+            'archivo': archivo,
+            'eventos': len(registros),
+            'bytes': len(texto),
+            'huella': huella,
+            'secuencia_min': registros[0][0],
+            'inicio_min': min(inicios) if inicios else None,
+            'inicio_max': max(inicios) if inicios else None,
+            'fin_max': max(fines) if fines else None
+        }
+        self._guardar_en_cache(clave, registros)
+
+    def _nuevo_registro(self, evento):
+        secuencia = self._manifiesto['siguiente_secuencia']
+        self._manifiesto['siguiente_secuencia'] = secuencia + 1
+        evento_dict = evento.a_diccionario()
+        evento_dict['recursos'] = list(evento.recursos)  # No compartir la lista del evento
+        evento_dict['secuencia'] = secuencia
+        return self._registro(evento_dict)
+
+    def guardar_eventos(self, eventos):
+        try:
+            with self._cerrojo:
+                self._manifiesto['siguiente_secuencia'] = 0
+                por_fragmento = OrderedDict()
+                for evento in eventos:
+                    registro = self._nuevo_registro(evento)
+                    por_fragmento.setdefault(self._clave(registro[1]), []).append(registro)
+
+                # Solo se reescriben los fragmentos cuyo contenido cambió
+                for clave in list(self._manifiesto['fragmentos']):
+                    if clave not in por_fragmento:
+                        self._escribir_fragmento(clave, [])
+                for clave, registros in por_fragmento.items():
+                    self._escribir_fragmento(clave, registros)
+                self._guardar_manifiesto()
+
+            print(f"✅ Eventos guardados en {len(por_fragmento)} fragmentos de {self.directorio_datos}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error guardando eventos: {e}")
+            return False
+
+    def registrar_cambios(self, operaciones):
+        with self._cerrojo:
+            modificados = OrderedDict()
+            for operacion, evento in operaciones:
+                if operacion == 'alta':
+                    registro = self._nuevo_registro(evento)
+                    self._modificable(self._clave(registro[1]), modificados).append(registro)
+                elif operacion == 'baja':
+                    self._quitar(evento, modificados)
+                else:
+                    raise ValueError(f"Operación desconocida: {operacion}")
+
+            for clave, registros in modificados.items():
+                self._escribir_fragmento(clave, registros)
+            if modificados:
+                self._guardar_manifiesto()
+            return True
+
+    def _modificable(self, clave, modificados):
+        """Copia de trabajo de un fragmento dentro de registrar_cambios()"""
+        registros = modificados.get(clave)
+        if registros is None:
+            registros = modificados[clave] = list(self._fragmento(clave))
+        return registros
+
+    def _quitar(self, evento, modificados):
+        """Quita el evento con el id del dado; si no está, el primero (por secuencia) con su nombre"""
+        clave = self._clave(evento.inicio_ord)
+        registros = self._modificable(clave, modificados)
+        for i, registro in enumerate(registros):
+            if registro[3].get('id') == evento.id:
+                registros.pop(i)
+                return
+
+        # El evento cambió de fecha después de guardarse (o se guardó sin id):
+        # buscar en todos los fragmentos, por id y si no por nombre
+        candidatos = []
+        for clave in list(self._manifiesto['fragmentos']) + list(modificados):
+            registros = modificados.get(clave)
+            if registros is None:
+                registros = self._fragmento(clave)
+            for registro in registros:
+                if registro[3].get('id') == evento.id:
+                    secuencia = registro[0]
+                    registros = self._modificable(clave, modificados)
+                    registros[:] = [registro for registro in registros if registro[0] != secuencia]
+                    return
+            for registro in registros:
+                if registro[3]['nombre'] == evento.nombre:
+                    candidatos.append((registro[0], clave))
+                    break
+        if candidatos:
+            secuencia, clave = min(candidatos)
+            registros = self._modificable(clave, modificados)
+            registros[:] = [registro for registro in registros if registro[0] != secuencia]
+
+    # LECTURA
+
+    def _iterar_archivo(self, clave):
+        for evento_dict in iterar_arreglo_json(self._ruta(self._manifiesto['fragmentos'][clave]['archivo'])):
+            yield evento_dict.pop('secuencia'), evento_dict
+
+    def iterar_eventos(self):
+        """
+        Mezcla los fragmentos por secuencia. Un fragmento solo se abre cuando
+        la mezcla alcanza su primera secuencia, así que con altas cronológicas
+        apenas hay archivos abiertos a la vez.
+        """
+        with self._cerrojo:
+            fragmentos = self._manifiesto['fragmentos']
+            pendientes = sorted(fragmentos, key=lambda clave: fragmentos[clave]['secuencia_min'],
+                                reverse=True)
+            minimos = {clave: fragmentos[clave]['secuencia_min'] for clave in pendientes}
+
+        monticulo = []  # (secuencia, orden del fragmento, evento_dict, lector)
+
+        while pendientes or monticulo:
+            while pendientes and (not monticulo or minimos[pendientes[-1]] <= monticulo[0][0]):
+                orden = len(pendientes)
+                lector = self._iterar_archivo(pendientes.pop())
+                for secuencia, evento_dict in lector:
+                    heapq.heappush(monticulo, (secuencia, orden, evento_dict, lector))
+                    break
+            if not monticulo:
+                continue
+            _, orden, evento_dict, lector = heapq.heappop(monticulo)
+            yield self._evento_desde_diccionario(evento_dict)
+            for secuencia, evento_dict in lector:
+                heapq.heappush(monticulo, (secuencia, orden, evento_dict, lector))
+                break
+
+    def cargar_eventos(self):
+        if not self._manifiesto['fragmentos']:
+            print(f"ℹ️ No existen fragmentos de eventos en {self.directorio_datos}, se crearán nuevos")
+            return []
+
+        eventos = list(self.iterar_eventos())
+        print(f"✅ {len(eventos)} eventos cargados desde {len(self._manifiesto['fragmentos'])} "
+              f"fragmentos de {self.directorio_datos}")
+        return eventos
+
+    # CONSULTAS (solo se cargan los fragmentos que se solapan)
+
+    def _fragmentos_solapados(self, inicio_ordinal, fin_ordinal, campo_fin='fin_max'):
+        return [
+            clave for clave, datos in self._manifiesto['fragmentos'].items()
+            if datos['inicio_min'] is not None and datos[campo_fin] is not None
+            and datos['inicio_min'] <= fin_ordinal and datos[campo_fin] >= inicio_ordinal
+        ]
+
+    def buscar_por_rango_fechas(self, inicio_ordinal, fin_ordinal):
+        with self._cerrojo:
+            resultados = []
+            for clave in self._fragmentos_solapados(inicio_ordinal, fin_ordinal):
+                resultados.extend(
+                    registro for registro in self._fragmento(clave)
+                    if registro[1] is not None and registro[2] is not None
+                    and registro[1] <= fin_ordinal and registro[2] >= inicio_ordinal
+                )
+        resultados.sort(key=lambda registro: registro[0])
+        return [self._evento(registro[3]) for registro in resultados]
+
+    def buscar_por_inicio(self, desde_ordinal, hasta_ordinal):
+        with self._cerrojo:
+            resultados = []
+            for clave in self._fragmentos_solapados(desde_ordinal, hasta_ordinal, 'inicio_max'):
+                resultados.extend(
+                    registro for registro in self._fragmento(clave)
+                    if registro[1] is not None and desde_ordinal <= registro[1] <= hasta_ordinal
+                )
+        resultados.sort(key=lambda registro: (registro[1], registro[0]))
+        return [self._evento(registro[3]) for registro in resultados]
+
+    def contar_eventos_por_mes(self):
+        if self.particion != "mes":
+            return None
+        # Cada fragmento es un mes: el manifiesto ya tiene el conteo
+        with self._cerrojo:
+            meses = sorted(
+                (datos['secuencia_min'], clave, datos['eventos'])
+                for clave, datos in self._manifiesto['fragmentos'].items()
+                if clave != CLAVE_SIN_FECHA
+            )
+        return {clave: cantidad for _, clave, cantidad in meses}
+
+    # ARCHIVOS
+
+    def archivos_exportables(self):
+        return [ARCHIVO_MANIFIESTO] + [
+            datos['archivo'] for datos in self._manifiesto['fragmentos'].values()
+        ]
+
+    def archivos_en(self, directorio):
+        manifiesto = self._leer_manifiesto(directorio)
+        if manifiesto is None:
+            return []
+        return [ARCHIVO_MANIFIESTO] + [datos['archivo'] for datos in manifiesto['fragmentos'].values()]
+
+    def tras_importar(self):
+        with self._cerrojo:
+            anteriores = set(self.archivos_exportables())
+            self._manifiesto = self._leer_manifiesto(self.directorio_datos) or \
+                self._manifiesto_vacio(self.particion)
+            self._vaciar_cache()
+            # Fragmentos locales que el almacén importado no tiene
+            for archivo in anteriores.difference(self.archivos_exportables()):
+                ruta = self._ruta(archivo)
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+
+    def limpiar(self):
+        with self._cerrojo:
+            eliminados = super().limpiar()
+            self._manifiesto = self._manifiesto_vacio(self.particion)
+            self._vaciar_cache()
+            return eliminados
@@ -0,0 +1,238 @@
+# nucleo/backend_sqlite.py
+import sqlite3
+import threading
+from datetime import date
+from modelos.evento import Evento
+from nucleo.backend import BackendAlmacenamiento
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT,
+    nombre TEXT NOT NULL,
+    inicio TEXT NOT NULL,
+    fin TEXT NOT NULL,
+    inicio_ord INTEGER,
+    fin_ord INTEGER,
+    mes TEXT
+);
+CREATE TABLE IF NOT EXISTS recursos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS evento_recurso (
+    evento_id INTEGER NOT NULL,
+    posicion INTEGER NOT NULL,
+    recurso_id INTEGER NOT NULL,
+    PRIMARY KEY (evento_id, posicion)
+);
+CREATE INDEX IF NOT EXISTS idx_eventos_inicio ON eventos (inicio_ord);
+CREATE INDEX IF NOT EXISTS idx_eventos_fin ON eventos (fin_ord);
+CREATE INDEX IF NOT EXISTS idx_eventos_nombre ON eventos (nombre);
+CREATE INDEX IF NOT EXISTS idx_eventos_mes ON eventos (mes);
+CREATE INDEX IF NOT EXISTS idx_evento_recurso_recurso ON evento_recurso (recurso_id);
+"""
+
+TAMANO_LECTURA = 500  # Filas leídas por cada fetchmany
+
+
+class BackendSQLite(BackendAlmacenamiento):
+    """Almacena los eventos en SQLite con columnas de fecha y recurso indexadas"""
+
+    nombre = "sqlite"
+    incremental = True
+    consultable = True
+
+    def __init__(self, directorio_datos, nombre_archivo="eventos.db"):
+        super().__init__(directorio_datos)
+        self.nombre_archivo = nombre_archivo
+        self._cerrojo = threading.RLock()
+        self._conexion = None
+        self._abrir()
+
+    def _abrir(self):
+        """Abre la base de datos y crea el esquema si hace falta"""
+        self._conexion = sqlite3.connect(self._ruta(self.nombre_archivo), check_same_thread=False)
+        self._conexion.executescript(ESQUEMA)
+        self._migrar()
+        self._ids_recursos = dict(
+            (nombre, id_recurso)
+            for id_recurso, nombre in self._conexion.execute("SELECT id, nombre FROM recursos")
+        )
+
+    def _migrar(self):
+        """Agrega la columna uid (id del Evento) a las bases creadas sin ella"""
+        columnas = [fila[1] for fila in self._conexion.execute("PRAGMA table_info(eventos)")]
+        if 'uid' not in columnas:
+            with self._conexion:
+                self._conexion.execute("ALTER TABLE eventos ADD COLUMN uid TEXT")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_eventos_uid ON eventos (uid)")
+
+    def _id_recurso(self, nombre):
+        """Devuelve el id de un recurso, dándolo de alta si no existe"""
+        id_recurso = self._ids_recursos.get(nombre)
+        if id_recurso is None:
+            cursor = self._conexion.execute("INSERT INTO recursos (nombre) VALUES (?)", (nombre,))
+            id_recurso = cursor.lastrowid
+            self._ids_recursos[nombre] = id_recurso
+        return id_recurso
+
+    def _insertar(self, evento):
+        inicio_ord = evento.inicio_ord
+        mes = None
+        if inicio_ord is not None:
+            inicio_dt = date.fromordinal(inicio_ord)
+            mes = f"{inicio_dt.year}-{inicio_dt.month:02d}"
+
+        cursor = self._conexion.execute(
+            "INSERT INTO eventos (uid, nombre, inicio, fin, inicio_ord, fin_ord, mes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (evento.id, evento.nombre, evento.inicio, evento.fin,
+             inicio_ord, evento.fin_ord, mes)
+        )
+        evento_id = cursor.lastrowid
+        self._conexion.executemany(
+            "INSERT INTO evento_recurso (evento_id, posicion, recurso_id) VALUES (?, ?, ?)",
+            [(evento_id, posicion, self._id_recurso(recurso))
+             for posicion, recurso in enumerate(evento.recursos)]
+        )
+
+    def _eliminar(self, evento):
+        """Elimina la fila del evento por su id (o la primera con su nombre, si se guardó sin id)"""
+        fila = self._conexion.execute(
+            "SELECT MIN(id) FROM eventos WHERE uid = ?", (evento.id,)
+        ).fetchone()
+        if not fila or fila[0] is None:
+            fila = self._conexion.execute(
+                "SELECT MIN(id) FROM eventos WHERE uid IS NULL AND nombre = ?", (evento.nombre,)
+            ).fetchone()
+        if fila and fila[0] is not None:
+            self._conexion.execute("DELETE FROM evento_recurso WHERE evento_id = ?", (fila[0],))
+            self._conexion.execute("DELETE FROM eventos WHERE id = ?", (fila[0],))
+
+    def _iterar_consulta(self, condicion="1", parametros=()):
+        """Genera los eventos que cumplen una condición SQL sobre la tabla eventos"""
+        with self._cerrojo:
+            cursor = self._conexion.execute(
+                "SELECT e.id, e.uid, e.nombre, e.inicio, e.fin, r.nombre "
+                "FROM eventos e "
+                "LEFT JOIN evento_recurso er ON er.evento_id = e.id "
+                "LEFT JOIN recursos r ON r.id = er.recurso_id "
+                "WHERE " + condicion + " "
+                "ORDER BY e.id, er.posicion",
+                parametros
+            )
+
+        # El evento se construye con su lista completa (la máscara se calcula una vez)
+        actual = None
+        id_actual = None
+        while True:
+            with self._cerrojo:
+                filas = cursor.fetchmany(TAMANO_LECTURA)
+            if not filas:
+                break
+            for evento_id, uid, nombre, inicio, fin, recurso in filas:
+                if evento_id != id_actual:
+                    if actual is not None:
+                        yield Evento(*actual)
+                    if uid is None:
+                        self.eventos_sin_id += 1
+                    actual = (nombre, inicio, fin, [], False, uid)
+                    id_actual = evento_id
+                if recurso is not None:
+                    actual[3].append(recurso)
+
+        if actual is not None:
+            yield Evento(*actual)
+
+    def _consultar_eventos(self, condicion="1", parametros=()):
+        """Materializa los eventos que cumplen una condición SQL"""
+        return list(self._iterar_consulta(condicion, parametros))
+
+    def iterar_eventos(self):
+        return self._iterar_consulta()
+
+    def cargar_eventos(self):
+        eventos = self._consultar_eventos()
+        print(f"✅ {len(eventos)} eventos cargados desde {self._ruta(self.nombre_archivo)}")
+        return eventos
+
+    def guardar_eventos(self, eventos):
+        with self._cerrojo:
+            with self._conexion:
+                self._conexion.execute("DELETE FROM evento_recurso")
+                self._conexion.execute("DELETE FROM eventos")
+                for evento in eventos:
+                    self._insertar(evento)
+        print(f"✅ Eventos guardados en {self._ruta(self.nombre_archivo)}")
+        return True
+
+    def registrar_cambios(self, operaciones):
+        with self._cerrojo:
+            with self._conexion:
+                for operacion, evento in operaciones:
+                    if operacion == 'alta':
+                        self._insertar(evento)
+                    elif operacion == 'baja':
+                        self._eliminar(evento)
+                    else:
+                        raise ValueError(f"Operación desconocida: {operacion}")
+        return True
+
+    def archivos_exportables(self):
+        return [self.nombre_archivo]
+
+    def cerrar(self):
+        with self._cerrojo:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+    def tras_importar(self):
+        self._abrir()
+
+    def limpiar(self):
+        self.cerrar()
+        eliminados = super().limpiar()
+        self._abrir()
+        return eliminados
+
+    # CONSULTAS DELEGADAS
+
+    def buscar_por_rango_fechas(self, inicio_ordinal, fin_ordinal):
+        with self._cerrojo:
+            return self._consultar_eventos(
+                "e.inicio_ord <= ? AND e.fin_ord >= ?", (fin_ordinal, inicio_ordinal)
+            )
+
+    def buscar_por_inicio(self, desde_ordinal, hasta_ordinal):
+        with self._cerrojo:
+            eventos = self._consultar_eventos(
+                "e.inicio_ord BETWEEN ? AND ?", (desde_ordinal, hasta_ordinal)
+            )
+        eventos.sort(key=lambda evento: evento.inicio_ord)
+        return eventos
+
+    def buscar_por_recurso(self, texto_recurso):
+        # El vocabulario de recursos es pequeño: se filtra en Python para que
+        # la comparación sin mayúsculas funcione igual que en el Buscador
+        with self._cerrojo:
+            ids = [id_recurso for nombre, id_recurso in self._ids_recursos.items()
+                   if texto_recurso in nombre.lower()]
+            if not ids:
+                return []
+
+            marcadores = ", ".join("?" * len(ids))
+            return self._consultar_eventos(
+                "e.id IN (SELECT evento_id FROM evento_recurso "
+                "WHERE recurso_id IN (" + marcadores + "))",
+                ids
+            )
+
+    def contar_eventos_por_mes(self):
+        with self._cerrojo:
+            filas = self._conexion.execute(
+                "SELECT mes, COUNT(*) FROM eventos WHERE mes IS NOT NULL "
+                "GROUP BY mes ORDER BY MIN(id)"
+            ).fetchall()
+        return dict(filas)
@@ -1,15 +1,47 @@
 # nucleo/buscador.py
-from datetime import datetime
+import heapq
+from datetime import date
+from modelos.evento import fecha_a_ordinal
+from modelos.recurso import Recurso
+from nucleo.columnar import SnapshotColumnar
+from nucleo import informes
 
 class Buscador:
-    """Clase para buscar y filtrar eventos en el calendario imperial"""
+    """
+    Clase para buscar y filtrar eventos en el calendario imperial.
+    
+    Trabaja con los ordinales de día que cada Evento calcula una sola vez
+    (inicio_ord, fin_ord; None si la fecha no es válida) en lugar de volver
+    a analizar las fechas en cada consulta, y con su máscara de recursos
+    (mascara_recursos) para resolver las búsquedas por recurso con una sola
+    operación de bits por evento.
+    """
+    
+    @staticmethod
+    def _ahora():
+        """
+        Ordinal de hoy y si ya pasó la medianoche: una fecha sin hora equivale
+        a las 00:00, así que comparada con datetime.now() el propio día de hoy
+        ya es "pasado" salvo exactamente a medianoche
+        """
+        return informes.momento_actual()
     
     @staticmethod
-    def buscar_por_nombre(eventos, texto_busqueda):
-        """Busca eventos que contengan el texto en el nombre"""
+    def buscar_por_nombre(eventos, texto_busqueda, indice=None):
+        """
+        Busca eventos que contengan el texto en el nombre
+        
+        Con un IndiceTrigramas de esos mismos eventos, solo se comprueban los
+        nombres que contienen todos los trigramas del texto
+        """
         if not texto_busqueda:
             return eventos
         
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.buscar_por_nombre(texto_busqueda)
+        if indice is not None:
+            return indice.buscar(texto_busqueda)
+        
         texto_busqueda = texto_busqueda.lower()
         resultados = []
         
@@ -20,86 +52,102 @@ class Buscador:
         return resultados
     
     @staticmethod
-    def buscar_por_recurso(eventos, nombre_recurso):
-        """Busca eventos que usen un recurso específico"""
+    def buscar_por_recurso(eventos, nombre_recurso, indice=None):
+        """
+        Busca eventos que usen un recurso específico
+        
+        Con un IndiceRecursos de esos mismos eventos, el texto se compara solo
+        con el vocabulario de recursos y se unen sus listas de eventos
+        """
         if not nombre_recurso:
             return eventos
         
-        nombre_recurso = nombre_recurso.lower()
-        resultados = []
-        
-        for evento in eventos:
-            for recurso in evento.recursos:
-                if nombre_recurso in recurso.lower():
-                    resultados.append(evento)
-                    break  # Solo agregar una vez
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.buscar_por_recurso(nombre_recurso)
+        if indice is not None:
+            return indice.buscar(nombre_recurso)
         
-        return resultados
+        # Todos los recursos cuyo nombre contiene el texto, en una sola máscara
+        mascara = Recurso.mascara_coincidentes(nombre_recurso)
+        if not mascara:
+            return []
+        return [evento for evento in eventos if evento.mascara_recursos & mascara]
     
     @staticmethod
-    def buscar_por_fecha(eventos, fecha):
-        """Busca eventos que ocurran en una fecha específica"""
+    def buscar_por_recursos(eventos, nombres_recursos, indice=None):
+        """Busca eventos que usen alguno de los recursos indicados (nombres exactos)"""
+        if indice is not None:
+            return indice.con_recursos(nombres_recursos)
+        mascara = Recurso.mascara(nombres_recursos, registrar=False)
+        if not mascara:
+            return []
+        return [evento for evento in eventos if evento.mascara_recursos & mascara]
+    
+    @staticmethod
+    def buscar_por_fecha(eventos, fecha, indice=None):
+        """
+        Busca eventos que ocurran en una fecha específica
+        
+        Con un IndiceFechas de esos mismos eventos, la consulta no recorre la lista
+        """
         if not fecha:
             return eventos
         
-        try:
-            fecha_busqueda = datetime.strptime(fecha, "%d/%m/%Y")
-            resultados = []
-            
-            for evento in eventos:
-                try:
-                    evento_inicio = datetime.strptime(evento.inicio, "%d/%m/%Y")
-                    evento_fin = datetime.strptime(evento.fin, "%d/%m/%Y")
-                    
-                    if evento_inicio <= fecha_busqueda <= evento_fin:
-                        resultados.append(evento)
-                        
-                except ValueError:
-                    continue  # Si hay error en formato de fecha, saltar este evento
-            
-            return resultados
-            
-        except ValueError:
+        fecha_busqueda = fecha_a_ordinal(fecha)
+        if fecha_busqueda is None:
             print("⚠️ Formato de fecha incorrecto. Use DD/MM/AAAA")
             return []
+        
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.buscar_por_fecha(fecha_busqueda)
+        if indice is not None:
+            return indice.en_fecha(fecha_busqueda)
+        
+        resultados = []
+        for evento in eventos:
+            # Si hay error en formato de fecha (ordinal None), saltar este evento
+            if evento.inicio_ord is not None and evento.fin_ord is not None:
+                if evento.inicio_ord <= fecha_busqueda <= evento.fin_ord:
+                    resultados.append(evento)
+        
+        return resultados
     
     @staticmethod
-    def buscar_por_rango_fechas(eventos, fecha_inicio, fecha_fin):
-        """Busca eventos dentro de un rango de fechas"""
-        try:
-            fecha_inicio_dt = datetime.strptime(fecha_inicio, "%d/%m/%Y")
-            fecha_fin_dt = datetime.strptime(fecha_fin, "%d/%m/%Y")
-            
-            resultados = []
-            
-            for evento in eventos:
-                try:
-                    evento_inicio = datetime.strptime(evento.inicio, "%d/%m/%Y")
-                    evento_fin = datetime.strptime(evento.fin, "%d/%m/%Y")
-                    
-                    # Verificar si hay superposición de fechas
-                    if (evento_inicio <= fecha_fin_dt and evento_fin >= fecha_inicio_dt):
-                        resultados.append(evento)
-                        
-                except ValueError:
-                    continue
-            
-            return resultados
-            
-        except ValueError:
+    def buscar_por_rango_fechas(eventos, fecha_inicio, fecha_fin, indice=None):
+        """Busca eventos dentro de un rango de fechas (con indice, sin recorrer la lista)"""
+        fecha_inicio_ord = fecha_a_ordinal(fecha_inicio)
+        fecha_fin_ord = fecha_a_ordinal(fecha_fin)
+        if fecha_inicio_ord is None or fecha_fin_ord is None:
             print("⚠️ Formato de fecha incorrecto. Use DD/MM/AAAA")
             return []
+        
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.buscar_por_rango_fechas(fecha_inicio_ord, fecha_fin_ord)
+        if indice is not None:
+            return indice.solapados(fecha_inicio_ord, fecha_fin_ord)
+        
+        resultados = []
+        for evento in eventos:
+            if evento.inicio_ord is None or evento.fin_ord is None:
+                continue
+            
+            # Verificar si hay superposición de fechas
+            if evento.inicio_ord <= fecha_fin_ord and evento.fin_ord >= fecha_inicio_ord:
+                resultados.append(evento)
+        
+        return resultados
     
     @staticmethod
-    def ordenar_por_fecha(eventos, ascendente=True):
-        """Ordena eventos por fecha de inicio"""
+    def ordenar_por_fecha(eventos, ascendente=True, indice=None):
+        """Ordena eventos por fecha de inicio (con indice, sin ordenar de nuevo)"""
+        if indice is not None:
+            return indice.ordenados(ascendente)
+        
         eventos_ordenados = eventos.copy()
         
         def obtener_fecha(evento):
-            try:
-                return datetime.strptime(evento.inicio, "%d/%m/%Y")
-            except ValueError:
-                return datetime.min  # Fecha muy antigua para errores
+            # Fecha muy antigua (0 es anterior a cualquier ordinal) para errores
+            return evento.inicio_ord or 0
         
         eventos_ordenados.sort(key=obtener_fecha, reverse=not ascendente)
         return eventos_ordenados
@@ -112,86 +160,145 @@ class Buscador:
         return eventos_ordenados
     
     @staticmethod
-    def eventos_proximos(eventos, dias=7):
+    def _pagina(eventos, tamano, cursor, ascendente, valor):
+        """
+        Página por (valor, id) sin índice: un montículo con los tamano + 1
+        primeros posteriores al cursor, en O(n log tamano) y memoria O(tamano)
+        """
+        def clave(evento):
+            return (valor(evento), evento.id)
+        
+        if cursor is not None:
+            cursor = tuple(cursor)
+            if ascendente:
+                eventos = (evento for evento in eventos if clave(evento) > cursor)
+            else:
+                eventos = (evento for evento in eventos if clave(evento) < cursor)
+        seleccionar = heapq.nsmallest if ascendente else heapq.nlargest
+        primeros = seleccionar(tamano + 1, eventos, key=clave)
+        pagina = primeros[:tamano]
+        siguiente = clave(pagina[-1]) if pagina and len(primeros) > tamano else None
+        return pagina, siguiente
+    
+    @staticmethod
+    def pagina_por_fecha(eventos, tamano, cursor=None, ascendente=True, indice=None):
+        """
+        Una página de eventos ordenados por fecha de inicio, sin ordenar la lista
+        
+        Los empates se desempatan por id para que el cursor (inicio, id) del
+        último evento de la página sea estable aunque cambien los eventos. Con
+        el IndiceFechas de esos eventos cuesta O(log n + tamano)
+        
+        Returns:
+            tuple: (eventos, cursor para pedir la página siguiente o None si no hay más)
+        """
+        if indice is not None:
+            return indice.pagina(tamano, cursor, ascendente)
+        return Buscador._pagina(eventos, tamano, cursor, ascendente,
+                                lambda evento: evento.inicio_ord or 0)
+    
+    @staticmethod
+    def pagina_por_nombre(eventos, tamano, cursor=None, ascendente=True, indice=None):
+        """
+        Una página de eventos ordenados por nombre, con cursor (nombre, id)
+        
+        Con el IndiceOrdenNombres de esos eventos cuesta O(log n + tamano)
+        """
+        if indice is not None:
+            return indice.pagina(tamano, cursor, ascendente)
+        return Buscador._pagina(eventos, tamano, cursor, ascendente,
+                                lambda evento: evento.nombre.lower())
+    
+    @staticmethod
+    def eventos_proximos(eventos, dias=7, indice=None):
         """Encuentra eventos que comienzan en los próximos N días"""
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.eventos_proximos(dias)
+        
         resultados = []
-        hoy = datetime.now()
+        hoy, desfase = Buscador._ahora()
+        if indice is not None:
+            # Ya vienen por inicio, es decir, por proximidad
+            return indice.inician_entre(hoy + desfase, hoy + desfase + dias)
         
         for evento in eventos:
-            try:
-                evento_inicio = datetime.strptime(evento.inicio, "%d/%m/%Y")
-                diferencia = (evento_inicio - hoy).days
-                
-                if 0 <= diferencia <= dias:
-                    resultados.append((evento, diferencia))
-                    
-            except ValueError:
+            if evento.inicio_ord is None:
                 continue
+            
+            # Igual que (inicio - datetime.now()).days
+            diferencia = evento.inicio_ord - hoy - desfase
+            if 0 <= diferencia <= dias:
+                resultados.append((evento, diferencia))
         
         # Ordenar por proximidad
         resultados.sort(key=lambda x: x[1])
         return [evento for evento, _ in resultados]
     
     @staticmethod
-    def eventos_pasados(eventos):
+    def eventos_pasados(eventos, indice=None):
         """Encuentra eventos que ya han terminado"""
-        resultados = []
-        hoy = datetime.now()
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.eventos_pasados()
         
-        for evento in eventos:
-            try:
-                evento_fin = datetime.strptime(evento.fin, "%d/%m/%Y")
-                
-                if evento_fin < hoy:
-                    resultados.append(evento)
-                    
-            except ValueError:
-                continue
+        hoy, desfase = Buscador._ahora()
+        if indice is not None:
+            return indice.terminados_antes(hoy + desfase)
         
-        return resultados
+        # fin < ahora
+        return [
+            evento for evento in eventos
+            if evento.fin_ord is not None and evento.fin_ord < hoy + desfase
+        ]
     
     @staticmethod
-    def eventos_en_curso(eventos):
+    def eventos_en_curso(eventos, indice=None):
         """Encuentra eventos que están en curso actualmente"""
-        resultados = []
-        hoy = datetime.now()
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.eventos_en_curso()
         
-        for evento in eventos:
-            try:
-                evento_inicio = datetime.strptime(evento.inicio, "%d/%m/%Y")
-                evento_fin = datetime.strptime(evento.fin, "%d/%m/%Y")
-                
-                if evento_inicio <= hoy <= evento_fin:
-                    resultados.append(evento)
-                    
-            except ValueError:
-                continue
+        hoy, desfase = Buscador._ahora()
         
-        return resultados
+        # inicio <= ahora <= fin
+        if indice is not None:
+            return indice.solapados(hoy + desfase, hoy)
+        return [
+            evento for evento in eventos
+            if evento.inicio_ord is not None and evento.fin_ord is not None
+            and evento.inicio_ord <= hoy and evento.fin_ord >= hoy + desfase
+        ]
     
     @staticmethod
     def contar_eventos_por_mes(eventos):
         """Cuenta cuántos eventos hay por mes"""
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.contar_eventos_por_mes()
+        
         conteo = {}
+        meses = {}  # ordinal -> clave del mes, para no recalcularla por evento
         
         for evento in eventos:
-            try:
-                evento_inicio = datetime.strptime(evento.inicio, "%d/%m/%Y")
-                mes_key = f"{evento_inicio.year}-{evento_inicio.month:02d}"
-                
-                if mes_key in conteo:
-                    conteo[mes_key] += 1
-                else:
-                    conteo[mes_key] = 1
-                    
-            except ValueError:
+            ordinal = evento.inicio_ord
+            if ordinal is None:
                 continue
+            
+            mes_key = meses.get(ordinal)
+            if mes_key is None:
+                dia = date.fromordinal(ordinal)
+                mes_key = meses[ordinal] = f"{dia.year}-{dia.month:02d}"
+            
+            if mes_key in conteo:
+                conteo[mes_key] += 1
+            else:
+                conteo[mes_key] = 1
         
         return conteo
     
     @staticmethod
     def estadisticas_recursos(eventos):
         """Genera estadísticas de uso de recursos"""
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.estadisticas_recursos()
+        
         estadisticas = {}
         
         for evento in eventos:
@@ -207,6 +314,9 @@ class Buscador:
     @staticmethod
     def filtrar_por_cantidad_recursos(eventos, min_recursos=0, max_recursos=None):
         """Filtra eventos por cantidad de recursos asignados"""
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.filtrar_por_cantidad_recursos(min_recursos, max_recursos)
+        
         resultados = []
         
         for evento in eventos:
@@ -221,19 +331,24 @@ class Buscador:
     @staticmethod
     def buscar_eventos_sin_recursos(eventos):
         """Encuentra eventos que no tienen recursos asignados"""
+        if isinstance(eventos, SnapshotColumnar):
+            return eventos.buscar_eventos_sin_recursos()
         return [evento for evento in eventos if len(evento.recursos) == 0]
     
     @staticmethod
-    def generar_informe(eventos):
-        """Genera un informe completo de todos los eventos"""
-        informe = {
-            'total_eventos': len(eventos),
-            'eventos_proximos_7_dias': len(Buscador.eventos_proximos(eventos, 7)),
-            'eventos_en_curso': len(Buscador.eventos_en_curso(eventos)),
-            'eventos_pasados': len(Buscador.eventos_pasados(eventos)),
-            'eventos_sin_recursos': len(Buscador.buscar_eventos_sin_recursos(eventos)),
-            'estadisticas_recursos': Buscador.estadisticas_recursos(eventos),
-            'conteo_por_mes': Buscador.contar_eventos_por_mes(eventos)
-        }
+    def generar_informe(eventos, motor=None):
+        """
+        Genera un informe completo de todos los eventos en una sola pasada
+        
+        Las claves las ponen los agregadores del motor (por defecto
+        informes.motor_predeterminado, al que se pueden registrar otros)
+        """
+        motor = motor or informes.motor_predeterminado
+        if isinstance(eventos, SnapshotColumnar):
+            # Las claves predeterminadas salen de las columnas, sin crear Eventos;
+            # solo los agregadores registrados aparte recorren los eventos
+            informe = eventos.generar_informe()
+            informe.update(motor.generar(eventos, omitir=informe))
+            return informe
         
-        return informe
\ No newline at end of file
+        return motor.generar(eventos)
\ No newline at end of file
@@ -1,53 +1,364 @@
 # nucleo/calendario.py - VERSIÓN COMPLETA
 import os
 import json
-from modelos.evento import Evento
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from modelos.evento import Evento, nuevo_id
+from modelos.recurso import Recurso
+from modelos.restricciones import ARCHIVO_RESTRICCIONES, Restricciones
 from nucleo.persistencia import Persistencia
 from nucleo.buscador import Buscador
+from nucleo.columnar import SnapshotColumnar
+from nucleo.consulta import Consulta
+from nucleo import informes
+from nucleo.indice_fechas import IndiceFechas
+from nucleo.indice_recursos import IndiceRecursos
+from nucleo.indice_trigramas import IndiceTrigramas
+from nucleo.indice_orden_nombres import IndiceOrdenNombres
+
+# Agregadores del informe cuyas claves salen de los contadores de los índices
+_MATERIALIZADOS = {fabrica.clave: fabrica for fabrica in informes.AGREGADORES_PREDETERMINADOS}
 
 class Calendario:
     """Clase principal para gestionar el calendario imperial"""
     
-    def __init__(self, directorio_datos="datos"):
+    def __init__(self, directorio_datos="datos", persistencia=None, solo_lectura=False,
+                 carga_diferida=False, bajo_demanda=False):
+        self._carga = None  # Future de la carga en segundo plano, si está en curso
+        # Bajo demanda, los eventos no se leen al abrir: las consultas que el
+        # backend sabe resolver (sqlite, particionado) se le envían, y el primer
+        # uso que necesita la lista completa (altas, bajas, informe...) la carga
+        self._sin_cargar = False
+        self._indice_fechas = None  # IndiceFechas de self._eventos (no en solo lectura)
+        self._indice_recursos = None  # IndiceRecursos de self._eventos (no en solo lectura)
+        self._orden_nombres = None  # IndiceOrdenNombres de self._eventos (no en solo lectura)
+        # Índices por id (None en solo lectura). self._eventos puede tener
+        # huecos (None) en el lugar de los eliminados, para que eliminar no
+        # desplace la lista. Las consultas los saltan (self._vivos()); la lista
+        # se compacta si los huecos llegan a la mitad, al confirmar un lote, al
+        # guardar o al pedir la lista completa con self.eventos
+        self._por_id = None  # {id: evento}
+        self._posiciones = None  # {id: posición en self._eventos}
+        self._ids_por_nombre = None  # {nombre: {id: None}}, en orden del calendario
+        self._huecos = 0
+        # Índice de trigramas de los nombres: se construye con la primera
+        # búsqueda por nombre y desde entonces se mantiene en cada alta y baja
+        self._indice_nombres = None
         self.eventos = []
         self.directorio_datos = directorio_datos
+        self._operaciones_lote = None  # Mutaciones pendientes dentro de lote()
+        
+        # En solo lectura los eventos son un SnapshotColumnar mapeado en memoria
+        # (eventos.col): varios procesos comparten sus páginas y las búsquedas
+        # no construyen un Evento por cada registro
+        self.solo_lectura = solo_lectura
         
-        # Inicializar componentes
-        self.persistencia = Persistencia(directorio_datos=directorio_datos)
+        # Inicializar componentes (se admite una persistencia ya configurada,
+        # por ejemplo Persistencia(directorio, diario=True) o backend="sqlite")
+        self.persistencia = persistencia or Persistencia(directorio_datos=directorio_datos)
         self.buscador = Buscador()
         
-        # Cargar eventos al iniciar
-        self.cargar_eventos()
+        # Reglas entre recursos (restricciones.json), comprobadas al agregar eventos
+        self.restricciones = Restricciones.cargar(directorio_datos)
+        
+        # Cargar eventos al iniciar (o en un hilo, si la carga es diferida:
+        # el primer acceso a self.eventos espera a que termine)
+        if bajo_demanda and self.persistencia.consultable and not solo_lectura:
+            self._sin_cargar = True
+        elif carga_diferida:
+            self.cargar_eventos_en_segundo_plano()
+        else:
+            self.cargar_eventos()
+    
+    @property
+    def eventos(self):
+        """Lista de eventos; si hay una carga en segundo plano, espera a que termine"""
+        if self._carga is not None:
+            self.esperar_carga()
+        if self._sin_cargar:
+            self.cargar_eventos()
+        if self._huecos:
+            self._compactar()
+        return self._eventos
+    
+    @eventos.setter
+    def eventos(self, eventos):
+        if self._carga is not None:
+            self.esperar_carga()
+        self._eventos = eventos
+        self._huecos = 0
+        self._sin_cargar = False
+        self._indexar()
+    
+    def _vivos(self):
+        """
+        Eventos actuales sin compactar la lista: la propia lista si no tiene
+        huecos o, si los tiene, un generador que los salta
+        """
+        eventos = self._lista()
+        if not self._huecos:
+            return eventos
+        return (evento for evento in eventos if evento is not None)
+    
+    def asentar_indices(self):
+        """
+        Hace ya el trabajo que las altas y bajas dejan para la próxima consulta
+        (quitar los huecos de la lista, corregir los contadores del informe).
+        Después, y hasta la siguiente escritura, las consultas solo leen el
+        calendario: varios hilos pueden hacerlas a la vez.
+        """
+        self._lista()
+        if self._huecos:
+            self._compactar()
+        for indice in (self._indice_fechas, self._indice_recursos):
+            if indice is not None:
+                indice.asentar()
+    
+    def total_eventos(self):
+        """Cantidad de eventos del calendario"""
+        return len(self._lista()) - self._huecos
+    
+    @property
+    def en_memoria(self):
+        """Indica si los eventos ya están cargados (False en un calendario bajo demanda sin usar)"""
+        return not self._sin_cargar
+    
+    def _indexar(self):
+        """Reconstruye los índices (fechas, id y nombre) de los eventos actuales"""
+        if isinstance(self._eventos, SnapshotColumnar):
+            # El snapshot resuelve sus propias consultas
+            self._indice_fechas = self._indice_recursos = self._indice_nombres = None
+            self._orden_nombres = None
+            self._por_id = self._posiciones = self._ids_por_nombre = None
+            return
+        
+        if self._huecos:
+            self._eventos[:] = [evento for evento in self._eventos if evento is not None]
+            self._huecos = 0
+        self._por_id = {}
+        self._posiciones = {}
+        self._ids_por_nombre = {}
+        for posicion, evento in enumerate(self._eventos):
+            self._registrar(evento, posicion)
+        self._indice_fechas = IndiceFechas(self._eventos)
+        self._indice_recursos = IndiceRecursos(self._eventos)
+        self._orden_nombres = IndiceOrdenNombres(self._eventos)
+        self._indice_nombres = None  # Se reconstruirá con la próxima búsqueda por nombre
+    
+    def _registrar(self, evento, posicion):
+        """Da de alta un evento en los índices por id y por nombre"""
+        if self._por_id.get(evento.id, evento) is not evento:
+            evento.id = nuevo_id()  # Otro evento ya tiene ese id (p. ej. datos duplicados)
+        self._por_id[evento.id] = evento
+        self._posiciones[evento.id] = posicion
+        self._ids_por_nombre.setdefault(evento.nombre, {})[evento.id] = None
+    
+    def _desregistrar(self, evento):
+        del self._por_id[evento.id]
+        del self._posiciones[evento.id]
+        ids = self._ids_por_nombre[evento.nombre]
+        del ids[evento.id]
+        if not ids:
+            del self._ids_por_nombre[evento.nombre]
+    
+    def _compactar(self):
+        """Quita los huecos de los eventos eliminados, conservando el orden"""
+        self._eventos[:] = [evento for evento in self._eventos if evento is not None]
+        self._posiciones = {evento.id: posicion for posicion, evento in enumerate(self._eventos)}
+        self._huecos = 0
+    
+    def _lista(self):
+        """
+        Lista interna de eventos (con huecos), con los índices al día aunque
+        la lista se haya modificado por fuera del calendario
+        """
+        if self._carga is not None:
+            self.esperar_carga()
+        if self._sin_cargar:
+            self.cargar_eventos()
+        if self._por_id is not None and len(self._por_id) != len(self._eventos) - self._huecos:
+            self._indexar()
+        return self._eventos
+    
+    def _indice(self):
+        """
+        Índice de fechas, reconstruido si la lista se modificó por fuera del
+        calendario (carga los eventos si aún no lo están)
+        """
+        self._lista()
+        return self._indice_fechas
+    
+    def _indice_trigramas(self):
+        """Índice de trigramas de los nombres (None en solo lectura), creado al primer uso"""
+        eventos = self._lista()
+        if self._indice_nombres is None and self._por_id is not None:
+            self._indice_nombres = IndiceTrigramas(evento for evento in eventos if evento is not None)
+        return self._indice_nombres
     
     def agregar_evento(self, evento):
         """Agrega un evento al calendario"""
+        self._verificar_escritura()
+        
         # Validar que sea un Evento
         if not isinstance(evento, Evento):
             raise TypeError("Solo se pueden agregar objetos Evento")
+        
+        # Validar co-requisitos y exclusiones de sus recursos (lanza ValueError)
+        self.restricciones.validar(evento)
             
-        # Agregar evento
-        self.eventos.append(evento)
+        # Agregar evento (si su id ya está en uso por otro evento, recibe uno nuevo)
+        eventos = self._lista()
+        if self._por_id.get(evento.id) is evento:
+            raise ValueError(f"El evento '{evento.nombre}' ya está en el calendario")
+        self._registrar(evento, len(eventos))
+        eventos.append(evento)
+        self._indice_fechas.agregar(evento)
+        self._indice_recursos.agregar(evento)
+        self._orden_nombres.agregar(evento)
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(evento)
         
         # Guardar automáticamente
-        self.guardar_eventos()
+        self._persistir_cambios([('alta', evento)])
         
         return True
     
     def eliminar_evento(self, nombre_evento):
-        """Elimina un evento por nombre"""
-        for i, evento in enumerate(self.eventos):
-            if evento.nombre == nombre_evento:
-                evento_eliminado = self.eventos.pop(i)
-                self.guardar_eventos()  # Guardar cambios
-                return evento_eliminado
-        return None
+        """Elimina el primer evento con ese nombre"""
+        self._verificar_escritura()
+        evento = self.obtener_evento(nombre_evento)
+        if evento is None:
+            return None
+        return self.eliminar_evento_por_id(evento.id)
+    
+    def eliminar_evento_por_id(self, id_evento):
+        """Elimina un evento por id, sin desplazar la lista; devuelve el evento o None"""
+        self._verificar_escritura()
+        eventos = self._lista()
+        posicion = self._posiciones.get(id_evento)
+        if posicion is None:
+            return None
+        
+        evento_eliminado = eventos[posicion]
+        eventos[posicion] = None
+        self._huecos += 1
+        self._desregistrar(evento_eliminado)
+        self._indice_fechas.quitar(evento_eliminado)
+        self._indice_recursos.quitar(evento_eliminado)
+        self._orden_nombres.quitar(evento_eliminado)
+        if self._indice_nombres is not None:
+            self._indice_nombres.quitar(evento_eliminado)
+        if self._huecos > len(eventos) // 2:
+            self._compactar()
+        
+        self._persistir_cambios([('baja', evento_eliminado)])  # Guardar cambios
+        return evento_eliminado
+    
+    def agregar_eventos(self, eventos):
+        """Agrega varios eventos escribiendo los datos una sola vez"""
+        with self.lote():
+            for evento in eventos:
+                self.agregar_evento(evento)
+        return len(eventos)
+    
+    def eliminar_eventos(self, nombres_eventos):
+        """Elimina varios eventos por nombre escribiendo los datos una sola vez"""
+        eliminados = []
+        with self.lote():
+            for nombre_evento in nombres_eventos:
+                evento = self.eliminar_evento(nombre_evento)
+                if evento is not None:
+                    eliminados.append(evento)
+        return eliminados
+    
+    def eliminar_eventos_por_id(self, ids_eventos):
+        """Elimina varios eventos por id escribiendo los datos una sola vez"""
+        eliminados = []
+        with self.lote():
+            for id_evento in ids_eventos:
+                evento = self.eliminar_evento_por_id(id_evento)
+                if evento is not None:
+                    eliminados.append(evento)
+        return eliminados
+    
+    @contextmanager
+    def lote(self):
+        """
+        Transacción sobre el calendario y los recursos:
+        
+            with calendario.lote():
+                calendario.agregar_evento(...)
+                Recurso.marcar_como_usado(...)
+        
+        Los eventos y recursos.json se guardan una única vez al confirmar.
+        Si el bloque lanza una excepción, se restaura el estado en memoria.
+        """
+        self._verificar_escritura()
+        if self._operaciones_lote is not None:
+            # Lote anidado: forma parte del exterior
+            yield self
+            return
+        
+        eventos_previos = list(self._vivos())
+        self._operaciones_lote = []
+        try:
+            with Recurso.lote():
+                yield self
+        except BaseException:
+            self.eventos = eventos_previos
+            self._operaciones_lote = None
+            raise
+        
+        operaciones, self._operaciones_lote = self._operaciones_lote, None
+        if self._huecos:
+            self._compactar()
+        if operaciones:
+            self._persistir_cambios(operaciones)
+    
+    def _verificar_escritura(self):
+        if self.solo_lectura:
+            raise RuntimeError("El calendario está abierto en modo de solo lectura")
+    
+    def _persistir_cambios(self, operaciones):
+        """Persiste mutaciones: anexando al diario si existe, o reescribiendo todo"""
+        if self._operaciones_lote is not None:
+            self._operaciones_lote.extend(operaciones)
+            return True
+        if self.persistencia.incremental:
+            return self.persistencia.registrar_cambios(operaciones)
+        return self.guardar_eventos()
+    
+    def validar_restricciones(self):
+        """Comprueba todos los eventos: lista de (evento, mensaje) incumplidos"""
+        return self.restricciones.validar_todos(self._vivos())
+    
+    def guardar_restricciones(self):
+        """Guarda las reglas actuales en restricciones.json"""
+        return self.restricciones.guardar(self.directorio_datos)
     
     def obtener_evento(self, nombre_evento):
-        """Obtiene un evento por nombre"""
-        for evento in self.eventos:
-            if evento.nombre == nombre_evento:
-                return evento
-        return None
+        """Obtiene el primer evento con ese nombre"""
+        self._lista()
+        if self._ids_por_nombre is None:
+            # Solo lectura: recorrer el snapshot
+            for evento in self._eventos:
+                if evento.nombre == nombre_evento:
+                    return evento
+            return None
+        
+        ids = self._ids_por_nombre.get(nombre_evento)
+        if not ids:
+            return None
+        return self._por_id[next(iter(ids))]
+    
+    def obtener_evento_por_id(self, id_evento):
+        """Obtiene un evento por id, o None si no existe"""
+        eventos = self._lista()
+        if self._por_id is None:
+            fila = eventos.fila_de_id(id_evento)
+            return None if fila is None else eventos.evento(fila)
+        return self._por_id.get(id_evento)
     
     def listar_eventos(self):
         """Retorna una copia de la lista de eventos"""
@@ -55,71 +366,244 @@ class Calendario:
     
     def guardar_eventos(self):
         """Guarda los eventos en archivo"""
+        self._verificar_escritura()
         return self.persistencia.guardar_eventos(self.eventos)
     
+    def _leer_eventos(self):
+        if self.solo_lectura:
+            # Reabrir el snapshot recoge la última versión publicada
+            return self.persistencia.abrir_snapshot_columnar()
+        return self.persistencia.cargar_eventos()
+    
+    def _sustituir_eventos(self, eventos):
+        anterior, self._eventos = self._eventos, eventos
+        self._huecos = 0
+        self._sin_cargar = False
+        self._indexar()
+        if not self.solo_lectura:
+            # recursos.json solo guarda ids de eventos: las fechas de cada uso salen de aquí
+            Recurso.reconstruir_ocupacion(self._eventos)
+        if isinstance(anterior, SnapshotColumnar):
+            anterior.cerrar()
+    
     def cargar_eventos(self):
         """Carga eventos desde archivo"""
-        eventos_cargados = self.persistencia.cargar_eventos()
-        self.eventos = eventos_cargados
-        return len(eventos_cargados)
+        if self._carga is not None:
+            self.esperar_carga()
+        self._sustituir_eventos(self._leer_eventos())
+        return len(self._eventos)
+    
+    def cargar_eventos_en_segundo_plano(self):
+        """
+        Empieza a cargar los eventos en un hilo y devuelve un Future con la
+        cantidad cargada. Mientras tanto, cualquier acceso a los eventos espera.
+        """
+        if self._carga is not None:
+            return self._carga
+        
+        carga = Future()
+        carga.set_running_or_notify_cancel()
+        
+        def cargar():
+            try:
+                eventos = self._leer_eventos()
+            except BaseException as e:
+                carga.set_exception(e)
+            else:
+                self._sustituir_eventos(eventos)
+                carga.set_result(len(eventos))
+        
+        self._carga = carga
+        threading.Thread(target=cargar, name="carga-eventos", daemon=True).start()
+        return carga
+    
+    @property
+    def carga_completa(self):
+        """Indica si los eventos ya están disponibles sin esperar"""
+        return self._carga is None or self._carga.done()
+    
+    def esperar_carga(self, timeout=None):
+        """Espera a la carga en segundo plano; relanza su excepción si falló"""
+        carga = self._carga
+        if carga is None:
+            return len(self._eventos) - self._huecos
+        try:
+            return carga.result(timeout)
+        finally:
+            if carga.done():
+                self._carga = None
+    
+    def iterar_eventos_almacenados(self, tamano_bloque=None):
+        """
+        Recorre los eventos guardados sin cargarlos en el calendario.
+        
+        Sin tamano_bloque genera Eventos sueltos; con él, listas de ese tamaño.
+        La memoria usada es la de un evento (o un bloque), no la del archivo.
+        """
+        if tamano_bloque:
+            return self.persistencia.iterar_bloques_eventos(tamano_bloque)
+        return self.persistencia.iterar_eventos()
+    
+    def publicar_snapshot_columnar(self):
+        """Publica los eventos actuales en eventos.col para los lectores"""
+        return self.persistencia.publicar_snapshot_columnar(self.eventos)
     
     # MÉTODOS DE BÚSQUEDA (delegados al Buscador)
     
+    def _consultar_backend(self, consulta):
+        """
+        Resuelve una consulta en el backend si los eventos no están cargados
+        (calendario bajo demanda). Devuelve None si hay que responder con los
+        eventos en memoria: ya cargados (con sus índices, más rápidos que el
+        backend) o porque el backend no sabe resolverla.
+        """
+        if not self._sin_cargar:
+            return None
+        return consulta()
+    
     def buscar_por_nombre(self, texto):
         """Busca eventos por nombre"""
-        return self.buscador.buscar_por_nombre(self.eventos, texto)
+        if not texto:
+            return self.eventos
+        return self.buscador.buscar_por_nombre(self._vivos(), texto, self._indice_trigramas())
     
     def buscar_por_recurso(self, recurso):
         """Busca eventos por recurso"""
-        return self.buscador.buscar_por_recurso(self.eventos, recurso)
+        if not recurso:
+            return self.eventos
+        resultados = self._consultar_backend(lambda: self.persistencia.buscar_por_recurso(recurso))
+        if resultados is not None:
+            return resultados
+        return self.buscador.buscar_por_recurso(self._vivos(), recurso, self._indice_recursos)
+    
+    def buscar_por_recursos(self, recursos):
+        """Busca eventos que usen alguno de los recursos indicados (nombres exactos)"""
+        return self.buscador.buscar_por_recursos(self._vivos(), recursos, self._indice_recursos)
     
     def buscar_por_fecha(self, fecha):
         """Busca eventos por fecha"""
-        return self.buscador.buscar_por_fecha(self.eventos, fecha)
+        if not fecha:
+            return self.eventos
+        return self.buscador.buscar_por_fecha(self._vivos(), fecha, self._indice())
     
     def buscar_por_rango_fechas(self, fecha_inicio, fecha_fin):
         """Busca eventos por rango de fechas"""
-        return self.buscador.buscar_por_rango_fechas(self.eventos, fecha_inicio, fecha_fin)
+        resultados = self._consultar_backend(
+            lambda: self.persistencia.buscar_por_rango_fechas(fecha_inicio, fecha_fin))
+        if resultados is not None:
+            return resultados
+        return self.buscador.buscar_por_rango_fechas(self._vivos(), fecha_inicio, fecha_fin, self._indice())
+    
+    def consultar(self):
+        """
+        Consulta que combina filtros, orden y límite, resuelta con los índices
+        del calendario (véase nucleo.consulta). Por ejemplo:
+        
+            for evento in (calendario.consultar().recurso("Legión")
+                           .entre_fechas(desde, hasta).ordenar('fecha').limitar(10)):
+        """
+        eventos = self._lista()
+        return Consulta(eventos, self._indice_fechas, self._indice_recursos,
+                        self._indice_trigramas if self._por_id is not None else None)
     
     def ordenar_por_fecha(self, ascendente=True):
         """Ordena eventos por fecha"""
+        indice = self._indice()
+        if indice is not None:
+            return self.buscador.ordenar_por_fecha(self._vivos(), ascendente, indice)
         return self.buscador.ordenar_por_fecha(self.eventos, ascendente)
     
     def ordenar_por_nombre(self, ascendente=True):
         """Ordena eventos por nombre"""
         return self.buscador.ordenar_por_nombre(self.eventos, ascendente)
     
+    def pagina_por_fecha(self, tamano=20, cursor=None, ascendente=True):
+        """Página de eventos por fecha; cursor es el devuelto con la página anterior"""
+        return self.buscador.pagina_por_fecha(self._vivos(), tamano, cursor, ascendente, self._indice())
+    
+    def pagina_por_nombre(self, tamano=20, cursor=None, ascendente=True):
+        """Página de eventos por nombre; cursor es el devuelto con la página anterior"""
+        eventos = self._vivos()
+        return self.buscador.pagina_por_nombre(eventos, tamano, cursor, ascendente, self._orden_nombres)
+    
     def eventos_proximos(self, dias=7):
         """Obtiene eventos próximos"""
-        return self.buscador.eventos_proximos(self.eventos, dias)
+        resultados = self._consultar_backend(lambda: self.persistencia.eventos_proximos(dias))
+        if resultados is not None:
+            return resultados
+        return self.buscador.eventos_proximos(self._vivos(), dias, self._indice())
     
     def eventos_en_curso(self):
         """Obtiene eventos en curso"""
-        return self.buscador.eventos_en_curso(self.eventos)
+        return self.buscador.eventos_en_curso(self._vivos(), self._indice())
     
     def eventos_pasados(self):
         """Obtiene eventos pasados"""
-        return self.buscador.eventos_pasados(self.eventos)
+        return self.buscador.eventos_pasados(self._vivos(), self._indice())
     
     def eventos_sin_recursos(self):
         """Obtiene eventos sin recursos"""
-        return self.buscador.buscar_eventos_sin_recursos(self.eventos)
+        return self.buscador.buscar_eventos_sin_recursos(self._vivos())
     
     def estadisticas_recursos(self):
-        """Obtiene estadísticas de recursos"""
-        return self.buscador.estadisticas_recursos(self.eventos)
+        """Obtiene estadísticas de recursos (mantenidas por el índice de recursos)"""
+        eventos = self._vivos()
+        if self._indice_recursos is not None:
+            return self._indice_recursos.estadisticas()
+        return self.buscador.estadisticas_recursos(eventos)
     
     def conteo_por_mes(self):
-        """Obtiene conteo de eventos por mes"""
-        return self.buscador.contar_eventos_por_mes(self.eventos)
+        """Obtiene conteo de eventos por mes (mantenido por el índice de fechas)"""
+        conteo = self._consultar_backend(self.persistencia.contar_eventos_por_mes)
+        if conteo is not None:
+            return conteo
+        eventos = self._vivos()
+        if self._indice_fechas is not None:
+            return self._indice_fechas.conteo_por_mes()
+        return self.buscador.contar_eventos_por_mes(eventos)
     
     def generar_informe(self):
-        """Genera un informe completo"""
-        return self.buscador.generar_informe(self.eventos)
+        """
+        Genera un informe completo
+        
+        Los totales se leen de los contadores que los índices mantienen en cada
+        alta y baja; solo las claves relativas a hoy hacen consultas (O(log n)
+        sobre los índices) y solo los agregadores registrados aparte recorren
+        los eventos
+        """
+        eventos = self._vivos()
+        if self._indice_fechas is None or self._indice_recursos is None:
+            return self.buscador.generar_informe(eventos)
+        
+        motor = informes.motor_predeterminado
+        ahora = informes.momento_actual()
+        materializado = self._informe_materializado(ahora)
+        # Una clave redefinida con registrar_agregador la calcula su agregador
+        informe = {
+            clave: valor for clave, valor in materializado.items()
+            if motor.fabrica(clave) is _MATERIALIZADOS[clave]
+        }
+        informe.update(motor.generar(eventos, ahora, omitir=informe))
+        return {clave: informe[clave] for clave in motor.claves()}
+    
+    def _informe_materializado(self, ahora):
+        """Claves predeterminadas del informe a partir de los índices"""
+        hoy, desfase = ahora
+        fechas = self._indice_fechas
+        return {
+            'total_eventos': len(self._por_id),
+            'eventos_proximos_7_dias': fechas.contar_inician_entre(
+                hoy + desfase, hoy + desfase + informes.EventosProximos.dias),
+            'eventos_en_curso': fechas.contar_solapados(hoy + desfase, hoy),
+            'eventos_pasados': fechas.contar_terminados_antes(hoy + desfase),
+            'eventos_sin_recursos': self._indice_recursos.sin_recursos(),
+            'estadisticas_recursos': self._indice_recursos.estadisticas(),
+            'conteo_por_mes': fechas.conteo_por_mes()
+        }
     
     def filtrar_por_recursos(self, min_recursos=0, max_recursos=None):
         """Filtra por cantidad de recursos"""
-        return self.buscador.filtrar_por_cantidad_recursos(self.eventos, min_recursos, max_recursos)
+        return self.buscador.filtrar_por_cantidad_recursos(self._vivos(), min_recursos, max_recursos)
     
     # MÉTODOS DE PERSISTENCIA AVANZADOS
     
@@ -129,12 +613,18 @@ class Calendario:
     
     def importar_datos(self, origen, sobrescribir=True):
         """Importa datos desde otra ubicación"""
-        return self.persistencia.importar_datos(origen, sobrescribir)
+        self._verificar_escritura()
+        archivos = self.persistencia.importar_datos(origen, sobrescribir)
+        if ARCHIVO_RESTRICCIONES in archivos:
+            self.restricciones = Restricciones.cargar(self.directorio_datos)
+        return archivos
     
     def limpiar_datos(self):
         """Limpia todos los datos"""
+        self._verificar_escritura()
         archivos_eliminados = self.persistencia.limpiar_datos()
         self.eventos = []  # Limpiar también en memoria
+        self.restricciones = Restricciones()  # restricciones.json se ha borrado con los datos
         return archivos_eliminados
     
     def obtener_estadisticas_datos(self):
@@ -0,0 +1,387 @@
+# nucleo/columnar.py
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from modelos.evento import Evento
+from nucleo import informes
+
+# Snapshot columnar de solo lectura (eventos.col), pensado para abrirse con mmap.
+# Todas las columnas son enteros little-endian de 32 bits:
+#
+#   cabecera  b"PRIC" | versión u16 | reservado u16 | n_eventos | n_cadenas
+#             | n_vocabulario | total_recursos | total_postings | bytes_heap
+#   inicio[n], fin[n]                 ordinal de día, 0 si la fecha no es válida
+#   nombre[n], inicio_txt[n], fin_txt[n]   índices del heap de cadenas
+#   id_txt[n]                         id de cada evento (heap; no existe en la versión 1)
+#   recursos_off[n + 1], recursos[total]   recursos de cada evento (índices de cadena)
+#   orden_inicio[n], inicio_ordenado[n]    permutación por (inicio, fila) y sus valores
+#   orden_fin[n], fin_ordenado[n]          permutación por (fin, fila) y sus valores
+#   vocabulario[v], postings_off[v + 1], postings[total_postings]
+#                                     recurso -> filas que lo usan (ascendentes)
+#   cadenas_off[n_cadenas + 1], heap  utf-8 de todas las cadenas
+#
+# Las consultas trabajan sobre estas columnas y solo construyen Evento para
+# las filas del resultado.
+
+MAGICO = b"PRIC"
+VERSION = 2
+
+_CABECERA = struct.Struct("<4sHHIIIIII")
+
+
+def _bytes_columna(tipo, valores):
+    columna = array(tipo, valores)
+    if sys.byteorder != "little":
+        columna.byteswap()
+    return columna.tobytes()
+
+
+def escribir_snapshot_columnar(eventos, ruta_archivo):
+    """Escribe un snapshot columnar de una lista de eventos (de forma atómica)"""
+    eventos = list(eventos)
+    n = len(eventos)
+
+    cadenas = []
+    indices = {}
+
+    def indice_cadena(texto):
+        indice = indices.get(texto)
+        if indice is None:
+            indice = indices[texto] = len(cadenas)
+            cadenas.append(texto)
+        return indice
+
+    inicios = [evento.inicio_ord or 0 for evento in eventos]
+    fines = [evento.fin_ord or 0 for evento in eventos]
+    nombres = [indice_cadena(evento.nombre) for evento in eventos]
+    inicios_txt = [indice_cadena(evento.inicio) for evento in eventos]
+    fines_txt = [indice_cadena(evento.fin) for evento in eventos]
+    ids_txt = [indice_cadena(evento.id) for evento in eventos]
+
+    recursos_off = [0]
+    recursos = []
+    postings_por_recurso = {}
+    for fila, evento in enumerate(eventos):
+        for recurso in evento.recursos:
+            indice = indice_cadena(recurso)
+            recursos.append(indice)
+            filas = postings_por_recurso.setdefault(indice, [])
+            if not filas or filas[-1] != fila:
+                filas.append(fila)
+        recursos_off.append(len(recursos))
+
+    orden_inicio = sorted(range(n), key=lambda fila: (inicios[fila], fila))
+    orden_fin = sorted(range(n), key=lambda fila: (fines[fila], fila))
+
+    vocabulario = list(postings_por_recurso)
+    postings_off = [0]
+    postings = []
+    for indice in vocabulario:
+        postings.extend(postings_por_recurso[indice])
+        postings_off.append(len(postings))
+
+    codificadas = [texto.encode('utf-8') for texto in cadenas]
+    cadenas_off = [0]
+    for datos in codificadas:
+        cadenas_off.append(cadenas_off[-1] + len(datos))
+    heap = b"".join(codificadas)
+
+    ruta_temporal = ruta_archivo + ".tmp"
+    with open(ruta_temporal, 'wb') as f:
+        f.write(_CABECERA.pack(MAGICO, VERSION, 0, n, len(cadenas),
+                               len(vocabulario), len(recursos), len(postings), len(heap)))
+        f.write(_bytes_columna('i', inicios))
+        f.write(_bytes_columna('i', fines))
+        f.write(_bytes_columna('I', nombres))
+        f.write(_bytes_columna('I', inicios_txt))
+        f.write(_bytes_columna('I', fines_txt))
+        f.write(_bytes_columna('I', ids_txt))
+        f.write(_bytes_columna('I', recursos_off))
+        f.write(_bytes_columna('I', recursos))
+        f.write(_bytes_columna('I', orden_inicio))
+        f.write(_bytes_columna('i', [inicios[fila] for fila in orden_inicio]))
+        f.write(_bytes_columna('I', orden_fin))
+        f.write(_bytes_columna('i', [fines[fila] for fila in orden_fin]))
+        f.write(_bytes_columna('I', vocabulario))
+        f.write(_bytes_columna('I', postings_off))
+        f.write(_bytes_columna('I', postings))
+        f.write(_bytes_columna('I', cadenas_off))
+        f.write(heap)
+    # Reemplazo atómico: los lectores que ya lo tienen mapeado siguen viendo el anterior
+    os.replace(ruta_temporal, ruta_archivo)
+    return n
+
+
+class SnapshotColumnar:
+    """Vista de solo lectura sobre un snapshot columnar mapeado en memoria"""
+
+    def __init__(self, ruta_archivo):
+        self.ruta_archivo = ruta_archivo
+        self._archivo = open(ruta_archivo, 'rb')
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(self._mapa)
+
+        (magico, version, _, n, n_cadenas, n_vocabulario,
+         total_recursos, total_postings, bytes_heap) = _CABECERA.unpack_from(vista)
+        if magico != MAGICO:
+            raise ValueError(f"{ruta_archivo} no es un snapshot columnar")
+        if version > VERSION:
+            raise ValueError(f"Versión de snapshot columnar no soportada: {version}")
+
+        self._n = n
+        self._posicion = _CABECERA.size
+        self._vista = vista
+
+        self.inicio = self._columna('i', n)
+        self.fin = self._columna('i', n)
+        self.nombre = self._columna('I', n)
+        self.inicio_txt = self._columna('I', n)
+        self.fin_txt = self._columna('I', n)
+        self.id_txt = self._columna('I', n) if version >= 2 else None
+        self._filas_por_id = None
+        self.recursos_off = self._columna('I', n + 1)
+        self.recursos = self._columna('I', total_recursos)
+        self.orden_inicio = self._columna('I', n)
+        self.inicio_ordenado = self._columna('i', n)
+        self.orden_fin = self._columna('I', n)
+        self.fin_ordenado = self._columna('i', n)
+        self.vocabulario = self._columna('I', n_vocabulario)
+        self.postings_off = self._columna('I', n_vocabulario + 1)
+        self.postings = self._columna('I', total_postings)
+        self.cadenas_off = self._columna('I', n_cadenas + 1)
+        self._heap = vista[self._posicion:self._posicion + bytes_heap]
+
+    def _columna(self, tipo, cantidad):
+        """Columna de enteros sobre el mapa, sin copiar (salvo en big-endian)"""
+        inicio = self._posicion
+        self._posicion += 4 * cantidad
+        datos = self._vista[inicio:self._posicion]
+        if sys.byteorder == "little":
+            return datos.cast(tipo)
+        columna = array(tipo, datos.tobytes())
+        columna.byteswap()
+        return columna
+
+    @classmethod
+    def abrir(cls, ruta_archivo):
+        return cls(ruta_archivo)
+
+    def cerrar(self):
+        """Libera el mapa (las columnas dejan de ser válidas)"""
+        for nombre in ('inicio', 'fin', 'nombre', 'inicio_txt', 'fin_txt', 'id_txt', 'recursos_off',
+                       'recursos', 'orden_inicio', 'inicio_ordenado', 'orden_fin',
+                       'fin_ordenado', 'vocabulario', 'postings_off', 'postings',
+                       'cadenas_off', '_heap'):
+            columna = getattr(self, nombre)
+            if isinstance(columna, memoryview):
+                columna.release()
+        self._vista.release()
+        self._mapa.close()
+        self._archivo.close()
+
+    # ACCESO A FILAS
+
+    def cadena(self, indice):
+        return str(self._heap[self.cadenas_off[indice]:self.cadenas_off[indice + 1]], 'utf-8')
+
+    def nombre_de(self, fila):
+        return self.cadena(self.nombre[fila])
+
+    def id_de(self, fila):
+        """Id guardado de una fila (None en snapshots de la versión 1)"""
+        if self.id_txt is None:
+            return None
+        return self.cadena(self.id_txt[fila])
+
+    def fila_de_id(self, id_evento):
+        """Fila del evento con ese id, o None (el mapa se construye al primer uso)"""
+        if self._filas_por_id is None:
+            self._filas_por_id = {self.id_de(fila): fila for fila in range(self._n)}
+        return self._filas_por_id.get(id_evento)
+
+    def cantidad_recursos(self, fila):
+        return self.recursos_off[fila + 1] - self.recursos_off[fila]
+
+    def evento(self, fila):
+        """Construye el Evento de una fila"""
+        recursos = [self.cadena(indice) for indice in
+                    self.recursos[self.recursos_off[fila]:self.recursos_off[fila + 1]]]
+        return Evento(
+            self.nombre_de(fila),
+            self.cadena(self.inicio_txt[fila]),
+            self.cadena(self.fin_txt[fila]),
+            recursos,
+            id=self.id_de(fila)
+        )
+
+    def eventos_en(self, filas):
+        return [self.evento(fila) for fila in filas]
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, fila):
+        if isinstance(fila, slice):
+            return self.eventos_en(range(*fila.indices(self._n)))
+        if fila < 0:
+            fila += self._n
+        if not 0 <= fila < self._n:
+            raise IndexError("fila fuera de rango")
+        return self.evento(fila)
+
+    def __iter__(self):
+        for fila in range(self._n):
+            yield self.evento(fila)
+
+    def copy(self):
+        """Lista de Eventos (compatibilidad con las listas del Calendario)"""
+        return list(self)
+
+    # CONSULTAS SOBRE COLUMNAS (devuelven filas)
+
+    def filas_por_rango(self, inicio, fin):
+        """Filas cuyo [inicio, fin] se solapa con [inicio, fin] (ordinales)"""
+        desde = bisect_left(self.inicio_ordenado, 1)  # saltar fechas inválidas
+        hasta = bisect_right(self.inicio_ordenado, fin)
+        columna_fin = self.fin
+        return sorted(fila for fila in self.orden_inicio[desde:hasta]
+                      if columna_fin[fila] >= inicio)
+
+    def filas_por_recurso(self, texto_recurso):
+        """Filas que usan algún recurso cuyo nombre contiene el texto"""
+        texto_recurso = texto_recurso.lower()
+        filas = set()
+        for posicion, indice in enumerate(self.vocabulario):
+            if texto_recurso in self.cadena(indice).lower():
+                filas.update(self.postings[self.postings_off[posicion]:self.postings_off[posicion + 1]])
+        return sorted(filas)
+
+    def filas_por_inicio(self, desde, hasta):
+        """Filas con inicio en [desde, hasta], ordenadas por inicio"""
+        return list(self.orden_inicio[bisect_left(self.inicio_ordenado, desde):
+                                      bisect_right(self.inicio_ordenado, hasta)])
+
+    # API COMPATIBLE CON EL BUSCADOR
+
+    def buscar_por_nombre(self, texto_busqueda):
+        texto_busqueda = texto_busqueda.lower()
+        # Los nombres están internados: comprobar cada cadena distinta una vez
+        coincide = {}
+        filas = []
+        for fila, indice in enumerate(self.nombre):
+            resultado = coincide.get(indice)
+            if resultado is None:
+                resultado = coincide[indice] = texto_busqueda in self.cadena(indice).lower()
+            if resultado:
+                filas.append(fila)
+        return self.eventos_en(filas)
+
+    def buscar_por_recurso(self, nombre_recurso):
+        return self.eventos_en(self.filas_por_recurso(nombre_recurso))
+
+    def buscar_por_rango_fechas(self, inicio, fin):
+        return self.eventos_en(self.filas_por_rango(inicio, fin))
+
+    def buscar_por_fecha(self, ordinal):
+        return self.eventos_en(self.filas_por_rango(ordinal, ordinal))
+
+    def eventos_proximos(self, dias=7):
+        return self.eventos_en(self.filas_proximas(dias))
+
+    def eventos_pasados(self):
+        return self.eventos_en(self.filas_pasadas())
+
+    def eventos_en_curso(self):
+        return self.eventos_en(self.filas_en_curso())
+
+    def buscar_eventos_sin_recursos(self):
+        return self.eventos_en(self.filas_sin_recursos())
+
+    def filtrar_por_cantidad_recursos(self, min_recursos=0, max_recursos=None):
+        return self.eventos_en(self.filas_por_cantidad_recursos(min_recursos, max_recursos))
+
+    # FILAS SEGÚN LA FECHA ACTUAL
+
+    @staticmethod
+    def _ahora():
+        return informes.momento_actual()
+
+    def filas_proximas(self, dias=7):
+        # Igual que el Buscador: (inicio - ahora).days entre 0 y dias
+        hoy, desfase = self._ahora()
+        return self.filas_por_inicio(hoy + desfase, hoy + desfase + dias)
+
+    def filas_pasadas(self):
+        # fin < ahora  <=>  fin < hoy + desfase (las fechas son a medianoche)
+        hoy, desfase = self._ahora()
+        desde = bisect_left(self.fin_ordenado, 1)
+        hasta = bisect_left(self.fin_ordenado, hoy + desfase)
+        return sorted(self.orden_fin[desde:hasta])
+
+    def filas_en_curso(self):
+        # inicio <= ahora <= fin  <=>  inicio <= hoy y fin >= hoy + desfase
+        hoy, desfase = self._ahora()
+        desde = bisect_left(self.inicio_ordenado, 1)
+        hasta = bisect_right(self.inicio_ordenado, hoy)
+        columna_fin = self.fin
+        return sorted(fila for fila in self.orden_inicio[desde:hasta]
+                      if columna_fin[fila] >= hoy + desfase)
+
+    def filas_sin_recursos(self):
+        off = self.recursos_off
+        return [fila for fila in range(self._n) if off[fila] == off[fila + 1]]
+
+    def filas_por_cantidad_recursos(self, min_recursos=0, max_recursos=None):
+        off = self.recursos_off
+        return [fila for fila in range(self._n)
+                if off[fila + 1] - off[fila] >= min_recursos
+                and (max_recursos is None or off[fila + 1] - off[fila] <= max_recursos)]
+
+    def contar_eventos_por_mes(self):
+        """Conteo por mes con búsquedas binarias sobre la columna de inicio ordenada"""
+        columna = self.inicio_ordenado
+        desde = bisect_left(columna, 1)
+        meses = []
+        while desde < self._n:
+            dia = date.fromordinal(columna[desde])
+            if dia.month == 12:
+                siguiente = date(dia.year + 1, 1, 1)
+            else:
+                siguiente = date(dia.year, dia.month + 1, 1)
+            hasta = bisect_left(columna, siguiente.toordinal(), desde)
+            # Ordenar los meses por su primera aparición, como el Buscador
+            primera = min(self.orden_inicio[desde:hasta])
+            meses.append((primera, f"{dia.year}-{dia.month:02d}", hasta - desde))
+            desde = hasta
+        meses.sort()
+        return {mes: cantidad for _, mes, cantidad in meses}
+
+    def estadisticas_recursos(self):
+        """Usos por recurso contados sobre la columna de recursos"""
+        usos = Counter(self.recursos)
+        off = self.recursos_off
+        primeras = []
+        for posicion, indice in enumerate(self.vocabulario):
+            # Desempate como el Buscador: orden de primera aparición
+            fila = self.postings[self.postings_off[posicion]]
+            orden = self.recursos[off[fila]:off[fila + 1]].tolist().index(indice)
+            primeras.append((fila, orden, indice))
+        primeras.sort()
+        return dict(sorted(((self.cadena(indice), usos[indice]) for _, _, indice in primeras),
+                           key=lambda x: x[1], reverse=True))
+
+    def generar_informe(self):
+        return {
+            'total_eventos': self._n,
+            'eventos_proximos_7_dias': len(self.filas_proximas(7)),
+            'eventos_en_curso': len(self.filas_en_curso()),
+            'eventos_pasados': len(self.filas_pasadas()),
+            'eventos_sin_recursos': len(self.filas_sin_recursos()),
+            'estadisticas_recursos': self.estadisticas_recursos(),
+            'conteo_por_mes': self.contar_eventos_por_mes()
+        }
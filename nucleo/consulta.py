@@ -0,0 +1,319 @@
+# nucleo/consulta.py
+import heapq
+from abc import ABC, abstractmethod
+from itertools import islice
+from modelos.evento import fecha_a_ordinal
+from modelos.recurso import Recurso
+
+# Consultas que combinan varios filtros (nombre, recurso, rango de fechas,
+# cantidad de recursos) sin encadenar llamadas al Buscador que devuelven cada
+# una la lista completa. Antes de recorrer nada se estima con los índices del
+# calendario cuántos eventos deja pasar cada filtro (en O(log n) o con el
+# tamaño de sus listas, sin construir resultados), la consulta parte de los
+# candidatos del más selectivo y los demás se comprueban sobre la marcha,
+# evento a evento.
+#
+# Si se pide orden por fecha con límite y ningún filtro es selectivo, sale
+# más barato recorrer el índice de fechas ya ordenado y parar al completar el
+# límite. Sin índices (calendario de solo lectura) se recorren los eventos.
+#
+# Los resultados coinciden con los del Buscador: en orden del calendario o,
+# si se ordenan, con los empates en ese orden.
+
+
+class _Filtro(ABC):
+    """Un predicado de la consulta, comprobado evento a evento"""
+
+    indice = None  # Nombre del índice que puede resolverlo (véase _FiltroIndexado)
+
+    @abstractmethod
+    def cumple(self, evento):
+        """Indica si el evento pasa el filtro"""
+
+
+class _FiltroIndexado(_Filtro):
+    """Un predicado que además puede resolverse con un índice del calendario"""
+
+    @abstractmethod
+    def estimar(self, indice):
+        """Cota superior de los eventos que lo cumplen, sin construir resultados"""
+
+    @abstractmethod
+    def candidatos(self, indice):
+        """Eventos que lo cumplen, en orden del calendario, a partir del índice"""
+
+
+class _FiltroNombre(_FiltroIndexado):
+    indice = 'nombres'
+
+    def __init__(self, texto):
+        self.texto = texto.lower()
+        self.descripcion = f"nombre contiene '{texto}'"
+
+    def estimar(self, indice):
+        return indice.estimar(self.texto)
+
+    def candidatos(self, indice):
+        return indice.buscar(self.texto)
+
+    def cumple(self, evento):
+        return self.texto in evento.nombre.lower()
+
+
+class _FiltroRecurso(_FiltroIndexado):
+    """Algún recurso cuyo nombre contiene el texto o, si exacto, alguno de la lista"""
+
+    indice = 'recursos'
+
+    def __init__(self, recursos, exacto):
+        self.recursos = recursos
+        self.exacto = exacto
+        if exacto:
+            self.mascara = Recurso.mascara(recursos, registrar=False)
+            self.descripcion = f"usa alguno de {list(recursos)}"
+        else:
+            self.mascara = Recurso.mascara_coincidentes(recursos)
+            self.descripcion = f"recurso contiene '{recursos}'"
+
+    def _nombres(self, indice):
+        return self.recursos if self.exacto else indice.recursos_coincidentes(self.recursos)
+
+    def estimar(self, indice):
+        return indice.estimar(self._nombres(indice))
+
+    def candidatos(self, indice):
+        return indice.con_recursos(self._nombres(indice))
+
+    def cumple(self, evento):
+        return bool(evento.mascara_recursos & self.mascara)
+
+
+class _FiltroFechas(_FiltroIndexado):
+    """Eventos que se solapan con [inicio, fin] (ordinales)"""
+
+    indice = 'fechas'
+
+    def __init__(self, inicio, fin, descripcion):
+        self.inicio = inicio
+        self.fin = fin
+        self.descripcion = descripcion
+
+    def estimar(self, indice):
+        return indice.estimar_solapados(self.inicio, self.fin)
+
+    def candidatos(self, indice):
+        return indice.solapados(self.inicio, self.fin)
+
+    def cumple(self, evento):
+        return (evento.inicio_ord is not None and evento.fin_ord is not None
+                and evento.inicio_ord <= self.fin and evento.fin_ord >= self.inicio)
+
+
+class _FiltroCantidadRecursos(_Filtro):
+    """Entre minimo y maximo recursos (como Buscador.filtrar_por_cantidad_recursos)"""
+
+    def __init__(self, minimo, maximo):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.descripcion = (f"al menos {minimo} recursos" if maximo is None
+                            else f"entre {minimo} y {maximo} recursos")
+
+    def cumple(self, evento):
+        cantidad = len(evento.recursos)
+        return cantidad >= self.minimo and (self.maximo is None or cantidad <= self.maximo)
+
+
+_ORDENES = {
+    # Las mismas claves que Buscador.ordenar_por_fecha y ordenar_por_nombre
+    'fecha': lambda evento: evento.inicio_ord or 0,
+    'nombre': lambda evento: evento.nombre.lower()
+}
+
+
+class Consulta:
+    """
+    Consulta sobre los eventos de un calendario (Calendario.consultar()).
+
+    Los métodos de filtro, ordenar() y limitar() devuelven la propia consulta
+    para encadenarlos; al recorrerla (o con ejecutar()) se obtiene un generador
+    de eventos. explicar() describe el plan elegido sin ejecutarlo.
+    """
+
+    def __init__(self, eventos, indice_fechas=None, indice_recursos=None, indice_nombres=None):
+        """
+        Args:
+            eventos (list): Eventos del calendario, en su orden
+            indice_fechas (IndiceFechas): Índice de fechas de esos eventos (opcional)
+            indice_recursos (IndiceRecursos): Índice de recursos (opcional)
+            indice_nombres (callable): Devuelve el IndiceTrigramas de los nombres;
+                solo se llama si la consulta filtra por nombre (opcional)
+        """
+        self._eventos = eventos
+        self._indices = {'fechas': indice_fechas, 'recursos': indice_recursos}
+        self._indice_nombres = indice_nombres
+        self._filtros = []
+        self._orden = None  # (clave, ascendente)
+        self._limite = None
+
+    def nombre(self, texto):
+        """Eventos cuyo nombre contiene el texto (sin distinguir mayúsculas)"""
+        if texto:
+            self._filtros.append(_FiltroNombre(texto))
+        return self
+
+    def recurso(self, texto):
+        """Eventos con algún recurso cuyo nombre contiene el texto"""
+        if texto:
+            self._filtros.append(_FiltroRecurso(texto, exacto=False))
+        return self
+
+    def recursos(self, nombres_recursos):
+        """Eventos que usan alguno de los recursos indicados (nombres exactos)"""
+        self._filtros.append(_FiltroRecurso(list(nombres_recursos), exacto=True))
+        return self
+
+    def entre_fechas(self, fecha_inicio, fecha_fin):
+        """Eventos que se solapan con el rango de fechas (DD/MM/AAAA)"""
+        inicio = fecha_a_ordinal(fecha_inicio)
+        fin = fecha_a_ordinal(fecha_fin)
+        if inicio is None or fin is None:
+            raise ValueError(f"Formato de fecha incorrecto: {fecha_inicio} - {fecha_fin} (use DD/MM/AAAA)")
+        self._filtros.append(_FiltroFechas(inicio, fin, f"entre {fecha_inicio} y {fecha_fin}"))
+        return self
+
+    def en_fecha(self, fecha):
+        """Eventos activos en una fecha (DD/MM/AAAA)"""
+        return self.entre_fechas(fecha, fecha)
+
+    def cantidad_recursos(self, minimo=0, maximo=None):
+        """Eventos con entre minimo y maximo recursos asignados"""
+        self._filtros.append(_FiltroCantidadRecursos(minimo, maximo))
+        return self
+
+    def ordenar(self, por='fecha', ascendente=True):
+        """Ordena los resultados por 'fecha' (de inicio) o por 'nombre'"""
+        if por not in _ORDENES:
+            raise ValueError(f"Orden desconocido: {por} (use 'fecha' o 'nombre')")
+        self._orden = (por, ascendente)
+        return self
+
+    def limitar(self, cantidad):
+        """Devuelve como mucho esa cantidad de eventos"""
+        self._limite = max(0, cantidad)
+        return self
+
+    def _indice(self, nombre):
+        if nombre == 'nombres' and self._indices.get('nombres') is None and self._indice_nombres:
+            self._indices['nombres'] = self._indice_nombres()
+        return self._indices.get(nombre)
+
+    def _total(self):
+        """Eventos del calendario: el índice de fechas no cuenta los huecos de la lista"""
+        indice = self._indices['fechas']
+        return len(indice) if indice is not None else len(self._eventos)
+
+    def _planificar(self):
+        """
+        Returns:
+            dict: 'total', 'estimaciones' [(filtro, estimación)], 'guia' (filtro
+                del que se parte o None), 'costo' y 'recorrido' ('indice',
+                'orden' o 'secuencial')
+        """
+        total = self._total()
+        estimaciones = []
+        for filtro in self._filtros:
+            indice = self._indice(filtro.indice) if filtro.indice else None
+            estimaciones.append((filtro, filtro.estimar(indice) if indice is not None else None))
+
+        plan = {'total': total, 'estimaciones': estimaciones, 'guia': None,
+                'costo': total, 'recorrido': 'secuencial'}
+        con_indice = [(estimacion, posicion) for posicion, (_, estimacion) in enumerate(estimaciones)
+                      if estimacion is not None]
+        if con_indice:
+            estimacion, posicion = min(con_indice)
+            if estimacion < total:
+                plan.update(guia=estimaciones[posicion][0], costo=estimacion, recorrido='indice')
+
+        if (self._orden and self._orden[0] == 'fecha' and self._limite is not None
+                and self._indices['fechas'] is not None):
+            # Recorriendo por fecha, se espera dar con un resultado cada
+            # total / estimación eventos (la mejor estimación de los filtros)
+            selectivos = [estimacion for _, estimacion in estimaciones if estimacion is not None]
+            mejor = min(selectivos) if selectivos else total
+            costo = total if not mejor else min(total, self._limite * total // mejor)
+            if costo < plan['costo']:
+                plan.update(guia=None, costo=costo, recorrido='orden')
+        return plan
+
+    def ejecutar(self):
+        """Generador con los eventos que cumplen todos los filtros"""
+        if self._limite == 0:
+            return iter(())
+        return self._ejecutar(self._planificar())
+
+    def __iter__(self):
+        return self.ejecutar()
+
+    def _ejecutar(self, plan):
+        guia = plan['guia']
+        if plan['recorrido'] == 'indice':
+            fuente = guia.candidatos(self._indice(guia.indice))
+        elif plan['recorrido'] == 'orden':
+            fuente = self._indices['fechas'].iterar_ordenados(self._orden[1])
+        else:
+            fuente = (evento for evento in self._eventos if evento is not None)
+
+        comprobaciones = [filtro.cumple for filtro in self._filtros if filtro is not guia]
+        if len(comprobaciones) == 1:
+            resultados = filter(comprobaciones[0], fuente)
+        elif comprobaciones:
+            resultados = (evento for evento in fuente
+                          if all(cumple(evento) for cumple in comprobaciones))
+        else:
+            resultados = iter(fuente)
+
+        if self._orden and plan['recorrido'] != 'orden':
+            por, ascendente = self._orden
+            clave = _ORDENES[por]
+            if self._limite is not None:
+                # Montículo de tamaño límite: equivale a ordenar y cortar
+                seleccionar = heapq.nsmallest if ascendente else heapq.nlargest
+                resultados = seleccionar(self._limite, resultados, key=clave)
+            else:
+                resultados = sorted(resultados, key=clave, reverse=not ascendente)
+        elif self._limite is not None:
+            resultados = islice(resultados, self._limite)
+        yield from resultados
+
+    def explicar(self):
+        """Describe el plan que seguiría la consulta (sin ejecutarla)"""
+        plan = self._planificar()
+        lineas = [f"Consulta sobre {plan['total']} eventos"]
+        if plan['recorrido'] == 'indice':
+            guia = plan['guia']
+            lineas.append(f"  Parte de: índice de {guia.indice}, {guia.descripcion} (~{plan['costo']} eventos)")
+        elif plan['recorrido'] == 'orden':
+            lineas.append(f"  Parte de: índice de fechas en orden, hasta {self._limite} resultados "
+                          f"(~{plan['costo']} eventos)")
+        else:
+            lineas.append(f"  Parte de: recorrido de todos los eventos (~{plan['total']})")
+
+        for filtro, estimacion in plan['estimaciones']:
+            if filtro is plan['guia']:
+                continue
+            detalle = "sin índice" if estimacion is None else f"~{estimacion} eventos"
+            lineas.append(f"  Filtra: {filtro.descripcion} ({detalle})")
+
+        if self._orden:
+            por, ascendente = self._orden
+            sentido = "ascendente" if ascendente else "descendente"
+            if plan['recorrido'] == 'orden':
+                metodo = "ya en orden"
+            elif self._limite is not None:
+                metodo = f"montículo de {self._limite}"
+            else:
+                metodo = "ordenación completa"
+            lineas.append(f"  Orden: {por} {sentido} ({metodo})")
+        if self._limite is not None:
+            lineas.append(f"  Límite: {self._limite}")
+        return "\n".join(lineas)
@@ -0,0 +1,194 @@
+# nucleo/diario.py
+import json
+import os
+import threading
+from modelos.evento import Evento
+
+
+class Diario:
+    """Registro de solo-anexado con las mutaciones del calendario imperial"""
+
+    def __init__(self, ruta_diario, cargar_snapshot, guardar_snapshot, umbral_compactacion=500):
+        """
+        Inicializa el diario
+
+        Args:
+            ruta_diario (str): Archivo donde se anexan los registros (JSON por línea)
+            cargar_snapshot (callable): Devuelve la lista de eventos del último snapshot
+            guardar_snapshot (callable): Escribe una lista de eventos como nuevo snapshot;
+                recibe también reemplazar(ruta_temporal, ruta_snapshot), con el
+                que debe publicar el archivo escrito
+            umbral_compactacion (int): Registros acumulados que disparan la compactación
+        """
+        self.ruta_diario = ruta_diario
+        self.ruta_compactando = ruta_diario + ".compactando"
+        self.cargar_snapshot = cargar_snapshot
+        self.guardar_snapshot = guardar_snapshot
+        self.umbral_compactacion = umbral_compactacion
+
+        self._cerrojo = threading.Lock()
+        self._hilo_compactacion = None
+        self.registros_pendientes = self._contar_registros(self.ruta_diario)
+
+    @staticmethod
+    def _contar_registros(ruta):
+        """Cuenta las líneas de un archivo de diario"""
+        if not os.path.exists(ruta):
+            return 0
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return sum(1 for linea in f if linea.strip())
+
+    @staticmethod
+    def _leer_registros(ruta):
+        """Lee los registros de un archivo de diario, ignorando una cola truncada"""
+        registros = []
+        if not os.path.exists(ruta):
+            return registros
+
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    # Escritura interrumpida: el resto del archivo no es fiable
+                    print(f"⚠️ Registro incompleto en {ruta}, se ignora el resto")
+                    break
+        return registros
+
+    def anexar(self, registros):
+        """Anexa registros al diario con una sola escritura"""
+        if not registros:
+            return True
+
+        lineas = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+        with self._cerrojo:
+            with open(self.ruta_diario, 'a', encoding='utf-8') as f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+            self.registros_pendientes += len(registros)
+            necesita_compactar = self.registros_pendientes >= self.umbral_compactacion
+
+        if necesita_compactar:
+            self.compactar_en_segundo_plano()
+        return True
+
+    def leer(self):
+        """Devuelve todos los registros aún no incorporados al snapshot, en orden"""
+        with self._cerrojo:
+            return (self._leer_registros(self.ruta_compactando) +
+                    self._leer_registros(self.ruta_diario))
+
+    def leer_con_snapshot(self, abrir_snapshot):
+        """
+        Devuelve (snapshot, registros) de un mismo estado del diario
+
+        abrir_snapshot se llama con el cerrojo tomado: lo que abra (p. ej. el
+        archivo del snapshot) corresponde a esos registros aunque después
+        termine una compactación.
+        """
+        with self._cerrojo:
+            snapshot = abrir_snapshot()
+            registros = (self._leer_registros(self.ruta_compactando) +
+                         self._leer_registros(self.ruta_diario))
+        return snapshot, registros
+
+    @staticmethod
+    def aplicar(eventos, registros):
+        """Reproduce los registros sobre una lista de eventos (en el lugar)"""
+        # Posiciones de cada id (varias si se repite); las bajas dejan un hueco
+        # que se quita al final, para no desplazar la lista en cada una
+        posiciones = {}
+        for i, evento in enumerate(eventos):
+            posiciones.setdefault(evento.id, []).append(i)
+        huecos = 0
+
+        for registro in registros:
+            operacion = registro.get('op')
+            if operacion == 'alta':
+                evento = Evento.desde_diccionario(registro['evento'])
+                posiciones.setdefault(evento.id, []).append(len(eventos))
+                eventos.append(evento)
+            elif operacion == 'baja':
+                # Por id; los registros anteriores a los ids, por nombre
+                id_evento = registro.get('id')
+                if id_evento:
+                    lista = posiciones.get(id_evento)
+                    if not lista:
+                        continue
+                    i = lista.pop(0)
+                else:
+                    i = next((i for i, evento in enumerate(eventos)
+                              if evento is not None and evento.nombre == registro['nombre']), None)
+                    if i is None:
+                        continue
+                    posiciones[eventos[i].id].remove(i)
+                eventos[i] = None
+                huecos += 1
+
+        if huecos:
+            eventos[:] = [evento for evento in eventos if evento is not None]
+        return eventos
+
+    def compactar_en_segundo_plano(self):
+        """Lanza la compactación en un hilo si no hay otra en marcha"""
+        with self._cerrojo:
+            if self._hilo_compactacion is not None and self._hilo_compactacion.is_alive():
+                return False
+
+            # Rotar el diario: las nuevas mutaciones irán a un archivo limpio
+            if not os.path.exists(self.ruta_compactando):
+                if not os.path.exists(self.ruta_diario):
+                    return False
+                os.replace(self.ruta_diario, self.ruta_compactando)
+                self.registros_pendientes = 0
+
+            self._hilo_compactacion = threading.Thread(
+                target=self._compactar,
+                name="compactacion-diario",
+                daemon=True
+            )
+            self._hilo_compactacion.start()
+        return True
+
+    def _compactar(self):
+        """Incorpora el diario rotado a un nuevo snapshot"""
+        try:
+            eventos = self.cargar_snapshot()
+            self.aplicar(eventos, self._leer_registros(self.ruta_compactando))
+            if self.guardar_snapshot(eventos, reemplazar=self._publicar_compactado):
+                print(f"🗜️ Diario compactado ({len(eventos)} eventos en snapshot)")
+        except Exception as e:
+            print(f"❌ Error compactando diario: {e}")
+
+    def _publicar_compactado(self, ruta_temporal, ruta_snapshot):
+        """
+        Sustituye el snapshot y retira el diario rotado en un solo paso para
+        los lectores: si no, uno podría leer el snapshot nuevo junto con los
+        registros que ya incorpora y aplicarlos dos veces
+        """
+        with self._cerrojo:
+            os.replace(ruta_temporal, ruta_snapshot)
+            os.remove(self.ruta_compactando)
+
+    def esperar_compactacion(self):
+        """Bloquea hasta que termine la compactación en curso"""
+        hilo = self._hilo_compactacion
+        if hilo is not None:
+            hilo.join()
+
+    def reiniciar(self):
+        """Descarta el diario tras escribir un snapshot completo"""
+        self.esperar_compactacion()
+        with self._cerrojo:
+            for ruta in (self.ruta_compactando, self.ruta_diario):
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+            self.registros_pendientes = 0
+
+    def archivos(self):
+        """Rutas de los archivos de diario que existen en disco"""
+        return [ruta for ruta in (self.ruta_compactando, self.ruta_diario) if os.path.exists(ruta)]
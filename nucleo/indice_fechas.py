@@ -0,0 +1,214 @@
+# nucleo/indice_fechas.py
+from datetime import date
+from functools import lru_cache
+from modelos.indice_intervalos import IndiceIntervalos
+from nucleo.indice_ordenado import IndiceOrdenado
+
+# Índice de los eventos de un calendario por su intervalo [inicio_ord, fin_ord].
+# Cada evento recibe un número de secuencia al indexarse; como el calendario
+# solo agrega al final, ordenar por secuencia devuelve los resultados en el
+# mismo orden que el recorrido lineal de la lista de eventos.
+#
+# Además del árbol de intervalos (fecha concreta, rangos, en curso) mantiene
+# los eventos ordenados por inicio y por fin, para listar por fecha y para
+# las consultas de horizonte (próximos días, ya terminados). Si cambian las
+# fechas de un evento indexado, hay que quitarlo y volver a agregarlo.
+#
+# Para paginar por fecha hay además una lista por (inicio, id del evento): el
+# cursor de una página es el par de su último evento, que sigue valiendo
+# aunque entre páginas se agreguen o eliminen eventos.
+#
+# También lleva la cuenta de eventos por mes de inicio, al día en cada alta y
+# baja, para que el informe no tenga que recorrer los eventos. Los meses se
+# devuelven en el orden de su primer evento, como Buscador.contar_eventos_por_mes.
+
+
+@lru_cache(maxsize=4096)
+def _clave_mes(ordinal):
+    dia = date.fromordinal(ordinal)
+    return f"{dia.year}-{dia.month:02d}"
+
+
+def _rango_mes(clave):
+    """Primer y último ordinal de un mes AAAA-MM"""
+    anio, mes = map(int, clave.split('-'))
+    primero = date(anio, mes, 1).toordinal()
+    siguiente = date(anio + mes // 12, mes % 12 + 1, 1).toordinal()
+    return primero, siguiente - 1
+
+
+class IndiceFechas:
+    """Consultas por fecha, rango y orden en O(log n + k) sobre los eventos de un calendario"""
+
+    def __init__(self, eventos=()):
+        self.reconstruir(eventos)
+
+    def reconstruir(self, eventos):
+        """Indexa de nuevo una lista completa de eventos"""
+        self._siguiente = 0
+        self._secuencias = {}  # {id del evento: secuencia}
+        self._eventos = {}  # {secuencia: evento}
+        self._fechas = {}  # {secuencia: (inicio_ord, fin_ord) al indexarlo}
+        # Fechas válidas pero con fin anterior al inicio: el árbol guardaría el
+        # intervalo invertido, así que se comprueban aparte, como en el Buscador
+        self._invertidos = {}  # {secuencia: evento}
+        self._por_mes = {}  # {mes: eventos que empiezan en él}
+        self._primera_del_mes = {}  # {mes: secuencia de su primer evento}
+        self._meses_revisar = set()  # Meses cuyo primer evento se quitó
+        intervalos = []
+        inicios = []
+        fines = []
+        paginas = []
+        for evento in eventos:
+            secuencia, inicio, fin = self._registrar(evento)
+            if self._en_arbol(secuencia, evento, inicio, fin):
+                intervalos.append((secuencia, inicio, fin))
+            inicios.append((secuencia, inicio or 0))
+            if fin is not None:
+                fines.append((secuencia, fin))
+            paginas.append((evento.id, inicio or 0))
+        self._arbol = IndiceIntervalos(intervalos)
+        # Inicio no válido cuenta como 0, igual que en Buscador.ordenar_por_fecha
+        self._por_inicio = IndiceOrdenado(inicios)
+        self._por_fin = IndiceOrdenado(fines)
+        self._paginas = IndiceOrdenado(paginas)
+
+    def __len__(self):
+        """Eventos registrados (también los que no tienen fechas válidas)"""
+        return len(self._eventos)
+
+    def _registrar(self, evento):
+        secuencia = self._siguiente
+        self._siguiente += 1
+        self._secuencias[evento.id] = secuencia
+        self._eventos[secuencia] = evento
+        self._fechas[secuencia] = (evento.inicio_ord, evento.fin_ord)
+        if evento.inicio_ord is not None:
+            mes = _clave_mes(evento.inicio_ord)
+            self._por_mes[mes] = self._por_mes.get(mes, 0) + 1
+            self._primera_del_mes.setdefault(mes, secuencia)
+        return secuencia, evento.inicio_ord, evento.fin_ord
+
+    def _en_arbol(self, secuencia, evento, inicio, fin):
+        # Solo los intervalos válidos van al árbol
+        if inicio is None or fin is None:
+            return False
+        if fin < inicio:
+            self._invertidos[secuencia] = evento
+            return False
+        return True
+
+    def agregar(self, evento):
+        """Indexa un evento agregado al final del calendario"""
+        secuencia, inicio, fin = self._registrar(evento)
+        if self._en_arbol(secuencia, evento, inicio, fin):
+            self._arbol.insertar(secuencia, inicio, fin)
+        self._por_inicio.insertar(secuencia, inicio or 0)
+        if fin is not None:
+            self._por_fin.insertar(secuencia, fin)
+        self._paginas.insertar(evento.id, inicio or 0)
+
+    def quitar(self, evento):
+        """Deja de indexar un evento; devuelve False si no estaba"""
+        secuencia = self._secuencias.pop(evento.id, None)
+        if secuencia is None:
+            return False
+        del self._eventos[secuencia]
+        inicio, fin = self._fechas.pop(secuencia)
+        self._invertidos.pop(secuencia, None)
+        self._arbol.eliminar(secuencia)
+        self._por_inicio.eliminar(secuencia, inicio or 0)
+        if fin is not None:
+            self._por_fin.eliminar(secuencia, fin)
+        self._paginas.eliminar(evento.id, inicio or 0)
+        if inicio is not None:
+            mes = _clave_mes(inicio)
+            self._por_mes[mes] -= 1
+            if not self._por_mes[mes]:
+                del self._por_mes[mes]
+                del self._primera_del_mes[mes]
+                self._meses_revisar.discard(mes)
+            elif self._primera_del_mes[mes] == secuencia:
+                self._meses_revisar.add(mes)
+        return True
+
+    def solapados(self, inicio, fin):
+        """Eventos con inicio <= fin y fin >= inicio (ordinales), en orden del calendario"""
+        secuencias = self._arbol.solapados(inicio, fin)
+        for secuencia, evento in self._invertidos.items():
+            if evento.inicio_ord <= fin and evento.fin_ord >= inicio:
+                secuencias.append(secuencia)
+        secuencias.sort()
+        return [self._eventos[secuencia] for secuencia in secuencias]
+
+    def en_fecha(self, ordinal):
+        """Eventos activos en un día (inicio <= ordinal <= fin), en orden del calendario"""
+        return self.solapados(ordinal, ordinal)
+
+    def ordenados(self, ascendente=True):
+        """Eventos por fecha de inicio (los de inicio no válido, primero)"""
+        return [self._eventos[secuencia] for secuencia in self._por_inicio.claves(ascendente)]
+
+    def iterar_ordenados(self, ascendente=True):
+        """Los eventos de ordenados(), de uno en uno (para leer solo los primeros)"""
+        for secuencia in self._por_inicio.iterar(ascendente):
+            yield self._eventos[secuencia]
+
+    def pagina(self, tamano, cursor=None, ascendente=True):
+        """
+        Una página de eventos por (inicio, id), en O(log n + tamano)
+
+        Returns:
+            tuple: (eventos, cursor de la página siguiente o None si no hay más)
+        """
+        pares, hay_mas = self._paginas.pagina(tamano, cursor and tuple(cursor), ascendente)
+        eventos = [self._eventos[self._secuencias[id_evento]] for _, id_evento in pares]
+        return eventos, (pares[-1] if pares and hay_mas else None)
+
+    def inician_entre(self, desde, hasta):
+        """Eventos con desde <= inicio <= hasta, por inicio"""
+        if desde <= 0:
+            desde = 1  # Los inicios no válidos se guardan como 0
+        return [self._eventos[secuencia] for secuencia in self._por_inicio.entre(desde, hasta)]
+
+    def contar_solapados(self, inicio, fin):
+        """Cantidad de eventos que devolvería solapados(inicio, fin), sin ordenarlos"""
+        cantidad = len(self._arbol.solapados(inicio, fin))
+        for evento in self._invertidos.values():
+            if evento.inicio_ord <= fin and evento.fin_ord >= inicio:
+                cantidad += 1
+        return cantidad
+
+    def estimar_solapados(self, inicio, fin):
+        """
+        Aproximación de contar_solapados(inicio, fin) en O(log n): los que
+        empiezan hasta fin menos los que ya terminaron antes de inicio (exacta
+        salvo por los eventos con alguna fecha no válida o invertida)
+        """
+        return max(0, self.contar_inician_entre(1, fin) - self.contar_terminados_antes(inicio))
+
+    def contar_inician_entre(self, desde, hasta):
+        """Cantidad de eventos con desde <= inicio <= hasta, en O(log n)"""
+        return self._por_inicio.contar_entre(max(desde, 1), hasta)
+
+    def contar_terminados_antes(self, limite):
+        """Cantidad de eventos con fin < limite, en O(log n)"""
+        return self._por_fin.contar_menores_que(limite)
+
+    def asentar(self):
+        """Busca el nuevo primer evento de los meses cuyo primero se quitó"""
+        for mes in self._meses_revisar:
+            self._primera_del_mes[mes] = min(self._por_inicio.entre(*_rango_mes(mes)))
+        self._meses_revisar.clear()
+
+    def conteo_por_mes(self):
+        """{AAAA-MM: eventos que empiezan ese mes}, en el orden de su primer evento"""
+        self.asentar()
+        meses = sorted(self._por_mes, key=self._primera_del_mes.__getitem__)
+        return {mes: self._por_mes[mes] for mes in meses}
+
+    def terminados_antes(self, limite):
+        """Eventos con fin < limite, en orden del calendario"""
+        secuencias = self._por_fin.menores_que(limite)
+        secuencias.sort()
+        return [self._eventos[secuencia] for secuencia in secuencias]
@@ -0,0 +1,54 @@
+# nucleo/indice_orden_nombres.py
+from nucleo.indice_ordenado import IndiceOrdenado
+
+# Eventos de un calendario ordenados por (nombre en minúsculas, id), para
+# paginar por nombre con un cursor como el de IndiceFechas para las fechas: el
+# par del último evento de una página sigue valiendo aunque entre páginas se
+# agreguen o eliminen eventos. Es una sola lista ordenada, así que se mantiene
+# en cada alta y baja sin construir el índice de trigramas de las búsquedas.
+# Si cambia el nombre de un evento indexado, hay que quitarlo y volver a
+# agregarlo.
+
+
+class IndiceOrdenNombres:
+    """Páginas de eventos por nombre en O(log n + tamaño)"""
+
+    def __init__(self, eventos=()):
+        self.reconstruir(eventos)
+
+    def reconstruir(self, eventos):
+        """Indexa de nuevo una lista completa de eventos"""
+        self._eventos = {}  # {id del evento: evento}
+        self._nombres = {}  # {id del evento: nombre en minúsculas al indexarlo}
+        for evento in eventos:
+            self._eventos[evento.id] = evento
+            self._nombres[evento.id] = evento.nombre.lower()
+        self._orden = IndiceOrdenado(self._nombres.items())
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def agregar(self, evento):
+        """Indexa un evento agregado al calendario"""
+        nombre = evento.nombre.lower()
+        self._eventos[evento.id] = evento
+        self._nombres[evento.id] = nombre
+        self._orden.insertar(evento.id, nombre)
+
+    def quitar(self, evento):
+        """Deja de indexar un evento; devuelve False si no estaba"""
+        if self._eventos.pop(evento.id, None) is None:
+            return False
+        self._orden.eliminar(evento.id, self._nombres.pop(evento.id))
+        return True
+
+    def pagina(self, tamano, cursor=None, ascendente=True):
+        """
+        Una página de eventos por (nombre en minúsculas, id)
+
+        Returns:
+            tuple: (eventos, cursor de la página siguiente o None si no hay más)
+        """
+        pares, hay_mas = self._orden.pagina(tamano, cursor and tuple(cursor), ascendente)
+        eventos = [self._eventos[id_evento] for _, id_evento in pares]
+        return eventos, (pares[-1] if pares and hay_mas else None)
@@ -0,0 +1,111 @@
+# nucleo/indice_ordenado.py
+from bisect import bisect_left, bisect_right, insort
+
+# Lista ordenada de pares (valor, clave) mantenida con bisect: cada alta o
+# baja es una búsqueda binaria más un desplazamiento de la lista (memmove en
+# C), y las consultas por rango de valores son dos búsquedas binarias y un
+# corte. Con claves crecientes, los empates de valor quedan en orden de alta.
+#
+# Las claves pueden ser de cualquier tipo comparable y único (p. ej. el id de
+# cada evento) si solo se usa pagina(): las consultas por rango de valores
+# comparan las claves con -inf/inf y necesitan claves numéricas.
+
+_CLAVE_MINIMA = float('-inf')
+_CLAVE_MAXIMA = float('inf')
+
+
+class IndiceOrdenado:
+    """Claves ordenadas por un valor comparable (aquí, ordinales de día)"""
+
+    def __init__(self, pares=None):
+        """
+        Args:
+            pares (iterable): Tuplas (clave, valor) iniciales (opcional)
+        """
+        self._pares = sorted((valor, clave) for clave, valor in pares or ())
+
+    def __len__(self):
+        return len(self._pares)
+
+    def insertar(self, clave, valor):
+        insort(self._pares, (valor, clave))
+
+    def eliminar(self, clave, valor):
+        """Quita un par; devuelve False si no estaba"""
+        posicion = bisect_left(self._pares, (valor, clave))
+        if posicion < len(self._pares) and self._pares[posicion] == (valor, clave):
+            del self._pares[posicion]
+            return True
+        return False
+
+    def claves(self, ascendente=True):
+        """
+        Todas las claves por valor. En orden descendente los empates conservan
+        el orden de alta, como sort(reverse=True) con una ordenación estable.
+        """
+        if ascendente:
+            return [clave for _, clave in self._pares]
+
+        resultado = []
+        fin_grupo = len(self._pares)
+        while fin_grupo > 0:
+            valor = self._pares[fin_grupo - 1][0]
+            inicio_grupo = bisect_left(self._pares, (valor, _CLAVE_MINIMA), 0, fin_grupo)
+            resultado.extend(clave for _, clave in self._pares[inicio_grupo:fin_grupo])
+            fin_grupo = inicio_grupo
+        return resultado
+
+    def iterar(self, ascendente=True):
+        """
+        Las mismas claves que claves(), de una en una, sin copiar la lista
+        (no debe modificarse el índice mientras se recorre)
+        """
+        if ascendente:
+            for _, clave in self._pares:
+                yield clave
+            return
+
+        fin_grupo = len(self._pares)
+        while fin_grupo > 0:
+            valor = self._pares[fin_grupo - 1][0]
+            inicio_grupo = bisect_left(self._pares, (valor, _CLAVE_MINIMA), 0, fin_grupo)
+            for posicion in range(inicio_grupo, fin_grupo):
+                yield self._pares[posicion][1]
+            fin_grupo = inicio_grupo
+
+    def pagina(self, tamano, despues=None, ascendente=True):
+        """
+        Paginación por cursor: hasta tamano pares (valor, clave) a continuación
+        del par despues (el último de la página anterior, aunque ya no esté en
+        el índice), en O(log n + tamano).
+
+        Returns:
+            tuple: (pares, hay_mas)
+        """
+        if ascendente:
+            desde = 0 if despues is None else bisect_right(self._pares, despues)
+            hasta = desde + tamano
+            return self._pares[desde:hasta], hasta < len(self._pares)
+        hasta = len(self._pares) if despues is None else bisect_left(self._pares, despues)
+        desde = max(0, hasta - tamano)
+        return self._pares[desde:hasta][::-1], desde > 0
+
+    def entre(self, desde, hasta):
+        """Claves con desde <= valor <= hasta, por valor"""
+        izquierda = bisect_left(self._pares, (desde, _CLAVE_MINIMA))
+        derecha = bisect_right(self._pares, (hasta, _CLAVE_MAXIMA))
+        return [clave for _, clave in self._pares[izquierda:derecha]]
+
+    def contar_entre(self, desde, hasta):
+        """Cantidad de claves con desde <= valor <= hasta, en O(log n)"""
+        izquierda = bisect_left(self._pares, (desde, _CLAVE_MINIMA))
+        return max(0, bisect_right(self._pares, (hasta, _CLAVE_MAXIMA)) - izquierda)
+
+    def contar_menores_que(self, limite):
+        """Cantidad de claves con valor < limite, en O(log n)"""
+        return bisect_left(self._pares, (limite, _CLAVE_MINIMA))
+
+    def menores_que(self, limite):
+        """Claves con valor < limite, por valor"""
+        derecha = bisect_left(self._pares, (limite, _CLAVE_MINIMA))
+        return [clave for _, clave in self._pares[:derecha]]
@@ -0,0 +1,130 @@
+# nucleo/indice_recursos.py
+from modelos.recurso import Recurso
+
+# Índice invertido recurso -> eventos que lo usan. El vocabulario de recursos
+# es pequeño y los eventos muchos: una búsqueda por texto compara el texto con
+# cada nombre de recurso y une las listas de los que coinciden, así que su
+# coste depende de los eventos encontrados y no del total. Como en
+# IndiceFechas, cada evento recibe un número de secuencia al indexarse y los
+# resultados salen en el orden del calendario. Si cambian los recursos de un
+# evento indexado, hay que quitarlo y volver a agregarlo.
+#
+# También mantiene los usos de cada recurso y los eventos sin recursos, al día
+# en cada alta y baja, para que el informe no tenga que recorrer los eventos.
+
+
+class IndiceRecursos:
+    """Listas de eventos por recurso para las búsquedas por recurso"""
+
+    def __init__(self, eventos=()):
+        self.reconstruir(eventos)
+
+    def reconstruir(self, eventos):
+        """Indexa de nuevo una lista completa de eventos"""
+        self._siguiente = 0
+        self._secuencias = {}  # {id del evento: secuencia}
+        self._eventos = {}  # {secuencia: evento}
+        self._recursos = {}  # {secuencia: recursos al indexarlo}
+        self._postings = {}  # {recurso: {secuencias}}
+        self._minusculas = {}  # {recurso: nombre en minúsculas}
+        self._usos = {}  # {recurso: veces que aparece en los eventos}
+        # Primera aparición de cada recurso (secuencia, posición en el evento),
+        # para desempatar las estadísticas como el recorrido lineal
+        self._primera = {}  # {recurso: (secuencia, posición)}
+        self._revisar = set()  # Recursos cuya primera aparición se quitó
+        self._sin_recursos = 0
+        for evento in eventos:
+            self.agregar(evento)
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def agregar(self, evento):
+        """Indexa un evento agregado al final del calendario"""
+        secuencia = self._siguiente
+        self._siguiente += 1
+        recursos = tuple(evento.recursos)
+        self._secuencias[evento.id] = secuencia
+        self._eventos[secuencia] = evento
+        self._recursos[secuencia] = recursos
+        if not recursos:
+            self._sin_recursos += 1
+        for posicion, recurso in enumerate(recursos):
+            secuencias = self._postings.get(recurso)
+            if secuencias is None:
+                secuencias = self._postings[recurso] = set()
+                self._minusculas[recurso] = recurso.lower()
+                self._primera[recurso] = (secuencia, posicion)
+            secuencias.add(secuencia)
+            self._usos[recurso] = self._usos.get(recurso, 0) + 1
+
+    def quitar(self, evento):
+        """Deja de indexar un evento; devuelve False si no estaba"""
+        secuencia = self._secuencias.pop(evento.id, None)
+        if secuencia is None:
+            return False
+        del self._eventos[secuencia]
+        recursos = self._recursos.pop(secuencia)
+        if not recursos:
+            self._sin_recursos -= 1
+        for recurso in recursos:
+            self._usos[recurso] -= 1
+        for recurso in set(recursos):
+            secuencias = self._postings[recurso]
+            secuencias.discard(secuencia)
+            if not secuencias:
+                del self._postings[recurso]
+                del self._minusculas[recurso]
+                del self._usos[recurso]
+                del self._primera[recurso]
+                self._revisar.discard(recurso)
+            elif self._primera[recurso][0] == secuencia:
+                self._revisar.add(recurso)
+        return True
+
+    def sin_recursos(self):
+        """Cantidad de eventos indexados sin recursos"""
+        return self._sin_recursos
+
+    def asentar(self):
+        """Busca la nueva primera aparición de los recursos cuyo primer evento se quitó"""
+        for recurso in self._revisar:
+            # El siguiente es el menor de su lista
+            secuencia = min(self._postings[recurso])
+            self._primera[recurso] = (secuencia, self._recursos[secuencia].index(recurso))
+        self._revisar.clear()
+
+    def estadisticas(self):
+        """Usos de cada recurso, como Buscador.estadisticas_recursos"""
+        self.asentar()
+        recursos = sorted(self._usos, key=self._primera.__getitem__)
+        # Orden estable: los empates quedan por orden de aparición
+        recursos.sort(key=self._usos.__getitem__, reverse=True)
+        return {recurso: self._usos[recurso] for recurso in recursos}
+
+    def recursos_coincidentes(self, texto):
+        """Recursos en uso cuyo nombre contiene el texto (sin distinguir mayúsculas)"""
+        texto = texto.lower()
+        return [recurso for recurso, nombre in self._minusculas.items() if texto in nombre]
+
+    def buscar(self, texto):
+        """Eventos con algún recurso cuyo nombre contiene el texto, en orden del calendario"""
+        return self.con_recursos(self.recursos_coincidentes(texto))
+
+    def estimar(self, recursos):
+        """Cota superior de len(con_recursos(recursos)), sin unir las listas"""
+        return sum(len(self._postings.get(recurso, ())) for recurso in recursos)
+
+    def con_recursos(self, recursos):
+        """Eventos que usan alguno de los recursos indicados (nombres exactos), en orden del calendario"""
+        recursos = [recurso for recurso in recursos if recurso in self._postings]
+        listas = [self._postings[recurso] for recurso in recursos]
+        if not listas:
+            return []
+        if sum(map(len, listas)) > len(self._eventos) // 8:
+            # Resultado grande: unir y ordenar las listas cuesta más que recorrer
+            # los eventos (ya en orden de secuencia) con su máscara de recursos
+            mascara = Recurso.mascara(recursos, registrar=False)
+            return [evento for evento in self._eventos.values() if evento.mascara_recursos & mascara]
+        secuencias = listas[0] if len(listas) == 1 else set().union(*listas)
+        return [self._eventos[secuencia] for secuencia in sorted(secuencias)]
@@ -0,0 +1,134 @@
+# nucleo/indice_trigramas.py
+from bisect import bisect_left, insort
+
+# Índice invertido de trigramas sobre los nombres de los eventos en minúsculas
+# (la misma normalización que Buscador.buscar_por_nombre). Un texto de tres o
+# más caracteres solo puede estar en los nombres que contienen todos sus
+# trigramas: se intersecan esas listas, empezando por la más corta, y se
+# comprueba el texto en los candidatos.
+#
+# Cada nombre se indexa con dos caracteres de relleno al final, así que todo
+# fragmento de uno o dos caracteres es el prefijo de algún trigrama. Las
+# consultas cortas buscan ese prefijo en el vocabulario ordenado de trigramas
+# (búsqueda binaria) y unen las listas de los que empiezan por él, sin tener
+# que comprobar nada más.
+
+_RELLENO = "\0\0"
+_MAXIMO = "\U0010ffff"
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """Búsqueda de texto contenido en los nombres de los eventos sin recorrerlos todos"""
+
+    def __init__(self, eventos=()):
+        self.reconstruir(eventos)
+
+    def reconstruir(self, eventos):
+        """Indexa de nuevo una lista completa de eventos"""
+        self._siguiente = 0
+        self._secuencias = {}  # {id del evento: secuencia}
+        self._eventos = {}  # {secuencia: evento}
+        self._nombres = {}  # {secuencia: nombre en minúsculas}
+        self._postings = {}  # {trigrama: {secuencias}}
+        for evento in eventos:
+            self._registrar(evento)
+        self._vocabulario = sorted(self._postings)
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def _registrar(self, evento):
+        secuencia = self._siguiente
+        self._siguiente += 1
+        nombre = evento.nombre.lower()
+        self._secuencias[evento.id] = secuencia
+        self._eventos[secuencia] = evento
+        self._nombres[secuencia] = nombre
+
+        nuevos = []
+        for trigrama in _trigramas(nombre + _RELLENO):
+            secuencias = self._postings.get(trigrama)
+            if secuencias is None:
+                secuencias = self._postings[trigrama] = set()
+                nuevos.append(trigrama)
+            secuencias.add(secuencia)
+        return nuevos
+
+    def agregar(self, evento):
+        """Indexa un evento agregado al final del calendario"""
+        for trigrama in self._registrar(evento):
+            insort(self._vocabulario, trigrama)
+
+    def quitar(self, evento):
+        """Deja de indexar un evento; devuelve False si no estaba"""
+        secuencia = self._secuencias.pop(evento.id, None)
+        if secuencia is None:
+            return False
+        del self._eventos[secuencia]
+        nombre = self._nombres.pop(secuencia)
+        for trigrama in _trigramas(nombre + _RELLENO):
+            secuencias = self._postings[trigrama]
+            secuencias.discard(secuencia)
+            if not secuencias:
+                del self._postings[trigrama]
+                del self._vocabulario[bisect_left(self._vocabulario, trigrama)]
+        return True
+
+    def buscar(self, texto):
+        """Eventos cuyo nombre contiene el texto (sin distinguir mayúsculas), en orden del calendario"""
+        texto = texto.lower()
+        if not texto:
+            return [self._eventos[secuencia] for secuencia in sorted(self._eventos)]
+
+        if len(texto) < 3:
+            secuencias = self._con_prefijo(texto)
+        else:
+            secuencias = self._candidatos(texto)
+            if len(texto) > 3:
+                # Tener todos los trigramas no garantiza tenerlos seguidos
+                nombres = self._nombres
+                secuencias = [secuencia for secuencia in secuencias if texto in nombres[secuencia]]
+        return [self._eventos[secuencia] for secuencia in sorted(secuencias)]
+
+    def estimar(self, texto):
+        """
+        Cota superior de len(buscar(texto)) sin intersecar: la lista más corta
+        de sus trigramas (o, con menos de tres caracteres, las del prefijo)
+        """
+        texto = texto.lower()
+        if not texto:
+            return len(self._eventos)
+        if len(texto) < 3:
+            desde = bisect_left(self._vocabulario, texto)
+            hasta = bisect_left(self._vocabulario, texto + _MAXIMO, desde)
+            return min(len(self._eventos),
+                       sum(len(self._postings[trigrama]) for trigrama in self._vocabulario[desde:hasta]))
+        return min(len(self._postings.get(trigrama, ())) for trigrama in _trigramas(texto))
+
+    def _candidatos(self, texto):
+        listas = []
+        for trigrama in _trigramas(texto):
+            secuencias = self._postings.get(trigrama)
+            if not secuencias:
+                return set()
+            listas.append(secuencias)
+        listas.sort(key=len)
+
+        candidatos = set(listas[0])
+        for secuencias in listas[1:]:
+            candidatos &= secuencias
+            if not candidatos:
+                break
+        return candidatos
+
+    def _con_prefijo(self, texto):
+        resultado = set()
+        desde = bisect_left(self._vocabulario, texto)
+        hasta = bisect_left(self._vocabulario, texto + _MAXIMO, desde)
+        for trigrama in self._vocabulario[desde:hasta]:
+            resultado |= self._postings[trigrama]
+        return resultado
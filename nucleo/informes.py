@@ -0,0 +1,289 @@
+# nucleo/informes.py
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from itertools import islice
+
+# Informes en una sola pasada: cada Agregador acumula su parte del informe y
+# el MotorInformes recorre los eventos una única vez, por bloques, pasando
+# cada bloque a todos los agregadores (un bloque cabe en caché y los
+# agregadores lo procesan con comprensiones, sin una llamada por evento).
+# Para añadir una clave al informe basta con registrar otro agregador
+# (registrar_agregador para el informe del calendario).
+#
+# Las claves predeterminadas son las que espera la ventana de estadísticas
+# (PlanificadorRomanoApp.mostrar_estadisticas), con los mismos criterios que
+# las consultas del Buscador.
+
+TAMANO_BLOQUE = 1024  # Eventos por bloque de la pasada
+
+
+def momento_actual():
+    """
+    Ordinal de hoy y si ya pasó la medianoche (igual que Buscador._ahora): una
+    fecha sin hora equivale a las 00:00, así que el propio día de hoy ya es
+    "pasado" salvo exactamente a medianoche
+    """
+    ahora = datetime.now()
+    return ahora.toordinal(), 1 if ahora.time() != time.min else 0
+
+
+class Agregador(ABC):
+    """
+    Parte de un informe. Se crea uno nuevo para cada informe; el motor llama
+    a iniciar(), después a agregar_bloque() con cada bloque de eventos y al
+    final a resultado(). Basta con implementar agregar() (un evento) y
+    resultado().
+    """
+
+    clave = None  # Clave del informe en la que se guarda el resultado
+
+    def iniciar(self, ahora):
+        """Recibe (ordinal de hoy, desfase) una vez, antes de la pasada"""
+        pass
+
+    @abstractmethod
+    def agregar(self, evento):
+        """Acumula un evento"""
+
+    def agregar_bloque(self, eventos):
+        for evento in eventos:
+            self.agregar(evento)
+
+    @abstractmethod
+    def resultado(self):
+        """Valor de la clave del informe tras la pasada"""
+
+
+class Contador(Agregador):
+    """Cuenta los eventos que cumplen cumple(evento)"""
+
+    def __init__(self):
+        self.total = 0
+
+    def cumple(self, evento):
+        return True
+
+    def agregar(self, evento):
+        if self.cumple(evento):
+            self.total += 1
+
+    def agregar_bloque(self, eventos):
+        self.total += len(list(filter(self.cumple, eventos)))
+
+    def resultado(self):
+        return self.total
+
+
+class TotalEventos(Contador):
+    clave = 'total_eventos'
+
+    def agregar_bloque(self, eventos):
+        self.total += len(eventos)
+
+
+class EventosProximos(Contador):
+    """Eventos que empiezan en los próximos días (como Buscador.eventos_proximos)"""
+
+    clave = 'eventos_proximos_7_dias'
+    dias = 7
+
+    def iniciar(self, ahora):
+        hoy, desfase = ahora
+        self._desde = hoy + desfase
+        self._hasta = hoy + desfase + self.dias
+
+    def cumple(self, evento):
+        inicio = evento.inicio_ord
+        return inicio is not None and self._desde <= inicio <= self._hasta
+
+    def agregar_bloque(self, eventos):
+        desde, hasta = self._desde, self._hasta
+        self.total += len([None for evento in eventos
+                           if evento.inicio_ord is not None and desde <= evento.inicio_ord <= hasta])
+
+
+class EventosEnCurso(Contador):
+    clave = 'eventos_en_curso'
+
+    def iniciar(self, ahora):
+        self._hoy, desfase = ahora
+        self._ahora = self._hoy + desfase
+
+    def cumple(self, evento):
+        return (evento.inicio_ord is not None and evento.fin_ord is not None
+                and evento.inicio_ord <= self._hoy and evento.fin_ord >= self._ahora)
+
+    def agregar_bloque(self, eventos):
+        hoy, ahora = self._hoy, self._ahora
+        self.total += len([None for evento in eventos
+                           if evento.inicio_ord is not None and evento.fin_ord is not None
+                           and evento.inicio_ord <= hoy and evento.fin_ord >= ahora])
+
+
+class EventosPasados(Contador):
+    clave = 'eventos_pasados'
+
+    def iniciar(self, ahora):
+        hoy, desfase = ahora
+        self._ahora = hoy + desfase
+
+    def cumple(self, evento):
+        return evento.fin_ord is not None and evento.fin_ord < self._ahora
+
+    def agregar_bloque(self, eventos):
+        ahora = self._ahora
+        self.total += len([None for evento in eventos
+                           if evento.fin_ord is not None and evento.fin_ord < ahora])
+
+
+class EventosSinRecursos(Contador):
+    clave = 'eventos_sin_recursos'
+
+    def cumple(self, evento):
+        return not evento.recursos
+
+    def agregar_bloque(self, eventos):
+        self.total += len([None for evento in eventos if not evento.recursos])
+
+
+class EstadisticasRecursos(Agregador):
+    """Usos de cada recurso, de más a menos usado (empates en orden de aparición)"""
+
+    clave = 'estadisticas_recursos'
+
+    def __init__(self):
+        self.conteo = {}
+
+    def agregar(self, evento):
+        self.agregar_bloque((evento,))
+
+    def agregar_bloque(self, eventos):
+        conteo = self.conteo
+        for evento in eventos:
+            for recurso in evento.recursos:
+                conteo[recurso] = conteo.get(recurso, 0) + 1
+
+    def resultado(self):
+        return dict(sorted(self.conteo.items(), key=lambda x: x[1], reverse=True))
+
+
+class ConteoPorMes(Agregador):
+    """Eventos por mes de inicio (AAAA-MM), en orden de aparición"""
+
+    clave = 'conteo_por_mes'
+
+    def __init__(self):
+        self.conteo = {}
+        self._meses = {}  # ordinal -> clave del mes, para no recalcularla por evento
+
+    def agregar(self, evento):
+        self.agregar_bloque((evento,))
+
+    def agregar_bloque(self, eventos):
+        conteo = self.conteo
+        meses = self._meses
+        for evento in eventos:
+            ordinal = evento.inicio_ord
+            if ordinal is None:
+                continue
+            mes = meses.get(ordinal)
+            if mes is None:
+                dia = date.fromordinal(ordinal)
+                mes = meses[ordinal] = f"{dia.year}-{dia.month:02d}"
+            conteo[mes] = conteo.get(mes, 0) + 1
+
+    def resultado(self):
+        return self.conteo
+
+
+AGREGADORES_PREDETERMINADOS = (
+    TotalEventos,
+    EventosProximos,
+    EventosEnCurso,
+    EventosPasados,
+    EventosSinRecursos,
+    EstadisticasRecursos,
+    ConteoPorMes
+)
+
+
+class MotorInformes:
+    """Genera un informe recorriendo los eventos una sola vez"""
+
+    def __init__(self, fabricas=AGREGADORES_PREDETERMINADOS):
+        """
+        Args:
+            fabricas (iterable): Clases (o funciones sin argumentos) que crean
+                cada agregador; el informe sigue este orden de claves
+        """
+        self._fabricas = list(fabricas)
+
+    @staticmethod
+    def _clave(fabrica):
+        return getattr(fabrica, 'clave', None) or fabrica().clave
+
+    def registrar(self, fabrica):
+        """Agrega un agregador al informe (sustituye al que tenga la misma clave)"""
+        clave = self._clave(fabrica)
+        self._fabricas = [f for f in self._fabricas if self._clave(f) != clave]
+        self._fabricas.append(fabrica)
+        return self
+
+    def claves(self):
+        return [self._clave(fabrica) for fabrica in self._fabricas]
+
+    def fabrica(self, clave):
+        """Fábrica registrada para una clave (None si no hay)"""
+        for fabrica in self._fabricas:
+            if self._clave(fabrica) == clave:
+                return fabrica
+        return None
+
+    def generar(self, eventos, ahora=None, omitir=()):
+        """
+        Args:
+            eventos (iterable): Eventos del informe (se recorren una vez)
+            ahora (tuple): (ordinal de hoy, desfase); por defecto, el momento actual
+            omitir (iterable): Claves que no hace falta calcular
+
+        Returns:
+            dict: {clave: resultado} de cada agregador
+        """
+        agregadores = [fabrica() for fabrica in self._fabricas if self._clave(fabrica) not in omitir]
+        if not agregadores:
+            return {}
+
+        ahora = ahora or momento_actual()
+        for agregador in agregadores:
+            agregador.iniciar(ahora)
+
+        pasos = [agregador.agregar_bloque for agregador in agregadores]
+        for bloque in self._bloques(eventos):
+            for paso in pasos:
+                paso(bloque)
+
+        return {agregador.clave: agregador.resultado() for agregador in agregadores}
+
+    @staticmethod
+    def _bloques(eventos):
+        """Listas de hasta TAMANO_BLOQUE eventos, sin copiar todo el iterable"""
+        if isinstance(eventos, list):
+            for desde in range(0, len(eventos), TAMANO_BLOQUE):
+                yield eventos[desde:desde + TAMANO_BLOQUE]
+            return
+        iterador = iter(eventos)
+        while True:
+            bloque = list(islice(iterador, TAMANO_BLOQUE))
+            if not bloque:
+                return
+            yield bloque
+
+
+# Motor del informe del calendario (Buscador.generar_informe)
+motor_predeterminado = MotorInformes()
+
+
+def registrar_agregador(fabrica):
+    """Agrega una clave al informe del calendario (p. ej. desde un complemento)"""
+    motor_predeterminado.registrar(fabrica)
+    return fabrica
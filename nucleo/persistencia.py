@@ -1,14 +1,99 @@
 # nucleo/persistencia.py
 import json
 import os
-from modelos.evento import Evento
+from modelos.evento import fecha_a_ordinal
+from modelos.restricciones import ARCHIVO_RESTRICCIONES
+from nucleo import informes
+from nucleo.backend import BackendAlmacenamiento, BackendJSON
+from nucleo.columnar import SnapshotColumnar, escribir_snapshot_columnar
+
+# Archivo del directorio de datos que indica qué backend usar
+ARCHIVO_CONFIGURACION = "almacenamiento.json"
+FORMATOS = ("json", "binario", "sqlite", "particionado")
+ARCHIVO_SNAPSHOT_COLUMNAR = "eventos.col"
 
 class Persistencia:
     """Clase para manejar la persistencia de datos del Planificador Imperial"""
     
-    def __init__(self, directorio_datos="datos"):
+    def __init__(self, directorio_datos="datos", diario=False, umbral_compactacion=500,
+                 backend=None, presupuesto_memoria=None):
+        """
+        Inicializa la persistencia
+
+        Args:
+            directorio_datos (str): Carpeta donde viven los archivos de datos
+            diario (bool): Si es True, cada mutación se anexa a eventos.diario
+                en lugar de reescribir eventos.json completo (backend JSON)
+            umbral_compactacion (int): Registros del diario que disparan un nuevo snapshot
+            backend (str | BackendAlmacenamiento): "json", "binario", "sqlite",
+                "particionado" o una instancia propia. Si se omite, se usa el formato configurado en
+                almacenamiento.json del directorio (JSON por defecto)
+            presupuesto_memoria (int): Bytes de fragmentos que el backend
+                particionado mantiene en caché (opcional)
+        """
         self.directorio_datos = directorio_datos
         self._crear_directorio_si_no_existe()
+        
+        self._diario = diario
+        self._umbral_compactacion = umbral_compactacion
+        self._presupuesto_memoria = presupuesto_memoria
+        
+        if backend is None:
+            backend = self.leer_formato(directorio_datos)
+        self.backend = self._crear_backend(backend, diario, umbral_compactacion)
+    
+    @staticmethod
+    def leer_formato(directorio_datos):
+        """Formato de eventos configurado para un directorio de datos"""
+        ruta = os.path.join(directorio_datos, ARCHIVO_CONFIGURACION)
+        if not os.path.exists(ruta):
+            return "json"
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                return json.load(f).get('formato', "json")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Configuración de almacenamiento ilegible ({e}), se usará JSON")
+            return "json"
+    
+    @property
+    def formato(self):
+        """Nombre del backend en uso"""
+        return self.backend.nombre
+    
+    def _crear_backend(self, backend, diario, umbral_compactacion):
+        """Construye el motor de almacenamiento de eventos"""
+        if isinstance(backend, BackendAlmacenamiento):
+            return backend
+        
+        if backend == "json":
+            return BackendJSON(
+                self.directorio_datos,
+                diario=diario,
+                umbral_compactacion=umbral_compactacion
+            )
+        if backend == "binario":
+            from nucleo.backend_binario import BackendBinario
+            return BackendBinario(self.directorio_datos)
+        if backend == "sqlite":
+            from nucleo.backend_sqlite import BackendSQLite
+            return BackendSQLite(self.directorio_datos)
+        if backend == "particionado":
+            from nucleo.backend_particionado import BackendParticionado
+            if self._presupuesto_memoria is None:
+                return BackendParticionado(self.directorio_datos)
+            return BackendParticionado(self.directorio_datos, presupuesto_memoria=self._presupuesto_memoria)
+        
+        raise ValueError(f"Backend de almacenamiento desconocido: {backend}")
+    
+    @property
+    def incremental(self):
+        """Indica si las mutaciones pueden persistirse sin reescribir todo"""
+        return self.backend.incremental
+    
+    @property
+    def consultable(self):
+        """Indica si el backend resuelve búsquedas por sí mismo"""
+        return self.backend.consultable
     
     def _crear_directorio_si_no_existe(self):
         """Crea el directorio de datos si no existe"""
@@ -16,74 +101,174 @@ class Persistencia:
             os.makedirs(self.directorio_datos)
             print(f"📁 Directorio '{self.directorio_datos}' creado")
     
-    def guardar_eventos(self, eventos, nombre_archivo="eventos.json"):
-        """Guarda la lista de eventos en un archivo JSON"""
+    def guardar_eventos(self, eventos):
+        """Guarda la lista completa de eventos"""
         try:
-            ruta_archivo = os.path.join(self.directorio_datos, nombre_archivo)
-            
-            # Convertir eventos a diccionarios
-            eventos_dict = []
-            for evento in eventos:
-                evento_dict = {
-                    'nombre': evento.nombre,
-                    'inicio': evento.inicio,
-                    'fin': evento.fin,
-                    'recursos': evento.recursos
-                }
-                eventos_dict.append(evento_dict)
-            
-            # Guardar en archivo
-            with open(ruta_archivo, 'w', encoding='utf-8') as f:
-                json.dump(eventos_dict, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ Eventos guardados en {ruta_archivo}")
-            return True
-            
+            return self.backend.guardar_eventos(eventos)
         except Exception as e:
             print(f"❌ Error guardando eventos: {e}")
             return False
     
-    def cargar_eventos(self, nombre_archivo="eventos.json"):
-        """Carga eventos desde un archivo JSON"""
+    def registrar_cambios(self, operaciones):
+        """
+        Persiste mutaciones sueltas sin reescribir todos los eventos
+        
+        Args:
+            operaciones (list): Tuplas ('alta' | 'baja', evento)
+        """
         try:
-            ruta_archivo = os.path.join(self.directorio_datos, nombre_archivo)
-            
-            if not os.path.exists(ruta_archivo):
-                print(f"ℹ️ No existe archivo {ruta_archivo}, se creará uno nuevo")
-                return []
-            
-            with open(ruta_archivo, 'r', encoding='utf-8') as f:
-                eventos_dict = json.load(f)
-            
-            # Convertir diccionarios a objetos Evento
-            eventos = []
-            for evento_dict in eventos_dict:
-                evento = Evento(
-                    nombre=evento_dict['nombre'],
-                    inicio=evento_dict['inicio'],
-                    fin=evento_dict['fin'],
-                    recursos=evento_dict.get('recursos', [])
-                )
-                eventos.append(evento)
-            
-            print(f"✅ {len(eventos)} eventos cargados desde {ruta_archivo}")
-            return eventos
-            
+            return self.backend.registrar_cambios(operaciones)
+        except Exception as e:
+            print(f"❌ Error registrando cambios: {e}")
+            return False
+    
+    def cargar_eventos(self):
+        """
+        Carga todos los eventos almacenados
+        
+        Los eventos guardados antes de que existieran los ids reciben uno al
+        leerse; se reescriben enseguida para que sea el mismo en la próxima carga.
+        """
+        try:
+            self.backend.eventos_sin_id = 0
+            eventos = self.backend.cargar_eventos()
         except json.JSONDecodeError:
             print(f"⚠️ Archivo corrupto o vacío, se iniciará con lista vacía")
             return []
         except Exception as e:
             print(f"❌ Error cargando eventos: {e}")
             return []
+        
+        if self.backend.eventos_sin_id:
+            print(f"🆔 {self.backend.eventos_sin_id} eventos sin id: se guardan con uno nuevo")
+            self.guardar_eventos(eventos)
+            self.backend.eventos_sin_id = 0
+        return eventos
+    
+    def iterar_eventos(self):
+        """Genera los eventos almacenados uno a uno, sin cargarlos todos en memoria"""
+        try:
+            for evento in self.backend.iterar_eventos():
+                yield evento
+        except json.JSONDecodeError:
+            print(f"⚠️ Archivo corrupto o incompleto, se detiene la lectura")
+        except Exception as e:
+            print(f"❌ Error leyendo eventos: {e}")
+    
+    def iterar_bloques_eventos(self, tamano_bloque=1000):
+        """Genera listas de hasta tamano_bloque eventos almacenados"""
+        bloque = []
+        for evento in self.iterar_eventos():
+            bloque.append(evento)
+            if len(bloque) >= tamano_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+    
+    def cerrar(self):
+        """Libera los recursos del backend"""
+        self.backend.cerrar()
+    
+    def convertir_formato(self, formato):
+        """
+        Convierte los eventos del directorio a otro formato ("json", "binario",
+        "sqlite", "particionado") y lo deja configurado para las próximas aperturas
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato}")
+        if formato == self.formato:
+            return True
+        
+        nuevo_backend = self._crear_backend(formato, self._diario, self._umbral_compactacion)
+        if not nuevo_backend.guardar_eventos(self.backend.iterar_eventos()):
+            nuevo_backend.cerrar()
+            return False
+        
+        ruta_configuracion = os.path.join(self.directorio_datos, ARCHIVO_CONFIGURACION)
+        with open(ruta_configuracion, 'w', encoding='utf-8') as f:
+            json.dump({'formato': formato}, f, indent=2)
+        
+        # Los archivos del formato anterior dejan de ser la fuente de verdad
+        self.backend.limpiar()
+        self.backend.cerrar()
+        self.backend = nuevo_backend
+        print(f"🔁 Eventos convertidos a formato {formato}")
+        return True
+    
+    # SNAPSHOT COLUMNAR DE SOLO LECTURA
+    
+    def publicar_snapshot_columnar(self, eventos=None):
+        """
+        Escribe eventos.col para lectores de solo lectura. Sin lista de
+        eventos, se publica lo que hay almacenado en el backend.
+        """
+        try:
+            if eventos is None:
+                eventos = self.backend.iterar_eventos()
+            ruta_archivo = os.path.join(self.directorio_datos, ARCHIVO_SNAPSHOT_COLUMNAR)
+            cantidad = escribir_snapshot_columnar(eventos, ruta_archivo)
+            print(f"✅ Snapshot columnar con {cantidad} eventos publicado en {ruta_archivo}")
+            return True
+        except Exception as e:
+            print(f"❌ Error publicando snapshot columnar: {e}")
+            return False
+    
+    def abrir_snapshot_columnar(self):
+        """Mapea eventos.col en memoria; publica uno si todavía no existe"""
+        ruta_archivo = os.path.join(self.directorio_datos, ARCHIVO_SNAPSHOT_COLUMNAR)
+        if not os.path.exists(ruta_archivo) and not self.publicar_snapshot_columnar():
+            raise RuntimeError(f"No se pudo crear {ruta_archivo}")
+        snapshot = SnapshotColumnar.abrir(ruta_archivo)
+        print(f"🗺️ {len(snapshot)} eventos mapeados desde {ruta_archivo}")
+        return snapshot
+    
+    # CONSULTAS DELEGADAS AL BACKEND (None si no las soporta). Las usa un
+    # Calendario bajo demanda mientras no tiene los eventos en memoria
+    
+    def buscar_por_rango_fechas(self, fecha_inicio, fecha_fin):
+        """Busca por rango de fechas en el backend"""
+        if not self.consultable:
+            return None
+        inicio = fecha_a_ordinal(fecha_inicio)
+        fin = fecha_a_ordinal(fecha_fin)
+        if inicio is None or fin is None:
+            print("⚠️ Formato de fecha incorrecto. Use DD/MM/AAAA")
+            return []
+        return self.backend.buscar_por_rango_fechas(inicio, fin)
+    
+    def eventos_proximos(self, dias=7):
+        """Eventos que empiezan en los próximos días, resueltos en el backend"""
+        if not self.consultable:
+            return None
+        # Mismo criterio que el Buscador: (inicio - ahora).days entre 0 y dias
+        hoy, desfase = informes.momento_actual()
+        return self.backend.buscar_por_inicio(hoy + desfase, hoy + desfase + dias)
+    
+    def buscar_por_recurso(self, texto_recurso):
+        """Busca por recurso en el backend"""
+        if not self.consultable or not texto_recurso:
+            return None
+        return self.backend.buscar_por_recurso(texto_recurso.lower())
+    
+    def contar_eventos_por_mes(self):
+        """Cuenta eventos por mes en el backend"""
+        if not self.consultable:
+            return None
+        return self.backend.contar_eventos_por_mes()
     
     def guardar_recursos(self, recursos_disponibles, recursos_usados, nombre_archivo="recursos.json"):
         """Guarda el estado de los recursos en un archivo JSON"""
         try:
             ruta_archivo = os.path.join(self.directorio_datos, nombre_archivo)
             
+            # Recurso.recursos_usados guarda conjuntos; en el archivo son listas
             recursos_data = {
-                'disponibles': recursos_disponibles,
-                'usados': recursos_usados
+                'disponibles': list(recursos_disponibles),
+                'usados': {
+                    recurso: eventos if isinstance(eventos, list) else sorted(eventos)
+                    for recurso, eventos in recursos_usados.items()
+                }
             }
             
             with open(ruta_archivo, 'w', encoding='utf-8') as f:
@@ -130,20 +315,27 @@ class Persistencia:
             archivos_exportados = []
             
             if incluir_eventos:
-                origen_eventos = os.path.join(self.directorio_datos, "eventos.json")
-                destino_eventos = os.path.join(destino, "eventos.json")
-                if os.path.exists(origen_eventos):
-                    import shutil
-                    shutil.copy2(origen_eventos, destino_eventos)
-                    archivos_exportados.append("eventos.json")
+                # Dejar los archivos del backend completos antes de copiarlos
+                self.backend.consolidar()
+                archivos_eventos = self.backend.archivos_exportables()
+                if os.path.exists(os.path.join(self.directorio_datos, ARCHIVO_CONFIGURACION)):
+                    archivos_eventos = archivos_eventos + [ARCHIVO_CONFIGURACION]
+                for nombre_archivo in archivos_eventos:
+                    origen_eventos = os.path.join(self.directorio_datos, nombre_archivo)
+                    destino_eventos = os.path.join(destino, nombre_archivo)
+                    if os.path.exists(origen_eventos):
+                        import shutil
+                        shutil.copy2(origen_eventos, destino_eventos)
+                        archivos_exportados.append(nombre_archivo)
             
             if incluir_recursos:
-                origen_recursos = os.path.join(self.directorio_datos, "recursos.json")
-                destino_recursos = os.path.join(destino, "recursos.json")
-                if os.path.exists(origen_recursos):
-                    import shutil
-                    shutil.copy2(origen_recursos, destino_recursos)
-                    archivos_exportados.append("recursos.json")
+                for nombre_archivo in ("recursos.json", ARCHIVO_RESTRICCIONES):
+                    origen_recursos = os.path.join(self.directorio_datos, nombre_archivo)
+                    destino_recursos = os.path.join(destino, nombre_archivo)
+                    if os.path.exists(origen_recursos):
+                        import shutil
+                        shutil.copy2(origen_recursos, destino_recursos)
+                        archivos_exportados.append(nombre_archivo)
             
             print(f"✅ Datos exportados a {destino}: {', '.join(archivos_exportados)}")
             return archivos_exportados
@@ -157,21 +349,36 @@ class Persistencia:
         try:
             archivos_importados = []
             
-            origen_eventos = os.path.join(origen, "eventos.json")
-            destino_eventos = os.path.join(self.directorio_datos, "eventos.json")
-            
-            if os.path.exists(origen_eventos):
-                import shutil
-                shutil.copy2(origen_eventos, destino_eventos)
-                archivos_importados.append("eventos.json")
-            
-            origen_recursos = os.path.join(origen, "recursos.json")
-            destino_recursos = os.path.join(self.directorio_datos, "recursos.json")
-            
-            if os.path.exists(origen_recursos):
-                import shutil
-                shutil.copy2(origen_recursos, destino_recursos)
-                archivos_importados.append("recursos.json")
+            formato_origen = self.leer_formato(origen)
+            if formato_origen != self.formato:
+                # Formato distinto: leer con su backend y guardar con el propio
+                persistencia_origen = Persistencia(origen, backend=formato_origen)
+                archivos_eventos = persistencia_origen.backend.archivos_en(origen)
+                if archivos_eventos:
+                    self.guardar_eventos(persistencia_origen.iterar_eventos())
+                    archivos_importados.extend(archivos_eventos)
+                persistencia_origen.cerrar()
+            else:
+                archivos_eventos = self.backend.archivos_en(origen)
+                if archivos_eventos:
+                    import shutil
+                    self.backend.cerrar()
+                    for nombre_archivo in archivos_eventos:
+                        shutil.copy2(
+                            os.path.join(origen, nombre_archivo),
+                            os.path.join(self.directorio_datos, nombre_archivo)
+                        )
+                        archivos_importados.append(nombre_archivo)
+                    self.backend.tras_importar()
+            
+            for nombre_archivo in ("recursos.json", ARCHIVO_RESTRICCIONES):
+                origen_recursos = os.path.join(origen, nombre_archivo)
+                destino_recursos = os.path.join(self.directorio_datos, nombre_archivo)
+                
+                if os.path.exists(origen_recursos):
+                    import shutil
+                    shutil.copy2(origen_recursos, destino_recursos)
+                    archivos_importados.append(nombre_archivo)
             
             print(f"✅ Datos importados desde {origen}: {', '.join(archivos_importados)}")
             return archivos_importados
@@ -185,17 +392,20 @@ class Persistencia:
         try:
             archivos_eliminados = 0
             
-            eventos_path = os.path.join(self.directorio_datos, "eventos.json")
-            if os.path.exists(eventos_path):
-                os.remove(eventos_path)
-                archivos_eliminados += 1
-                print(f"🗑️ Archivo eventos.json eliminado")
+            archivos_eliminados += self.backend.limpiar()
             
-            recursos_path = os.path.join(self.directorio_datos, "recursos.json")
-            if os.path.exists(recursos_path):
-                os.remove(recursos_path)
+            snapshot_path = os.path.join(self.directorio_datos, ARCHIVO_SNAPSHOT_COLUMNAR)
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
                 archivos_eliminados += 1
-                print(f"🗑️ Archivo recursos.json eliminado")
+                print(f"🗑️ Archivo {ARCHIVO_SNAPSHOT_COLUMNAR} eliminado")
+            
+            for nombre_archivo in ("recursos.json", ARCHIVO_RESTRICCIONES):
+                ruta = os.path.join(self.directorio_datos, nombre_archivo)
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+                    archivos_eliminados += 1
+                    print(f"🗑️ Archivo {nombre_archivo} eliminado")
             
             return archivos_eliminados
             
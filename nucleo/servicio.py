@@ -0,0 +1,200 @@
+# nucleo/servicio.py
+from modelos.evento import Evento
+from modelos.recurso import Recurso
+from nucleo.buscador import Buscador
+
+# Operaciones que modifican el calendario (las demás son de lectura)
+OPERACIONES_ESCRITURA = ("agregar", "eliminar")
+
+
+def buscar_eventos(calendario, filtros):
+    """
+    Aplica una combinación de filtros (claves opcionales: nombre, recurso,
+    fecha, desde, hasta, proximos, en_curso, pasados, sin_recursos, orden,
+    limite). El primer filtro lo resuelve el calendario (con sus índices o,
+    en un calendario bajo demanda, en el backend sin cargar los eventos); el
+    resto se aplica sobre ese resultado con el Buscador.
+    """
+    pasos = []
+    desde, hasta = filtros.get('desde'), filtros.get('hasta')
+    if desde or hasta:
+        desde, hasta = desde or hasta, hasta or desde
+        pasos.append((lambda: calendario.buscar_por_rango_fechas(desde, hasta),
+                      lambda eventos: Buscador.buscar_por_rango_fechas(eventos, desde, hasta)))
+    if filtros.get('recurso'):
+        recurso = filtros['recurso']
+        pasos.append((lambda: calendario.buscar_por_recurso(recurso),
+                      lambda eventos: Buscador.buscar_por_recurso(eventos, recurso)))
+    if filtros.get('nombre'):
+        nombre = filtros['nombre']
+        pasos.append((lambda: calendario.buscar_por_nombre(nombre),
+                      lambda eventos: Buscador.buscar_por_nombre(eventos, nombre)))
+    if filtros.get('fecha'):
+        fecha = filtros['fecha']
+        pasos.append((lambda: calendario.buscar_por_fecha(fecha),
+                      lambda eventos: Buscador.buscar_por_fecha(eventos, fecha)))
+    if filtros.get('proximos') is not None:
+        dias = int(filtros['proximos'])
+        pasos.append((lambda: calendario.eventos_proximos(dias),
+                      lambda eventos: Buscador.eventos_proximos(eventos, dias)))
+    if filtros.get('en_curso'):
+        pasos.append((calendario.eventos_en_curso, Buscador.eventos_en_curso))
+    if filtros.get('pasados'):
+        pasos.append((calendario.eventos_pasados, Buscador.eventos_pasados))
+    if filtros.get('sin_recursos'):
+        pasos.append((calendario.eventos_sin_recursos, Buscador.buscar_eventos_sin_recursos))
+
+    if pasos:
+        eventos = pasos[0][0]()
+        for _, filtrar in pasos[1:]:
+            eventos = filtrar(eventos)
+    else:
+        eventos = calendario.eventos
+
+    orden = filtros.get('orden')
+    if orden == "fecha":
+        eventos = Buscador.ordenar_por_fecha(eventos)
+    elif orden == "nombre":
+        eventos = Buscador.ordenar_por_nombre(eventos)
+    elif orden is not None:
+        raise ValueError(f"Orden desconocido: {orden}")
+
+    limite = filtros.get('limite')
+    return eventos[:int(limite)] if limite else eventos
+
+
+class ServicioCalendario:
+    """
+    Atiende peticiones (diccionarios con una clave 'op') sobre un Calendario
+    y el registro de Recurso. No sabe nada de red: el servidor decide cómo
+    intercalar lecturas y agrupar escrituras.
+    """
+
+    def __init__(self, calendario):
+        self.calendario = calendario
+        self._lecturas = {
+            'buscar': self._buscar,
+            'listar': self._listar,
+            'obtener': self._obtener,
+            'informe': self._informe,
+            'recursos': self._recursos,
+            'estadisticas': self._estadisticas
+        }
+
+    @staticmethod
+    def es_escritura(peticion):
+        return peticion.get('op') in OPERACIONES_ESCRITURA
+
+    # LECTURAS
+
+    def leer(self, peticion):
+        """Resuelve una petición de lectura y devuelve un resultado serializable"""
+        operacion = self._lecturas.get(peticion.get('op'))
+        if operacion is None:
+            raise ValueError(f"Operación desconocida: {peticion.get('op')}")
+        return operacion(peticion)
+
+    def _buscar(self, peticion):
+        return [evento.a_diccionario() for evento in buscar_eventos(self.calendario, peticion)]
+
+    def _listar(self, peticion):
+        if peticion.get('orden'):
+            return self._listar_ordenados(peticion)
+        eventos = self.calendario.eventos
+        desde = int(peticion.get('desde', 0))
+        limite = peticion.get('limite')
+        hasta = desde + int(limite) if limite else len(eventos)
+        return {
+            'total': len(eventos),
+            'eventos': [evento.a_diccionario() for evento in eventos[desde:hasta]]
+        }
+
+    def _listar_ordenados(self, peticion):
+        """
+        Página por 'fecha' o 'nombre': con 'cursor' (el devuelto con la página
+        anterior) sigue donde terminó, sin recorrer las anteriores
+        """
+        paginas = {
+            'fecha': self.calendario.pagina_por_fecha,
+            'nombre': self.calendario.pagina_por_nombre
+        }
+        paginar = paginas.get(peticion['orden'])
+        if paginar is None:
+            raise ValueError(f"Orden desconocido: {peticion['orden']}")
+        eventos, cursor = paginar(int(peticion.get('limite') or 20), peticion.get('cursor'),
+                                  peticion.get('ascendente', True))
+        return {
+            'total': self.calendario.total_eventos(),
+            'eventos': [evento.a_diccionario() for evento in eventos],
+            'cursor': cursor
+        }
+
+    def _obtener(self, peticion):
+        # 'id' es el de la petición (el servidor lo devuelve tal cual); el del evento va en 'id_evento'
+        if peticion.get('id_evento'):
+            evento = self.calendario.obtener_evento_por_id(peticion['id_evento'])
+        else:
+            evento = self.calendario.obtener_evento(peticion['nombre'])
+        return evento.a_diccionario() if evento else None
+
+    def _informe(self, peticion):
+        return self.calendario.generar_informe()
+
+    def _recursos(self, peticion):
+        return [
+            {
+                'nombre': nombre,
+                'disponible': Recurso.esta_disponible(nombre),
+                'eventos': Recurso.eventos_de_recurso(nombre)
+            }
+            for nombre in Recurso.obtener_todos()
+        ]
+
+    def _estadisticas(self, peticion):
+        return {
+            'total_eventos': self.calendario.total_eventos(),
+            'formato': self.calendario.persistencia.formato,
+            'recursos': Recurso.estadisticas_escritura()
+        }
+
+    # ESCRITURAS
+
+    def escribir_lote(self, peticiones):
+        """
+        Aplica varias escrituras en una sola transacción del calendario, de modo
+        que se persisten juntas. Una petición inválida no anula a las demás:
+        devuelve una lista de (ok, resultado o mensaje de error) en orden.
+        """
+        resultados = []
+        with self.calendario.lote():
+            for peticion in peticiones:
+                try:
+                    if peticion.get('op') == 'agregar':
+                        resultados.append((True, self._agregar(peticion)))
+                    elif peticion.get('op') == 'eliminar':
+                        resultados.append((True, self._eliminar(peticion)))
+                    else:
+                        raise ValueError(f"Operación desconocida: {peticion.get('op')}")
+                except (KeyError, TypeError, ValueError) as e:
+                    resultados.append((False, f"{type(e).__name__}: {e}"))
+        return resultados
+
+    def _agregar(self, peticion):
+        # Construir y agregar el evento (que valida las restricciones) antes de
+        # marcar sus recursos: si falla, nada cambia
+        evento = Evento.desde_diccionario(peticion['evento'], estricto=True)
+        self.calendario.agregar_evento(evento)
+        for recurso in evento.recursos:
+            Recurso.marcar_como_usado(recurso, evento)
+        return evento.a_diccionario()
+
+    def _eliminar(self, peticion):
+        if peticion.get('id_evento'):
+            evento = self.calendario.eliminar_evento_por_id(peticion['id_evento'])
+        else:
+            evento = self.calendario.eliminar_evento(peticion['nombre'])
+        if evento is None:
+            return None
+        for recurso in evento.recursos:
+            Recurso.liberar_recurso(recurso, evento)
+        return evento.a_diccionario()
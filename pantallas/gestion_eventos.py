@@ -139,6 +139,11 @@ class PantallaGestionEventos:
         )
         self.entry_fin.grid(row=2, column=1, sticky="w", padx=5, pady=8)
         
+        # Los recursos disponibles dependen de las fechas escritas
+        for entry in (self.entry_inicio, self.entry_fin):
+            entry.bind("<KeyRelease>", lambda evento: self._actualizar_recursos_disponibles())
+            entry.bind("<FocusOut>", lambda evento: self._actualizar_recursos_disponibles())
+        
         # Frame para recursos
         recursos_frame = tk.Frame(campos_frame, bg="#3a3a3a")
         recursos_frame.grid(row=3, column=0, columnspan=2, sticky="w", pady=8)
@@ -356,15 +361,28 @@ class PantallaGestionEventos:
         ).pack()
     
     def _actualizar_recursos_disponibles(self):
-        """Actualiza la lista de recursos disponibles"""
+        """
+        Actualiza la lista de recursos disponibles: con ambas fechas del
+        formulario válidas, los libres en ese periodo; si no, los que no
+        tienen ningún evento
+        """
         try:
+            from modelos.evento import fecha_a_ordinal
             from modelos.recurso import Recurso
-            disponibles = Recurso.obtener_disponibles()
+            inicio = fecha_a_ordinal(self.entry_inicio.get().strip())
+            fin = fecha_a_ordinal(self.entry_fin.get().strip())
+            if inicio is not None and fin is not None:
+                disponibles = Recurso.obtener_disponibles(inicio, fin)
+            else:
+                disponibles = Recurso.obtener_disponibles()
             
-            # Mostrar disponibles en combobox
+            # Mostrar disponibles en combobox (conservando la selección si sigue libre)
+            seleccionado = self.combo_recursos.get()
             self.combo_recursos['values'] = disponibles
             
-            if disponibles:
+            if seleccionado in disponibles:
+                self.combo_recursos.set(seleccionado)
+            elif disponibles:
                 self.combo_recursos.set(disponibles[0])
             else:
                 self.combo_recursos.set("No hay disponibles")
@@ -428,7 +446,8 @@ class PantallaGestionEventos:
                     else:
                         recursos_texto = "Sin recursos"
                     
-                    self.tree.insert("", "end", values=(
+                    # El id del evento identifica la fila (los nombres pueden repetirse)
+                    self.tree.insert("", "end", iid=evento.id, values=(
                         i,
                         evento.nombre,
                         evento.inicio,
@@ -455,18 +474,19 @@ class PantallaGestionEventos:
                 # Obtener recursos seleccionados
                 recursos_seleccionados = list(self.lista_recursos_seleccionados.get(0, tk.END))
                 
-                # Crear evento
-                evento = Evento(nombre, inicio, fin, recursos_seleccionados)
+                # Crear evento (valida el formato y el orden de las fechas)
+                evento = Evento(nombre, inicio, fin, recursos_seleccionados, estricto=True)
                 
-                # Marcar recursos como usados
-                for recurso_nombre in recursos_seleccionados:
-                    Recurso.marcar_como_usado(recurso_nombre, evento)
-                
-                self.calendario.agregar_evento(evento)
+                # Guardar el evento y marcar sus recursos en una sola transacción
+                with self.calendario.lote():
+                    self.calendario.agregar_evento(evento)
+                    
+                    for recurso_nombre in recursos_seleccionados:
+                        Recurso.marcar_como_usado(recurso_nombre, evento)
                 
                 # Actualizar tabla
                 total_items = len(self.tree.get_children())
-                self.tree.insert("", "end", values=(
+                self.tree.insert("", "end", iid=evento.id, values=(
                     total_items + 1,
                     nombre,
                     inicio,
@@ -515,24 +535,20 @@ class PantallaGestionEventos:
             )
             
             if respuesta:
-                # Buscar y liberar recursos
+                # Eliminar el evento (la fila guarda su id) y liberar sus recursos
                 try:
                     from modelos.recurso import Recurso
-                    from modelos.evento import Evento
                     
-                    # Obtener recursos del evento
-                    recursos_texto = valores[4] if len(valores) > 4 else ""
-                    if recursos_texto and recursos_texto != "Sin recursos":
-                        recursos = [r.strip() for r in recursos_texto.split(',')]
-                        # Crear objeto evento temporal para liberar
-                        evento_temp = Evento(nombre_evento, "", "", [])
-                        for recurso in recursos:
-                            Recurso.liberar_recurso(recurso, evento_temp)
+                    with self.calendario.lote():
+                        evento = self.calendario.eliminar_evento_por_id(seleccion[0])
+                        if evento is not None:
+                            for recurso in evento.recursos:
+                                Recurso.liberar_recurso(recurso, evento)
                     
                     # Actualizar disponibilidad
                     self._actualizar_recursos_disponibles()
                 except Exception as e:
-                    print(f"Error liberando recursos: {e}")
+                    print(f"Error eliminando evento: {e}")
                 
                 # Eliminar de la tabla
                 self.tree.delete(seleccion[0])
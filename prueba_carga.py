@@ -0,0 +1,136 @@
+# prueba_carga.py - Cliente de carga para servidor.py
+#
+# Abre varias conexiones simultáneas contra el servicio y lanza una mezcla de
+# lecturas y escrituras. Al terminar imprime un resumen JSON con el
+# rendimiento y las latencias por tipo de operación.
+#
+#   python servidor.py --datos /tmp/datos_carga &
+#   python prueba_carga.py --clientes 50 --peticiones 200 --escrituras 0.2
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def crear_peticion(cliente, numero, proporcion_escrituras, azar):
+    if azar.random() < proporcion_escrituras:
+        dia = azar.randint(1, 28)
+        mes = azar.randint(1, 12)
+        return {
+            'op': 'agregar',
+            'evento': {
+                'nombre': f"carga-{cliente}-{numero}",
+                'inicio': f"{dia:02d}/{mes:02d}/2024",
+                'fin': f"{dia:02d}/{mes:02d}/2024",
+                'recursos': []
+            }
+        }
+    return azar.choice((
+        {'op': 'buscar', 'nombre': f"carga-{azar.randint(0, 9)}", 'limite': 20},
+        {'op': 'buscar', 'desde': "01/03/2024", 'hasta': "15/03/2024", 'limite': 20},
+        {'op': 'listar', 'limite': 20},
+        {'op': 'recursos'}
+    ))
+
+
+async def cliente(numero, args, latencias, errores):
+    lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    azar = random.Random(numero)
+    creados = []
+    try:
+        for i in range(args.peticiones):
+            peticion = crear_peticion(numero, i, args.escrituras, azar)
+            peticion['id'] = i
+            comienzo = time.perf_counter()
+            escritor.write(json.dumps(peticion).encode('utf-8') + b"\n")
+            await escritor.drain()
+            respuesta = json.loads((await lector.readline()).decode('utf-8'))
+            latencias.setdefault(peticion['op'], []).append((time.perf_counter() - comienzo) * 1000)
+            if not respuesta.get('ok'):
+                errores.append(respuesta.get('error'))
+            elif peticion['op'] == 'agregar':
+                creados.append(peticion['evento']['nombre'])
+
+        if args.limpiar:
+            for nombre in creados:
+                escritor.write(json.dumps({'op': 'eliminar', 'nombre': nombre}).encode('utf-8') + b"\n")
+                await escritor.drain()
+                await lector.readline()
+    finally:
+        escritor.close()
+        try:
+            await escritor.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def estadisticas_servidor(args):
+    lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    escritor.write(b'{"op": "estadisticas"}\n')
+    await escritor.drain()
+    respuesta = json.loads((await lector.readline()).decode('utf-8'))
+    escritor.close()
+    await escritor.wait_closed()
+    return respuesta.get('resultado', {}).get('servidor')
+
+
+async def ejecutar(args):
+    latencias = {}
+    errores = []
+    comienzo = time.perf_counter()
+    await asyncio.gather(*(cliente(numero, args, latencias, errores) for numero in range(args.clientes)))
+    duracion = time.perf_counter() - comienzo
+
+    total = sum(len(valores) for valores in latencias.values())
+    return {
+        'clientes': args.clientes,
+        'peticiones': total,
+        'errores': len(errores),
+        'primer_error': errores[0] if errores else None,
+        'duracion_s': round(duracion, 3),
+        'peticiones_por_segundo': round(total / duracion, 1) if duracion else None,
+        'latencias_ms': {
+            operacion: {
+                'n': len(valores),
+                'p50': round(percentil(valores, 50), 2),
+                'p95': round(percentil(valores, 95), 2),
+                'p99': round(percentil(valores, 99), 2),
+                'max': round(max(valores), 2)
+            }
+            for operacion, valores in sorted(latencias.items())
+        },
+        'servidor': await estadisticas_servidor(args)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio del calendario")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--clientes", type=int, default=20, help="conexiones simultáneas")
+    parser.add_argument("--peticiones", type=int, default=100, help="peticiones por cliente")
+    parser.add_argument("--escrituras", type=float, default=0.2, help="proporción de altas (0-1)")
+    parser.add_argument("--limpiar", action="store_true", help="eliminar al final los eventos creados")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        resumen = loop.run_until_complete(ejecutar(args))
+    finally:
+        loop.close()
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    return 0 if not resumen['errores'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+# servidor.py - Servicio local del Planificador Imperial para varios clientes
+#
+# Protocolo: JSON por líneas sobre TCP. Cada petición es un objeto con 'op'
+# (y un 'id' opcional de la petición que se devuelve tal cual; el id de un
+# evento va siempre en 'id_evento'); cada respuesta es
+# {"id": ..., "ok": true, "resultado": ...} o {"id": ..., "ok": false, "error": ...}.
+#
+#   {"op": "agregar", "evento": {"nombre": "...", "inicio": "...", "fin": "...", "recursos": []}}
+#   {"op": "eliminar", "nombre": "..."}   {"op": "eliminar", "id_evento": "3f2a..."}
+#   {"op": "buscar", "recurso": "legion", "desde": "01/03/2024", "hasta": "31/03/2024"}
+#   {"op": "listar", "desde": 0, "limite": 100}
+#   {"op": "obtener", "nombre": "..."}   {"op": "obtener", "id_evento": "3f2a..."}
+#   {"op": "informe"}   {"op": "recursos"}   {"op": "estadisticas"}
+#
+# Las lecturas se atienden en cuanto llegan, a la vez, en un grupo de hilos
+# (--lectores). Las escrituras pasan por una cola hacia una única tarea
+# escritora, que aplica todas las pendientes en un lote, en su propio hilo, y
+# las persiste juntas antes de responder. Un cerrojo de lectura/escritura
+# impide que una lectura vea un lote a medias: las lecturas corren juntas
+# pero nunca durante un lote, y un lote en espera deja en cola las lecturas
+# nuevas para no retrasarse indefinidamente. Tras cada lote el calendario
+# asienta sus índices, de modo que las lecturas no modifican nada. Mientras
+# tanto el bucle de eventos sigue aceptando conexiones y encolando escrituras.
+#
+#   python servidor.py --puerto 8765
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+DIR_ACTUAL = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DIR_ACTUAL)
+
+from modelos.recurso import Recurso
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from nucleo.servicio import ServicioCalendario
+
+
+class CerrojoLecturaEscritura:
+    """
+    Varios lectores a la vez o un único escritor. Un escritor en espera
+    detiene a los lectores nuevos hasta que termina.
+    """
+
+    def __init__(self):
+        self._condicion = threading.Condition()
+        self._lectores = 0
+        self._escribiendo = False
+        self._escritores_en_espera = 0
+
+    @contextmanager
+    def lectura(self):
+        with self._condicion:
+            while self._escribiendo or self._escritores_en_espera:
+                self._condicion.wait()
+            self._lectores += 1
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._lectores -= 1
+                if not self._lectores:
+                    self._condicion.notify_all()
+
+    @contextmanager
+    def escritura(self):
+        with self._condicion:
+            self._escritores_en_espera += 1
+            while self._escribiendo or self._lectores:
+                self._condicion.wait()
+            self._escritores_en_espera -= 1
+            self._escribiendo = True
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._escribiendo = False
+                self._condicion.notify_all()
+
+
+class ServidorCalendario:
+    """Servidor asyncio sobre un ServicioCalendario"""
+
+    def __init__(self, servicio, host="127.0.0.1", puerto=8765, max_lote=256, lectores=4):
+        self.servicio = servicio
+        self.host = host
+        self.puerto = puerto
+        self.max_lote = max_lote
+        self.lectores = lectores
+        self._servidor = None
+        self._cola = None
+        self._escritor = None
+        self._cerrojo = CerrojoLecturaEscritura()
+        self._hilos_lectura = None  # Ejecutor de las lecturas (varios hilos)
+        self._hilo_escritura = None  # Ejecutor de un solo hilo para los lotes
+        self.metricas = {
+            'conexiones_activas': 0,
+            'conexiones_totales': 0,
+            'lecturas': 0,
+            'escrituras': 0,
+            'lotes': 0,
+            'mayor_lote': 0,
+            'errores': 0
+        }
+
+    async def iniciar(self):
+        loop = asyncio.get_running_loop()
+        self._hilos_lectura = ThreadPoolExecutor(max_workers=self.lectores,
+                                                 thread_name_prefix="calendario-lectura")
+        self._hilo_escritura = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calendario-escritura")
+        # Desde el principio las lecturas solo leen (p. ej. el calendario ya estaba cargado)
+        await self._en_hilo(self._hilo_escritura, self._asentar)
+        self._cola = asyncio.Queue()
+        self._escritor = loop.create_task(self._bucle_escritura())
+        self._servidor = await asyncio.start_server(self._atender_cliente, self.host, self.puerto)
+        direccion = self._servidor.sockets[0].getsockname()
+        self.puerto = direccion[1]
+        print(f"🏛️ Servicio del calendario escuchando en {direccion[0]}:{direccion[1]}")
+
+    async def detener(self):
+        """Deja de aceptar clientes y espera a que se persistan las escrituras en cola"""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        if self._escritor is not None:
+            await self._cola.put(None)
+            await self._escritor
+            self._escritor = None
+        for ejecutor in (self._hilos_lectura, self._hilo_escritura):
+            if ejecutor is not None:
+                ejecutor.shutdown(wait=True)
+        self._hilos_lectura = self._hilo_escritura = None
+
+    async def _en_hilo(self, ejecutor, funcion, *argumentos):
+        """Ejecuta funcion en uno de los hilos del calendario sin bloquear el bucle de eventos"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(ejecutor, funcion, *argumentos)
+
+    def _leer(self, peticion):
+        with self._cerrojo.lectura():
+            return self.servicio.leer(peticion)
+
+    def _escribir_lote(self, peticiones):
+        with self._cerrojo.escritura():
+            try:
+                return self.servicio.escribir_lote(peticiones)
+            finally:
+                self.servicio.calendario.asentar_indices()
+
+    def _asentar(self):
+        with self._cerrojo.escritura():
+            self.servicio.calendario.asentar_indices()
+
+    # CLIENTES
+
+    async def _atender_cliente(self, lector, escritor):
+        self.metricas['conexiones_activas'] += 1
+        self.metricas['conexiones_totales'] += 1
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                respuesta = await self._procesar(linea)
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b"\n")
+                await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.metricas['conexiones_activas'] -= 1
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _procesar(self, linea):
+        identificador = None
+        try:
+            peticion = json.loads(linea.decode('utf-8'))
+            if not isinstance(peticion, dict):
+                raise ValueError("La petición debe ser un objeto JSON")
+            identificador = peticion.get('id')
+
+            if self.servicio.es_escritura(peticion):
+                futuro = asyncio.get_running_loop().create_future()
+                await self._cola.put((peticion, futuro))
+                ok, resultado = await futuro
+                if not ok:
+                    raise ValueError(resultado)
+            else:
+                resultado = await self._en_hilo(self._hilos_lectura, self._leer, peticion)
+                self.metricas['lecturas'] += 1
+                if peticion.get('op') == 'estadisticas':
+                    resultado['servidor'] = dict(self.metricas, en_cola=self._cola.qsize())
+
+            return {'id': identificador, 'ok': True, 'resultado': resultado}
+
+        except Exception as e:
+            self.metricas['errores'] += 1
+            return {'id': identificador, 'ok': False, 'error': str(e)}
+
+    # ESCRITOR ÚNICO
+
+    async def _bucle_escritura(self):
+        """Aplica las escrituras en cola por lotes, una transacción por lote"""
+        while True:
+            elemento = await self._cola.get()
+            lote = []
+            terminar = False
+            while True:
+                if elemento is None:
+                    terminar = True
+                else:
+                    lote.append(elemento)
+                if terminar or len(lote) >= self.max_lote or self._cola.empty():
+                    break
+                elemento = self._cola.get_nowait()
+
+            if lote:
+                try:
+                    resultados = await self._en_hilo(
+                        self._hilo_escritura, self._escribir_lote, [peticion for peticion, _ in lote])
+                except Exception as e:
+                    resultados = [(False, f"Lote descartado: {e}")] * len(lote)
+
+                self.metricas['lotes'] += 1
+                self.metricas['escrituras'] += len(lote)
+                self.metricas['mayor_lote'] = max(self.metricas['mayor_lote'], len(lote))
+                for (_, futuro), resultado in zip(lote, resultados):
+                    if not futuro.done():
+                        futuro.set_result(resultado)
+
+            if terminar:
+                return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local del Planificador Imperial (JSON por líneas)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--datos", default=os.path.join(DIR_ACTUAL, "datos"))
+    parser.add_argument("--max-lote", type=int, default=256,
+                        help="máximo de escrituras persistidas en una transacción")
+    parser.add_argument("--lectores", type=int, default=4,
+                        help="hilos que atienden lecturas a la vez")
+    args = parser.parse_args(argv)
+
+    # Con JSON, las escrituras se anexan al diario en lugar de reescribir el archivo
+    persistencia = Persistencia(directorio_datos=args.datos, diario=True)
+    Recurso.inicializar(args.datos)
+    Recurso.activar_escritura_diferida()
+    calendario = Calendario(directorio_datos=args.datos, persistencia=persistencia)
+
+    servidor = ServidorCalendario(ServicioCalendario(calendario), args.host, args.puerto, args.max_lote,
+                                  args.lectores)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        # Detenerse limpiamente también ante SIGTERM (no disponible en Windows)
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    except (NotImplementedError, AttributeError):
+        pass
+    try:
+        loop.run_until_complete(servidor.iniciar())
+        loop.run_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Deteniendo el servicio...")
+    finally:
+        loop.run_until_complete(servidor.detener())
+        loop.close()
+        persistencia.cerrar()
+        Recurso.detener_escritura_diferida()
+        print(f"💾 {servidor.metricas['escrituras']} escrituras en {servidor.metricas['lotes']} lotes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
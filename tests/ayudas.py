@@ -0,0 +1,48 @@
+# tests/ayudas.py - Utilidades comunes de las pruebas
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from modelos.evento import Evento
+
+RECURSOS = ["Legión I", "Legión II", "Senado", "Foro", "Coliseo", "Flota"]
+PALABRAS = ["batalla", "desfile", "juicio", "fiesta", "sacrificio", "censo"]
+
+
+def fecha(dias):
+    """Fecha DD/MM/AAAA a tantos días de hoy"""
+    return (date.today() + timedelta(days=dias)).strftime("%d/%m/%Y")
+
+
+def evento_aleatorio(azar, numero):
+    """
+    Evento con fechas alrededor de hoy; algunos con fechas no válidas, con
+    fin anterior al inicio o sin recursos, como los que admite el calendario
+    """
+    inicio = azar.randint(-120, 120)
+    fin = inicio + azar.randint(-3, 30)
+    recursos = azar.sample(RECURSOS, azar.randint(0, 3))
+    nombre = f"{azar.choice(PALABRAS)} {numero}"
+    if numero % 41 == 0:
+        return Evento(nombre, "mal", fecha(fin), recursos)
+    return Evento(nombre, fecha(inicio), fecha(fin), recursos)
+
+
+def eventos_aleatorios(cantidad, semilla=0):
+    azar = random.Random(semilla)
+    return [evento_aleatorio(azar, numero) for numero in range(cantidad)]
+
+
+def ids(eventos):
+    return [evento.id for evento in eventos]
+
+
+class DirectorioTemporal:
+    """Directorio de datos desechable para una prueba"""
+
+    def __enter__(self):
+        self.ruta = tempfile.mkdtemp(prefix="planificador-")
+        return self.ruta
+
+    def __exit__(self, *excepcion):
+        shutil.rmtree(self.ruta, ignore_errors=True)
@@ -0,0 +1,116 @@
+# tests/test_backends.py - Motores de almacenamiento
+import random
+import unittest
+from modelos.evento import Evento
+from nucleo.backend import BackendAlmacenamiento, BackendJSON
+from nucleo.backend_binario import BackendBinario
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, ids
+
+# (backend, diario) de cada formato que se guarda y se vuelve a leer
+FORMATOS = [("json", False), ("json", True), ("sqlite", False), ("binario", False),
+            ("particionado", False)]
+
+
+def diccionarios(eventos):
+    return [evento.a_diccionario() for evento in eventos]
+
+
+class PruebaInterfaz(unittest.TestCase):
+
+    def test_metodos_obligatorios(self):
+        class SinGuardar(BackendAlmacenamiento):
+            def iterar_eventos(self):
+                return iter(())
+
+            def archivos_exportables(self):
+                return []
+
+        with self.assertRaises(TypeError):
+            SinGuardar("datos")
+
+    def test_cambios_sin_diario_reescriben_todo(self):
+        eventos = eventos_aleatorios(60, semilla=9)
+        for backend_clase in (BackendJSON, BackendBinario):
+            with self.subTest(backend=backend_clase.nombre), DirectorioTemporal() as directorio:
+                backend = backend_clase(directorio)
+                self.assertFalse(backend.incremental)
+                backend.guardar_eventos(eventos[:40])
+                operaciones = [('alta', evento) for evento in eventos[40:]]
+                operaciones += [('baja', evento) for evento in eventos[::4]]
+                self.assertTrue(backend.registrar_cambios(operaciones))
+                self.assertEqual(ids(backend.cargar_eventos()),
+                                 ids(evento for i, evento in enumerate(eventos) if i % 4))
+
+
+class PruebaIdaYVuelta(unittest.TestCase):
+    """Lo que se guarda en cada formato se lee igual, campo a campo y en orden"""
+
+    def setUp(self):
+        self.eventos = eventos_aleatorios(250, semilla=12)
+        self.eventos.append(Evento("Triunfo de César «Galia»", "01/02/2030", "03/02/2030",
+                                   ["Legión X", "Vía Sacra"]))
+
+    def _abrir(self, directorio, backend, diario, **opciones):
+        persistencia = Persistencia(directorio, backend=backend, diario=diario, **opciones)
+        self.addCleanup(persistencia.cerrar)
+        return persistencia
+
+    def test_guardar_y_cargar(self):
+        for backend, diario in FORMATOS:
+            with self.subTest(backend=backend, diario=diario), DirectorioTemporal() as directorio:
+                persistencia = self._abrir(directorio, backend, diario)
+                self.assertTrue(persistencia.guardar_eventos(self.eventos))
+                persistencia.cerrar()
+
+                releida = self._abrir(directorio, backend, diario)
+                self.assertEqual(diccionarios(releida.cargar_eventos()), diccionarios(self.eventos))
+                self.assertEqual(diccionarios(releida.iterar_eventos()), diccionarios(self.eventos))
+
+    def test_cambios_incrementales(self):
+        azar = random.Random(12)
+        for backend, diario in FORMATOS:
+            with self.subTest(backend=backend, diario=diario), DirectorioTemporal() as directorio:
+                # Umbral bajo: el diario se compacta varias veces por el camino
+                persistencia = self._abrir(directorio, backend, diario, umbral_compactacion=40)
+                persistencia.guardar_eventos(self.eventos[:100])
+                vivos = list(self.eventos[:100])
+                for evento in self.eventos[100:]:
+                    operaciones = [('alta', evento)]
+                    vivos.append(evento)
+                    if azar.random() < 0.5:
+                        quitado = vivos.pop(azar.randrange(len(vivos)))
+                        operaciones.append(('baja', quitado))
+                    self.assertTrue(persistencia.registrar_cambios(operaciones))
+                persistencia.cerrar()
+
+                releida = self._abrir(directorio, backend, diario)
+                self.assertEqual(diccionarios(releida.cargar_eventos()), diccionarios(vivos))
+
+    def test_calendario_al_reabrir(self):
+        for backend, diario in FORMATOS:
+            with self.subTest(backend=backend, diario=diario), DirectorioTemporal() as directorio:
+                calendario = Calendario(directorio, persistencia=self._abrir(directorio, backend, diario))
+                calendario.agregar_eventos(self.eventos[:150])
+                for evento in self.eventos[:150:5]:
+                    calendario.eliminar_evento_por_id(evento.id)
+                calendario.agregar_evento(self.eventos[200])
+                esperado = diccionarios(calendario.eventos)
+                calendario.persistencia.cerrar()
+
+                reabierto = Calendario(directorio, persistencia=self._abrir(directorio, backend, diario))
+                self.assertEqual(diccionarios(reabierto.eventos), esperado)
+
+    def test_convertir_entre_formatos(self):
+        with DirectorioTemporal() as directorio:
+            persistencia = self._abrir(directorio, "json", False)
+            persistencia.guardar_eventos(self.eventos)
+            for formato in ("sqlite", "binario", "particionado", "json"):
+                self.assertTrue(persistencia.convertir_formato(formato))
+                self.assertEqual(Persistencia.leer_formato(directorio), formato)
+                self.assertEqual(diccionarios(persistencia.cargar_eventos()), diccionarios(self.eventos))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_bajo_demanda.py - Consultas resueltas por el backend sin cargar el calendario
+import unittest
+from modelos.evento import Evento
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, fecha, ids
+
+
+class PruebaBajoDemanda(unittest.TestCase):
+
+    def setUp(self):
+        self.eventos = eventos_aleatorios(400, semilla=3)
+
+    def _abrir(self, directorio, formato):
+        persistencia = Persistencia(directorio, backend=formato)
+        persistencia.guardar_eventos(self.eventos)
+        persistencia.cerrar()
+        calendario = Calendario(directorio, persistencia=Persistencia(directorio, backend=formato),
+                                bajo_demanda=True)
+        self.addCleanup(calendario.persistencia.cerrar)
+        return calendario
+
+    def _comprobar_consultas(self, formato, consultas_recurso=True):
+        with DirectorioTemporal() as directorio:
+            calendario = self._abrir(directorio, formato)
+            self.assertFalse(calendario.en_memoria)
+
+            for desde, hasta in ((-30, -10), (0, 0), (5, 60), (200, 300)):
+                self.assertEqual(
+                    ids(calendario.buscar_por_rango_fechas(fecha(desde), fecha(hasta))),
+                    ids(Buscador.buscar_por_rango_fechas(self.eventos, fecha(desde), fecha(hasta))))
+            self.assertEqual(ids(calendario.eventos_proximos(10)),
+                             ids(Buscador.eventos_proximos(self.eventos, 10)))
+            conteo = calendario.conteo_por_mes()
+            esperado = Buscador.contar_eventos_por_mes(self.eventos)
+            self.assertEqual(list(conteo.items()), list(esperado.items()))
+            if consultas_recurso:
+                for texto in ("legi", "Senado", "flota", "nada"):
+                    self.assertEqual(ids(calendario.buscar_por_recurso(texto)),
+                                     ids(Buscador.buscar_por_recurso(self.eventos, texto)))
+
+            # Ninguna de esas consultas necesitó la lista completa
+            self.assertFalse(calendario.en_memoria)
+
+            # Una alta carga los eventos; desde entonces responden los índices
+            nuevo = Evento("alta tardía", fecha(1), fecha(2), ["Foro"])
+            calendario.agregar_evento(nuevo)
+            self.assertTrue(calendario.en_memoria)
+            self.assertEqual(len(calendario.eventos), len(self.eventos) + 1)
+            self.assertIn(nuevo.id, ids(calendario.buscar_por_rango_fechas(fecha(1), fecha(1))))
+
+    def test_sqlite(self):
+        self._comprobar_consultas("sqlite")
+
+    def test_particionado(self):
+        # Los fragmentos no indexan recursos: esa búsqueda carga el calendario
+        self._comprobar_consultas("particionado", consultas_recurso=False)
+
+    def test_consulta_sin_soporte_carga_los_eventos(self):
+        with DirectorioTemporal() as directorio:
+            calendario = self._abrir(directorio, "particionado")
+            self.assertEqual(ids(calendario.buscar_por_recurso("legi")),
+                             ids(Buscador.buscar_por_recurso(self.eventos, "legi")))
+            self.assertTrue(calendario.en_memoria)
+
+    def test_fecha_incorrecta_no_carga(self):
+        with DirectorioTemporal() as directorio:
+            calendario = self._abrir(directorio, "sqlite")
+            self.assertEqual(calendario.buscar_por_rango_fechas("mal", fecha(3)), [])
+            self.assertFalse(calendario.en_memoria)
+
+    def test_json_ignora_bajo_demanda(self):
+        # JSON no resuelve consultas: el calendario se carga al abrir
+        with DirectorioTemporal() as directorio:
+            calendario = self._abrir(directorio, "json")
+            self.assertTrue(calendario.en_memoria)
+            self.assertEqual(ids(calendario.eventos), ids(self.eventos))
+
+
+if __name__ == "__main__":
+    unittest.main()
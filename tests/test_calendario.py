@@ -0,0 +1,168 @@
+# tests/test_calendario.py - Bajas con huecos y consultas sobre ellos
+import os
+import unittest
+from modelos.recurso import Recurso
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, fecha, ids
+
+
+class PruebaHuecos(unittest.TestCase):
+
+    def _calendario(self, directorio, eventos):
+        # Con diario cada baja se anexa sin guardar la lista (que la compactaría)
+        persistencia = Persistencia(directorio, diario=True)
+        self.addCleanup(persistencia.cerrar)
+        calendario = Calendario(directorio, persistencia=persistencia)
+        calendario.agregar_eventos(eventos)
+        return calendario
+
+    def test_consultas_no_compactan_tras_una_baja(self):
+        with DirectorioTemporal() as directorio:
+            eventos = eventos_aleatorios(200, semilla=3)
+            calendario = self._calendario(directorio, eventos)
+            calendario.eliminar_evento_por_id(eventos[50].id)
+            vivos = eventos[:50] + eventos[51:]
+
+            self.assertEqual(ids(calendario.buscar_por_rango_fechas(fecha(-10), fecha(10))),
+                             ids(Buscador.buscar_por_rango_fechas(vivos, fecha(-10), fecha(10))))
+            self.assertEqual(ids(calendario.buscar_por_recurso("Legión")),
+                             ids(Buscador.buscar_por_recurso(vivos, "Legión")))
+            self.assertEqual(ids(calendario.eventos_sin_recursos()),
+                             ids(Buscador.buscar_eventos_sin_recursos(vivos)))
+            self.assertEqual(calendario.generar_informe(), Buscador.generar_informe(vivos))
+            self.assertEqual(calendario.total_eventos(), len(vivos))
+            # El hueco sigue ahí: ninguna consulta ha recorrido la lista para quitarlo
+            self.assertEqual(calendario._huecos, 1)
+
+            self.assertEqual(ids(calendario.eventos), ids(vivos))
+            self.assertEqual(calendario._huecos, 0)
+
+    def test_busqueda_vacia_tras_una_baja(self):
+        with DirectorioTemporal() as directorio:
+            eventos = eventos_aleatorios(50, semilla=5)
+            calendario = self._calendario(directorio, eventos)
+            # Sin texto, todas devuelven la lista de eventos (no un generador de un solo uso)
+            for numero, buscar in enumerate((calendario.buscar_por_recurso, calendario.buscar_por_fecha,
+                                             calendario.buscar_por_nombre)):
+                with self.subTest(buscar=buscar.__name__):
+                    calendario.eliminar_evento_por_id(eventos[numero].id)
+                    self.assertEqual(calendario._huecos, 1)
+                    vivos = ids(eventos[numero + 1:])
+                    resultado = buscar("")
+                    self.assertEqual(len(resultado), len(vivos))
+                    self.assertEqual(ids(resultado), vivos)
+                    self.assertEqual(ids(resultado[:5]), vivos[:5])
+
+    def test_asentar_deja_las_consultas_sin_trabajo(self):
+        with DirectorioTemporal() as directorio:
+            eventos = eventos_aleatorios(200, semilla=7)
+            calendario = self._calendario(directorio, eventos)
+            calendario.eliminar_eventos_por_id(ids(eventos[:60]))
+            vivos = eventos[60:]
+            calendario.asentar_indices()
+            self.assertEqual(calendario._huecos, 0)
+            self.assertEqual(calendario._indice_fechas._meses_revisar, set())
+            self.assertEqual(calendario._indice_recursos._revisar, set())
+            self.assertEqual(calendario.generar_informe(), Buscador.generar_informe(vivos))
+
+    def test_lote_compacta_al_confirmar(self):
+        with DirectorioTemporal() as directorio:
+            eventos = eventos_aleatorios(100, semilla=4)
+            calendario = self._calendario(directorio, eventos)
+            with calendario.lote():
+                calendario.eliminar_eventos_por_id(ids(eventos[::10]))
+                self.assertEqual(calendario._huecos, 10)
+            self.assertEqual(calendario._huecos, 0)
+            self.assertEqual(ids(Calendario(directorio, persistencia=Persistencia(directorio, diario=True)).eventos),
+                             ids(evento for i, evento in enumerate(eventos) if i % 10))
+
+
+class PruebaPaginaPorNombre(unittest.TestCase):
+
+    def test_pagina_sin_indice_de_trigramas(self):
+        with DirectorioTemporal() as directorio:
+            persistencia = Persistencia(directorio, diario=True)
+            self.addCleanup(persistencia.cerrar)
+            calendario = Calendario(directorio, persistencia=persistencia)
+            eventos = eventos_aleatorios(150, semilla=5)
+            calendario.agregar_eventos(eventos[:100])
+
+            leidos, cursor = calendario.pagina_por_nombre(30)
+            # Entre páginas cambian los eventos; la página siguiente sigue al cursor
+            calendario.eliminar_eventos_por_id(ids(eventos[:100:3]))
+            calendario.agregar_eventos(eventos[100:])
+            while cursor is not None:
+                pagina, cursor = calendario.pagina_por_nombre(30, cursor)
+                leidos.extend(pagina)
+
+            clave = lambda evento: (evento.nombre.lower(), evento.id)
+            ultimo = clave(leidos[29])
+            esperado = leidos[:30] + sorted((evento for evento in calendario.eventos
+                                             if clave(evento) > ultimo), key=clave)
+            self.assertEqual(ids(leidos), ids(esperado))
+            # La paginación no construye el índice de las búsquedas por nombre
+            self.assertIsNone(calendario._indice_nombres)
+
+
+def contenido(directorio):
+    """{archivo: bytes} de todos los archivos de datos"""
+    archivos = {}
+    for nombre in sorted(os.listdir(directorio)):
+        with open(os.path.join(directorio, nombre), 'rb') as f:
+            archivos[nombre] = f.read()
+    return archivos
+
+
+class PruebaLote(unittest.TestCase):
+
+    def test_excepcion_deshace_todo(self):
+        eventos = eventos_aleatorios(120, semilla=6)
+        for diario in (False, True):
+            with self.subTest(diario=diario), DirectorioTemporal() as directorio:
+                Recurso.inicializar(directorio)
+                persistencia = Persistencia(directorio, diario=diario)
+                self.addCleanup(persistencia.cerrar)
+                calendario = Calendario(directorio, persistencia=persistencia)
+                with calendario.lote():
+                    for evento in eventos[:80]:
+                        calendario.agregar_evento(evento)
+                        for recurso in evento.recursos:
+                            Recurso.agregar_recurso(recurso)
+                            Recurso.marcar_como_usado(recurso, evento)
+                calendario.buscar_por_nombre("fiesta")  # Con el índice de trigramas ya construido
+                previos = list(calendario.eventos)
+                recursos_previos = Recurso.instantanea()
+                archivos_previos = contenido(directorio)
+
+                with self.assertRaises(RuntimeError):
+                    with calendario.lote():
+                        for evento in eventos[80:]:
+                            calendario.agregar_evento(evento)
+                            for recurso in evento.recursos:
+                                Recurso.marcar_como_usado(recurso, evento)
+                        for evento in eventos[:80:3]:
+                            calendario.eliminar_evento_por_id(evento.id)
+                            for recurso in evento.recursos:
+                                Recurso.liberar_recurso(recurso, evento)
+                        raise RuntimeError("el bloque falla")
+
+                self.assertEqual(ids(calendario.eventos), ids(previos))
+                self.assertEqual(calendario.total_eventos(), len(previos))
+                self.assertIsNone(calendario.obtener_evento_por_id(eventos[100].id))
+                self.assertIs(calendario.obtener_evento_por_id(eventos[3].id), eventos[3])
+                for buscar, referencia, argumentos in (
+                        (calendario.buscar_por_nombre, Buscador.buscar_por_nombre, ("fiesta",)),
+                        (calendario.buscar_por_recurso, Buscador.buscar_por_recurso, ("Legión",)),
+                        (calendario.buscar_por_rango_fechas, Buscador.buscar_por_rango_fechas,
+                         (fecha(-30), fecha(30)))):
+                    self.assertEqual(ids(buscar(*argumentos)), ids(referencia(previos, *argumentos)))
+                self.assertEqual(calendario.generar_informe(), Buscador.generar_informe(previos))
+                self.assertEqual(Recurso.instantanea(), recursos_previos)
+                # Nada se ha escrito: ni eventos, ni diario, ni recursos.json
+                self.assertEqual(contenido(directorio), archivos_previos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# tests/test_cli.py - Línea de comandos: JSON por líneas en stdout, mensajes en stderr
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+import cli
+from nucleo.buscador import Buscador
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, fecha, ids
+
+
+class PruebaCli(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        # Solo eventos que `agregar` admite (fechas válidas y en orden)
+        self.eventos = [evento for evento in eventos_aleatorios(60, semilla=14)
+                        if evento.inicio_ord and evento.inicio_ord <= evento.fin_ord]
+
+    def _ejecutar(self, *argumentos):
+        """(código de salida, objetos de stdout, texto de stderr)"""
+        salida, errores = io.StringIO(), io.StringIO()
+        with redirect_stdout(salida), redirect_stderr(errores):
+            codigo = cli.main(["--datos", self.directorio] + list(argumentos))
+        # Cada línea de stdout es un objeto JSON completo
+        objetos = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+        return codigo, objetos, errores.getvalue()
+
+    def _escribir(self, nombre, texto):
+        ruta = os.path.join(self.directorio, nombre)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        return ruta
+
+    def _agregar(self, eventos):
+        lineas = "\n".join(json.dumps(evento.a_diccionario(), ensure_ascii=False) for evento in eventos)
+        return self._ejecutar("agregar", self._escribir("entrada.jsonl", lineas))
+
+    def test_agregar_y_listar(self):
+        codigo, objetos, _ = self._agregar(self.eventos[:40])
+        self.assertEqual(codigo, 0)
+        self.assertEqual(objetos, [{'agregados': 40, 'total_eventos': 40}])
+
+        # También un arreglo JSON
+        arreglo = json.dumps([evento.a_diccionario() for evento in self.eventos[40:]])
+        codigo, objetos, _ = self._ejecutar("agregar", self._escribir("entrada.json", arreglo))
+        self.assertEqual(objetos, [{'agregados': len(self.eventos) - 40, 'total_eventos': len(self.eventos)}])
+
+        codigo, objetos, _ = self._ejecutar("listar")
+        self.assertEqual(codigo, 0)
+        self.assertEqual(objetos, [evento.a_diccionario() for evento in self.eventos])
+
+    def test_buscar(self):
+        self._agregar(self.eventos)
+        codigo, objetos, _ = self._ejecutar("buscar", "--desde", fecha(-30), "--hasta", fecha(30),
+                                            "--orden", "fecha", "--limite", "5")
+        self.assertEqual(codigo, 0)
+        en_rango = Buscador.buscar_por_rango_fechas(self.eventos, fecha(-30), fecha(30))
+        self.assertEqual([objeto['id'] for objeto in objetos], ids(Buscador.ordenar_por_fecha(en_rango)[:5]))
+
+        # Los filtros se combinan
+        codigo, objetos, _ = self._ejecutar("buscar", "--recurso", "legión", "--nombre", "a")
+        esperados = Buscador.buscar_por_nombre(Buscador.buscar_por_recurso(self.eventos, "legión"), "a")
+        self.assertEqual([objeto['id'] for objeto in objetos], ids(esperados))
+        self.assertTrue(objetos)
+
+    def test_convertir(self):
+        self._agregar(self.eventos)
+        for formato in ("sqlite", "binario", "particionado", "json"):
+            with self.subTest(formato=formato):
+                codigo, objetos, _ = self._ejecutar("convertir", formato)
+                self.assertEqual(codigo, 0)
+                self.assertEqual(objetos, [{'formato': formato, 'convertido': True}])
+                self.assertEqual(Persistencia.leer_formato(self.directorio), formato)
+                _, listados, _ = self._ejecutar("listar")
+                self.assertEqual(listados, [evento.a_diccionario() for evento in self.eventos])
+
+    def test_campo_que_falta(self):
+        codigo, objetos, errores = self._ejecutar(
+            "agregar", self._escribir("entrada.jsonl", json.dumps({'nombre': "Censo", 'fin': fecha(2)})))
+        self.assertEqual(codigo, 1)
+        self.assertEqual(objetos, [])
+        self.assertIn("❌ Falta el campo 'inicio'", errores)
+        # Nada se ha agregado
+        self.assertEqual(self._ejecutar("listar")[1], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
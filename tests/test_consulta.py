@@ -0,0 +1,41 @@
+# tests/test_consulta.py - Calendario.consultar() y su planificador
+import unittest
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, fecha, ids
+
+
+class PruebaConsulta(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        persistencia = Persistencia(self.directorio, diario=True)
+        self.addCleanup(persistencia.cerrar)
+        self.calendario = Calendario(self.directorio, persistencia=persistencia)
+        self.eventos = eventos_aleatorios(100, semilla=6)
+        self.calendario.agregar_eventos(self.eventos)
+
+    def test_total_sin_huecos(self):
+        for evento in self.eventos[:30]:
+            self.calendario.eliminar_evento_por_id(evento.id)
+        self.assertGreater(self.calendario._huecos, 0)
+        self.assertTrue(self.calendario.consultar().explicar().startswith("Consulta sobre 70 eventos"))
+
+        vivos = self.eventos[30:]
+        resultado = self.calendario.consultar().recurso("Legión").entre_fechas(fecha(-30), fecha(30))
+        esperado = Buscador.buscar_por_recurso(
+            Buscador.buscar_por_rango_fechas(vivos, fecha(-30), fecha(30)), "Legión")
+        self.assertEqual(ids(resultado), ids(esperado))
+
+    def test_fecha_incorrecta(self):
+        with self.assertRaises(ValueError):
+            self.calendario.consultar().entre_fechas("31/02/2024", fecha(0))
+        with self.assertRaises(ValueError):
+            self.calendario.consultar().en_fecha("mañana")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# tests/test_diario.py - Diario de solo-anexado y su compactación
+import random
+import threading
+import unittest
+from unittest import mock
+from nucleo.backend import BackendJSON
+from nucleo.diario import Diario
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, ids
+
+
+def aplicar_uno_a_uno(eventos, registros):
+    """Reproducción directa de los registros, evento a evento"""
+    eventos = list(eventos)
+    for registro in registros:
+        if registro['op'] == 'alta':
+            eventos.extend(Diario.aplicar([], [registro]))
+            continue
+        for i, evento in enumerate(eventos):
+            if (evento.id == registro['id'] if registro.get('id')
+                    else evento.nombre == registro['nombre']):
+                eventos.pop(i)
+                break
+    return eventos
+
+
+class PruebaDiario(unittest.TestCase):
+
+    def test_aplicar_equivale_a_reproducir_uno_a_uno(self):
+        azar = random.Random(1)
+        eventos = eventos_aleatorios(200, semilla=1)
+        snapshot, anexados = eventos[:120], eventos[120:]
+        vivos = list(snapshot)
+        registros = []
+        for evento in anexados:
+            registros.append({'op': 'alta', 'evento': evento.a_diccionario()})
+            vivos.append(evento)
+            if azar.random() < 0.5:
+                quitado = vivos.pop(azar.randrange(len(vivos)))
+                # Algunas bajas de diarios anteriores a los ids, solo por nombre
+                if azar.random() < 0.2:
+                    registros.append({'op': 'baja', 'nombre': quitado.nombre})
+                else:
+                    registros.append({'op': 'baja', 'id': quitado.id, 'nombre': quitado.nombre})
+        registros.append({'op': 'baja', 'id': 'inexistente', 'nombre': 'nadie'})
+
+        esperado = aplicar_uno_a_uno(snapshot, registros)
+        self.assertEqual(ids(Diario.aplicar(list(snapshot), registros)), ids(esperado))
+
+    def test_lectura_coherente_durante_la_compactacion(self):
+        with DirectorioTemporal() as directorio:
+            backend = BackendJSON(directorio, diario=True, umbral_compactacion=10 ** 6)
+            self.addCleanup(backend.cerrar)
+            eventos = eventos_aleatorios(120, semilla=2)
+            backend.guardar_eventos(eventos[:80])
+            backend.registrar_cambios([('alta', evento) for evento in eventos[80:]])
+            backend.registrar_cambios([('baja', evento) for evento in eventos[10:90:7]])
+            esperado = ids(backend.iterar_eventos())
+
+            # La compactación se publica justo cuando un lector acaba de leer
+            # el diario: la lectura debe seguir viendo el estado anterior, sin
+            # mezclar el snapshot nuevo con los registros que ya incorpora
+            diario = backend.diario
+            guardar_snapshot = diario.guardar_snapshot
+            puede_publicar = threading.Event()
+            publicado = threading.Event()
+
+            def guardar_tras_la_lectura(eventos, **opciones):
+                puede_publicar.wait(5)
+                resultado = guardar_snapshot(eventos, **opciones)
+                publicado.set()
+                return resultado
+
+            leer_registros = Diario._leer_registros
+
+            def leer_y_compactar(ruta):
+                registros = leer_registros(ruta)
+                if ruta == diario.ruta_diario and threading.current_thread() is threading.main_thread():
+                    puede_publicar.set()
+                    publicado.wait(0.5)
+                return registros
+
+            diario.guardar_snapshot = guardar_tras_la_lectura
+            self.assertTrue(diario.compactar_en_segundo_plano())
+            with mock.patch.object(Diario, '_leer_registros', staticmethod(leer_y_compactar)):
+                lectura = backend.iterar_eventos()
+                leidos = [next(lectura)]
+            leidos.extend(lectura)
+            diario.esperar_compactacion()
+            self.assertEqual(diario.archivos(), [])
+
+            self.assertEqual(ids(leidos), esperado)
+            self.assertEqual(ids(backend.iterar_eventos()), esperado)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_indices.py - Los índices del calendario frente al recorrido lineal del Buscador
+import random
+import unittest
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import PALABRAS, RECURSOS, DirectorioTemporal, evento_aleatorio, fecha, ids
+
+
+class PruebaIndices(unittest.TestCase):
+    """
+    Un calendario con altas y bajas al azar (con huecos sin compactar) debe
+    responder lo mismo que el Buscador sobre la lista de eventos vivos
+    """
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        persistencia = Persistencia(self.directorio, diario=True)
+        self.addCleanup(persistencia.cerrar)
+        self.calendario = Calendario(self.directorio, persistencia=persistencia)
+        self.azar = random.Random(11)
+
+    def _mutar(self, vivos, pasos, numero):
+        """Altas y bajas al azar sobre el calendario y sobre la lista de referencia"""
+        for _ in range(pasos):
+            if vivos and self.azar.random() < 0.4:
+                evento = vivos.pop(self.azar.randrange(len(vivos)))
+                self.assertIs(self.calendario.eliminar_evento_por_id(evento.id), evento)
+            else:
+                evento = evento_aleatorio(self.azar, numero)
+                numero += 1
+                self.calendario.agregar_evento(evento)
+                vivos.append(evento)
+        return numero
+
+    def _comprobar(self, vivos):
+        calendario = self.calendario
+        azar = self.azar
+        for _ in range(5):
+            desde = azar.randint(-150, 150)
+            hasta = desde + azar.randint(-5, 60)
+            self.assertEqual(ids(calendario.buscar_por_fecha(fecha(desde))),
+                             ids(Buscador.buscar_por_fecha(vivos, fecha(desde))))
+            self.assertEqual(ids(calendario.buscar_por_rango_fechas(fecha(desde), fecha(hasta))),
+                             ids(Buscador.buscar_por_rango_fechas(vivos, fecha(desde), fecha(hasta))))
+
+            texto = azar.choice(PALABRAS)[:azar.randint(1, 6)] + azar.choice(["", " 1", "a"])
+            self.assertEqual(ids(calendario.buscar_por_nombre(texto)),
+                             ids(Buscador.buscar_por_nombre(vivos, texto)))
+            recurso = azar.choice(RECURSOS)[:azar.randint(2, 8)].lower()
+            self.assertEqual(ids(calendario.buscar_por_recurso(recurso)),
+                             ids(Buscador.buscar_por_recurso(vivos, recurso)))
+            recursos = azar.sample(RECURSOS, 2)
+            self.assertEqual(ids(calendario.buscar_por_recursos(recursos)),
+                             ids(Buscador.buscar_por_recursos(vivos, recursos)))
+
+            consulta = (calendario.consultar().recurso(recurso)
+                        .entre_fechas(fecha(desde), fecha(desde + 30)).ordenar('fecha', False).limitar(7))
+            esperado = Buscador.ordenar_por_fecha(Buscador.buscar_por_recurso(
+                Buscador.buscar_por_rango_fechas(vivos, fecha(desde), fecha(desde + 30)), recurso), False)
+            self.assertEqual(ids(consulta), ids(esperado[:7]))
+
+        for dias in (0, 7, 30):
+            self.assertEqual(ids(calendario.eventos_proximos(dias)),
+                             ids(Buscador.eventos_proximos(vivos, dias)))
+        self.assertEqual(ids(calendario.eventos_en_curso()), ids(Buscador.eventos_en_curso(vivos)))
+        self.assertEqual(ids(calendario.eventos_pasados()), ids(Buscador.eventos_pasados(vivos)))
+        self.assertEqual(ids(calendario.eventos_sin_recursos()),
+                         ids(Buscador.buscar_eventos_sin_recursos(vivos)))
+        for ascendente in (True, False):
+            self.assertEqual(ids(calendario.ordenar_por_fecha(ascendente)),
+                             ids(Buscador.ordenar_por_fecha(vivos, ascendente)))
+
+        informe = calendario.generar_informe()
+        self.assertEqual(informe, Buscador.generar_informe(vivos))
+        self.assertEqual(list(informe['conteo_por_mes'].items()),
+                         list(Buscador.contar_eventos_por_mes(vivos).items()))
+        self.assertEqual(list(informe['estadisticas_recursos'].items()),
+                         list(Buscador.estadisticas_recursos(vivos).items()))
+
+    def test_altas_y_bajas_al_azar(self):
+        vivos = []
+        numero = 0
+        # Dentro del lote las bajas dejan huecos (sin escribir nada en disco)
+        with self.calendario.lote():
+            for _ in range(12):
+                numero = self._mutar(vivos, 40, numero)
+                self._comprobar(vivos)
+        self.assertEqual(self.calendario._huecos, 0)
+        self._comprobar(vivos)
+
+    def test_bajas_hasta_compactar(self):
+        vivos = []
+        numero = self._mutar(vivos, 200, 0)
+        with self.calendario.lote():
+            # Más de la mitad de huecos: la lista se compacta sola
+            for evento in vivos[::3] + vivos[1::3]:
+                self.calendario.eliminar_evento_por_id(evento.id)
+            vivos = vivos[2::3]
+            self._comprobar(vivos)
+            self._mutar(vivos, 50, numero)
+            self._comprobar(vivos)
+
+    def test_indices_al_recargar(self):
+        vivos = []
+        self._mutar(vivos, 150, 0)
+        recargado = Calendario(self.directorio, persistencia=Persistencia(self.directorio, diario=True))
+        self.addCleanup(recargado.persistencia.cerrar)
+        self.assertEqual(ids(recargado.eventos), ids(vivos))
+        self.calendario = recargado
+        self._comprobar(vivos)
+
+
+if __name__ == '__main__':
+    unittest.main()
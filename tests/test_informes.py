@@ -0,0 +1,43 @@
+# tests/test_informes.py - Motor de informes y agregadores
+import unittest
+from nucleo import informes
+from nucleo.buscador import Buscador
+from tests.ayudas import eventos_aleatorios
+
+
+class EventosConLegion(informes.Agregador):
+    clave = 'eventos_con_legion'
+
+    def __init__(self):
+        self.total = 0
+
+    def agregar(self, evento):
+        self.total += any(recurso.startswith("Legión") for recurso in evento.recursos)
+
+    def resultado(self):
+        return self.total
+
+
+class PruebaInformes(unittest.TestCase):
+
+    def test_agregador_propio(self):
+        eventos = eventos_aleatorios(3000, semilla=10)
+        motor = informes.MotorInformes().registrar(EventosConLegion)
+        informe = motor.generar(eventos)
+        self.assertEqual(informe['eventos_con_legion'],
+                         len(Buscador.buscar_por_recurso(eventos, "Legión")))
+        self.assertEqual(list(informe), motor.claves())
+
+    def test_agregador_incompleto(self):
+        class SinResultado(informes.Agregador):
+            clave = 'sin_resultado'
+
+            def agregar(self, evento):
+                pass
+
+        with self.assertRaises(TypeError):
+            SinResultado()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_medianoche.py - Consultas relativas a hoy, también a medianoche
+import unittest
+from datetime import date
+from unittest import mock
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, ids
+
+
+class PruebaMedianoche(unittest.TestCase):
+    """El snapshot columnar y el backend siguen el mismo criterio que el Buscador"""
+
+    def setUp(self):
+        self.eventos = eventos_aleatorios(400, semilla=7)
+
+    def _comprobar(self, desfase):
+        hoy = date.today().toordinal()
+        with DirectorioTemporal() as directorio, \
+                mock.patch('nucleo.informes.momento_actual', return_value=(hoy, desfase)):
+            persistencia = Persistencia(directorio, backend="sqlite")
+            self.addCleanup(persistencia.cerrar)
+            persistencia.guardar_eventos(self.eventos)
+
+            bajo_demanda = Calendario(directorio, persistencia=persistencia, bajo_demanda=True)
+            self.assertEqual(ids(bajo_demanda.eventos_proximos(7)),
+                             ids(Buscador.eventos_proximos(self.eventos, 7)))
+            self.assertFalse(bajo_demanda.en_memoria)
+
+            persistencia.publicar_snapshot_columnar()
+            columnar = Calendario(directorio, persistencia=persistencia, solo_lectura=True)
+            self.assertEqual(ids(columnar.eventos_proximos(7)),
+                             ids(Buscador.eventos_proximos(self.eventos, 7)))
+            self.assertEqual(ids(columnar.eventos_pasados()),
+                             ids(Buscador.eventos_pasados(self.eventos)))
+            self.assertEqual(ids(columnar.eventos_en_curso()),
+                             ids(Buscador.eventos_en_curso(self.eventos)))
+            columnar.eventos.cerrar()
+
+    def test_a_medianoche(self):
+        self._comprobar(0)
+
+    def test_durante_el_dia(self):
+        self._comprobar(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
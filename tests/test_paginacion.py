@@ -0,0 +1,102 @@
+# tests/test_paginacion.py - Páginas con cursor por fecha y por nombre
+import json
+import random
+import unittest
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from nucleo.servicio import ServicioCalendario
+from tests.ayudas import DirectorioTemporal, evento_aleatorio, eventos_aleatorios, ids
+
+CLAVES = {
+    'fecha': lambda evento: (evento.inicio_ord or 0, evento.id),
+    'nombre': lambda evento: (evento.nombre.lower(), evento.id)
+}
+
+
+class PruebaPaginacion(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        persistencia = Persistencia(self.directorio, diario=True)
+        self.addCleanup(persistencia.cerrar)
+        self.calendario = Calendario(self.directorio, persistencia=persistencia)
+        self.eventos = eventos_aleatorios(300, semilla=13)
+        self.calendario.agregar_eventos(self.eventos)
+
+    def _paginas(self, orden):
+        return {'fecha': self.calendario.pagina_por_fecha,
+                'nombre': self.calendario.pagina_por_nombre}[orden]
+
+    def test_sin_saltos_ni_repeticiones_con_cambios(self):
+        azar = random.Random(13)
+        numero = len(self.eventos)
+        for orden in CLAVES:
+            for ascendente in (True, False):
+                with self.subTest(orden=orden, ascendente=ascendente), self.calendario.lote():
+                    clave = CLAVES[orden]
+                    paginar = self._paginas(orden)
+                    al_principio = set(ids(self.calendario.eventos))
+                    quitados = set()
+                    leidos = []
+                    cursor = None
+                    while True:
+                        pagina, cursor = paginar(17, cursor, ascendente)
+                        leidos.extend(pagina)
+                        if cursor is None:
+                            break
+                        # Entre páginas: bajas (algunas de lo ya leído) y altas
+                        for _ in range(3):
+                            vivos = self.calendario.eventos
+                            evento = vivos[azar.randrange(len(vivos))]
+                            self.calendario.eliminar_evento_por_id(evento.id)
+                            quitados.add(evento.id)
+                            self.calendario.agregar_evento(evento_aleatorio(azar, numero))
+                            numero += 1
+
+                    claves = [clave(evento) for evento in leidos]
+                    self.assertEqual(claves, sorted(claves, reverse=not ascendente))
+                    self.assertEqual(len(set(claves)), len(claves))
+                    # Todo evento que estuvo durante toda la paginación sale una vez
+                    self.assertLessEqual(al_principio - quitados, set(ids(leidos)))
+
+    def test_con_indice_igual_que_sin_indice(self):
+        for evento in self.eventos[::4]:
+            self.calendario.eliminar_evento_por_id(evento.id)
+        vivos = [evento for i, evento in enumerate(self.eventos) if i % 4]
+        lineales = {'fecha': Buscador.pagina_por_fecha, 'nombre': Buscador.pagina_por_nombre}
+        for orden in CLAVES:
+            for ascendente in (True, False):
+                with self.subTest(orden=orden, ascendente=ascendente):
+                    cursor = cursor_lineal = None
+                    while True:
+                        pagina, cursor = self._paginas(orden)(25, cursor, ascendente)
+                        esperada, cursor_lineal = lineales[orden](vivos, 25, cursor_lineal, ascendente)
+                        self.assertEqual(ids(pagina), ids(esperada))
+                        self.assertEqual(cursor, cursor_lineal)
+                        if cursor is None:
+                            break
+                    completo = sorted(vivos, key=CLAVES[orden], reverse=not ascendente)
+                    self.assertEqual(ids(pagina), ids(completo[-len(pagina):]))
+
+    def test_cursor_del_servicio(self):
+        servicio = ServicioCalendario(self.calendario)
+        for orden in CLAVES:
+            with self.subTest(orden=orden):
+                leidos = []
+                peticion = {'op': 'listar', 'orden': orden, 'limite': 40}
+                while True:
+                    # El cursor viaja como JSON (una lista) entre peticiones
+                    respuesta = json.loads(json.dumps(servicio.leer(peticion)))
+                    self.assertEqual(respuesta['total'], len(self.eventos))
+                    leidos.extend(evento['id'] for evento in respuesta['eventos'])
+                    if respuesta['cursor'] is None:
+                        break
+                    peticion['cursor'] = respuesta['cursor']
+                self.assertEqual(leidos, ids(sorted(self.eventos, key=CLAVES[orden])))
+
+
+if __name__ == '__main__':
+    unittest.main()
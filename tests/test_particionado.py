@@ -0,0 +1,75 @@
+# tests/test_particionado.py - Fragmentos por periodo con caché LRU
+import os
+import unittest
+from modelos.evento import Evento
+from nucleo.buscador import Buscador
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, eventos_aleatorios, fecha, ids
+
+
+class PruebaParticionado(unittest.TestCase):
+
+    def setUp(self):
+        self.eventos = eventos_aleatorios(300, semilla=8)
+
+    def _guardar(self, directorio):
+        persistencia = Persistencia(directorio, backend="particionado")
+        persistencia.guardar_eventos(self.eventos)
+        persistencia.cerrar()
+
+    def _abrir(self, directorio, **opciones):
+        persistencia = Persistencia(directorio, backend="particionado", **opciones)
+        calendario = Calendario(directorio, persistencia=persistencia, bajo_demanda=True)
+        self.addCleanup(persistencia.cerrar)
+        return calendario
+
+    def test_rango_solo_lee_fragmentos_solapados(self):
+        with DirectorioTemporal() as directorio:
+            self._guardar(directorio)
+            calendario = self._abrir(directorio)
+            backend = calendario.persistencia.backend
+
+            resultado = calendario.buscar_por_rango_fechas(fecha(40), fecha(45))
+            self.assertEqual(ids(resultado),
+                             ids(Buscador.buscar_por_rango_fechas(self.eventos, fecha(40), fecha(45))))
+            cache = backend.estadisticas_cache()
+            self.assertGreater(len(cache['fragmentos_en_cache']), 0)
+            self.assertLess(len(cache['fragmentos_en_cache']), cache['fragmentos_totales'])
+            self.assertFalse(calendario.en_memoria)
+
+    def test_presupuesto_de_memoria(self):
+        with DirectorioTemporal() as directorio:
+            self._guardar(directorio)
+            calendario = self._abrir(directorio, presupuesto_memoria=1)
+            for desde in range(-120, 120, 20):
+                calendario.buscar_por_rango_fechas(fecha(desde), fecha(desde + 40))
+                calendario.eventos_proximos(7)
+            # Por encima del presupuesto solo se conserva el último fragmento usado
+            cache = calendario.persistencia.backend.estadisticas_cache()
+            self.assertEqual(len(cache['fragmentos_en_cache']), 1)
+
+    def test_alta_solo_reescribe_su_fragmento(self):
+        with DirectorioTemporal() as directorio:
+            self._guardar(directorio)
+            fragmentos = [nombre for nombre in os.listdir(directorio)
+                          if nombre.startswith("eventos-") and nombre.endswith(".json")]
+            antes = {nombre: os.stat(os.path.join(directorio, nombre)).st_mtime_ns
+                     for nombre in fragmentos}
+
+            calendario = self._abrir(directorio)
+            nuevo = Evento("alta", "15/06/2031", "16/06/2031", ["Foro"])
+            calendario.agregar_evento(nuevo)
+
+            despues = {nombre: os.stat(os.path.join(directorio, nombre)).st_mtime_ns
+                       for nombre in fragmentos}
+            self.assertEqual(antes, despues)
+            self.assertTrue(os.path.exists(os.path.join(directorio, "eventos-2031-06.json")))
+
+            recargado = Persistencia(directorio, backend="particionado")
+            self.addCleanup(recargado.cerrar)
+            self.assertEqual(ids(recargado.cargar_eventos()), ids(self.eventos) + [nuevo.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
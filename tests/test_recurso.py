@@ -0,0 +1,124 @@
+# tests/test_recurso.py - Escritura diferida de los recursos
+import os
+import threading
+import unittest
+from modelos.evento import Evento, fecha_a_ordinal
+from modelos.recurso import Recurso
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, fecha
+
+
+def hilos_de_escritura():
+    return [hilo for hilo in threading.enumerate() if hilo.name == "escritura-recursos"]
+
+
+class PruebaEscrituraDiferida(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        Recurso.inicializar(self.directorio)
+        self.addCleanup(Recurso.detener_escritura_diferida)
+
+    def test_reactivar_no_lanza_otro_hilo(self):
+        self.assertTrue(Recurso.activar_escritura_diferida(60))
+        # Como al limpiar los datos desde la aplicación: reinicializar y volver a activar
+        Recurso.inicializar(self.directorio)
+        self.assertFalse(Recurso.activar_escritura_diferida(60))
+        self.assertEqual(len(hilos_de_escritura()), 1)
+
+    def test_activaciones_simultaneas(self):
+        resultados = []
+        barrera = threading.Barrier(8)
+
+        def activar():
+            barrera.wait()
+            resultados.append(Recurso.activar_escritura_diferida(60))
+
+        hilos = [threading.Thread(target=activar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(resultados.count(True), 1)
+        self.assertEqual(len(hilos_de_escritura()), 1)
+
+    def test_detener_vuelca_lo_pendiente(self):
+        Recurso.agregar_recurso("Senado")
+        Recurso.activar_escritura_diferida(60)
+        Recurso.marcar_como_usado("Senado", Evento("Censo", fecha(1), fecha(2), ["Senado"]))
+        Recurso.detener_escritura_diferida()
+        self.assertEqual(hilos_de_escritura(), [])
+        self.assertTrue(os.path.exists(os.path.join(self.directorio, "recursos.json")))
+
+
+
+def dia(dias):
+    return fecha_a_ordinal(fecha(dias))
+
+
+class PruebaOcupacionPorFechas(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        Recurso.inicializar(self.directorio)
+        for recurso in ("Flota", "Senado", "Foro"):
+            Recurso.agregar_recurso(recurso)
+
+    def _calendario(self):
+        persistencia = Persistencia(self.directorio, diario=True)
+        self.addCleanup(persistencia.cerrar)
+        return Calendario(self.directorio, persistencia=persistencia)
+
+    def _agendar(self, calendario):
+        """Batalla naval (Flota) del día 10 al 14 y sesión (Senado) el día 12"""
+        with calendario.lote():
+            for evento in (Evento("Batalla naval", fecha(10), fecha(14), ["Flota"]),
+                           Evento("Sesión", fecha(12), fecha(12), ["Senado"])):
+                calendario.agregar_evento(evento)
+                for recurso in evento.recursos:
+                    Recurso.marcar_como_usado(recurso, evento)
+
+    def _comprobar_franjas(self):
+        self.assertEqual(Recurso.obtener_disponibles(dia(0), dia(9)), ["Flota", "Senado", "Foro"])
+        self.assertEqual(Recurso.obtener_disponibles(dia(12), dia(12)), ["Foro"])
+        self.assertEqual(Recurso.obtener_disponibles(dia(13), dia(20)), ["Senado", "Foro"])
+        self.assertEqual(Recurso.obtener_disponibles(dia(15)), ["Flota", "Senado", "Foro"])
+        # Los extremos son cerrados
+        self.assertFalse(Recurso.esta_libre("Flota", dia(14), dia(16)))
+        self.assertTrue(Recurso.esta_libre("Flota", dia(15), dia(16)))
+        self.assertFalse(Recurso.esta_libre("Flota", dia(5), dia(10)))
+        self.assertTrue(Recurso.esta_libre("Senado", dia(13), dia(13)))
+        # Sin periodo cuenta cualquier uso
+        self.assertEqual(Recurso.obtener_disponibles(), ["Foro"])
+
+    def test_franjas_solapadas_y_libres(self):
+        calendario = self._calendario()
+        self._agendar(calendario)
+        self._comprobar_franjas()
+
+        sesion = calendario.obtener_evento("Sesión")
+        calendario.eliminar_evento_por_id(sesion.id)
+        Recurso.liberar_recurso("Senado", sesion)
+        self.assertEqual(Recurso.obtener_disponibles(dia(12), dia(12)), ["Senado", "Foro"])
+
+    def test_ocupacion_al_cargar_el_calendario(self):
+        calendario = self._calendario()
+        self._agendar(calendario)
+        calendario.persistencia.cerrar()
+
+        # Como en otro proceso: primero recursos.json (sin fechas), luego el calendario
+        with DirectorioTemporal() as vacio:
+            Recurso.inicializar(vacio)
+        Recurso.inicializar(self.directorio)
+        self.assertFalse(Recurso.esta_libre("Flota", dia(0), dia(1)))
+        self._calendario()
+        self._comprobar_franjas()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/test_restricciones.py - Co-requisitos y exclusiones entre recursos
+import os
+import unittest
+from modelos.evento import Evento
+from modelos.recurso import Recurso
+from modelos.restricciones import ARCHIVO_RESTRICCIONES, Restricciones
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from tests.ayudas import DirectorioTemporal, fecha, ids
+
+
+def evento(*recursos, nombre="Triunfo"):
+    return Evento(nombre, fecha(1), fecha(3), list(recursos))
+
+
+class PruebaCompilacion(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        Recurso.inicializar(self.directorio)
+        self.restricciones = Restricciones()
+
+    def test_cierre_transitivo(self):
+        self.restricciones.agregar_co_requisitos("Legión I", "Flota")
+        self.restricciones.agregar_co_requisitos("Flota", "Senado")
+        self.assertEqual(self.restricciones.violaciones(evento("Legión I", "Flota")),
+                         ["El recurso 'Legión I' requiere tambien el recurso 'Senado'",
+                          "El recurso 'Flota' requiere tambien el recurso 'Senado'"])
+        self.assertEqual(self.restricciones.violaciones(evento("Legión I", "Flota", "Senado")), [])
+        # El Senado no requiere nada: las reglas van en un sentido
+        self.assertTrue(self.restricciones.validar(evento("Senado")))
+
+    def test_ciclo_no_se_requiere_a_si_mismo(self):
+        self.restricciones.agregar_co_requisitos("Foro", "Senado")
+        self.restricciones.agregar_co_requisitos("Senado", "Foro")
+        self.assertEqual(self.restricciones.violaciones(evento("Foro", "Senado")), [])
+        with self.assertRaisesRegex(ValueError, "'Foro' requiere tambien el recurso 'Senado'"):
+            self.restricciones.validar(evento("Foro"))
+
+    def test_exclusion_en_ambos_sentidos(self):
+        self.restricciones.agregar_exclusiones("Coliseo", "Flota")
+        self.assertEqual(self.restricciones.violaciones(evento("Flota", "Coliseo")),
+                         ["El recurso 'Flota' no puede usarse junto con 'Coliseo'"])
+        self.assertEqual(self.restricciones.violaciones(evento("Coliseo", "Senado")), [])
+
+    def test_reglas_contradictorias(self):
+        self.restricciones.agregar_co_requisitos("Legión I", "Flota")
+        self.restricciones.agregar_co_requisitos("Flota", "Senado")
+        self.restricciones.agregar_co_requisitos("Legión I", "Foro")
+        # Directa: quien usa la Legión I acabaría necesitando algo que la excluye
+        with self.assertRaisesRegex(ValueError, "'Legión I' requiere 'Senado', que lo excluye"):
+            self.restricciones.agregar_exclusiones("Senado", "Legión I")
+        # Transitiva: la Legión I requiere el Senado y el Foro, que se excluirían
+        with self.assertRaisesRegex(ValueError, "'Legión I' requiere 'Foro' y 'Senado', que se excluyen"):
+            self.restricciones.agregar_exclusiones("Foro", "Senado")
+        # Las reglas rechazadas no quedan ni en la lista ni en las máscaras
+        self.assertEqual(self.restricciones.exclusiones, [])
+        self.assertEqual(len(self.restricciones), 3)
+        self.assertEqual(self.restricciones.violaciones(evento("Legión I", "Flota", "Senado", "Foro")), [])
+
+    def test_validar_todos(self):
+        self.assertEqual(Restricciones().validar_todos([evento("Foro")]), [])
+        self.restricciones.agregar_co_requisitos("Legión II", "Flota")
+        self.restricciones.agregar_exclusiones("Coliseo", "Foro")
+        eventos = [evento("Legión II", nombre="Campaña"), evento(nombre="Censo"),
+                   evento("Coliseo", "Foro", "Legión II", nombre="Juegos"),
+                   evento("Legión II", "Flota", nombre="Desembarco")]
+        self.assertEqual([(violado.nombre, mensaje) for violado, mensaje in self.restricciones.validar_todos(eventos)], [
+            ("Campaña", "El recurso 'Legión II' requiere tambien el recurso 'Flota'"),
+            ("Juegos", "El recurso 'Coliseo' no puede usarse junto con 'Foro'"),
+            ("Juegos", "El recurso 'Legión II' requiere tambien el recurso 'Flota'")
+        ])
+
+    def test_guardar_y_cargar(self):
+        self.restricciones.agregar_co_requisitos("Legión I", "Flota")
+        self.restricciones.agregar_exclusiones("Coliseo", "Foro")
+        self.assertTrue(self.restricciones.guardar(self.directorio))
+        cargadas = Restricciones.cargar(self.directorio)
+        self.assertEqual(cargadas.a_diccionario(), self.restricciones.a_diccionario())
+        self.assertEqual(len(cargadas.violaciones(evento("Legión I", "Coliseo", "Foro"))), 2)
+
+
+class PruebaCalendarioConRestricciones(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        Recurso.inicializar(self.directorio)
+        reglas = Restricciones()
+        reglas.agregar_co_requisitos("Legión I", "Flota")
+        reglas.agregar_exclusiones("Coliseo", "Senado")
+        reglas.guardar(self.directorio)
+        persistencia = Persistencia(self.directorio, diario=True)
+        self.addCleanup(persistencia.cerrar)
+        self.calendario = Calendario(self.directorio, persistencia=persistencia)
+
+    def test_agregar_rechaza_el_evento(self):
+        valido = evento("Legión I", "Flota", nombre="Desembarco")
+        self.calendario.agregar_evento(valido)
+        for invalido in (evento("Legión I", nombre="Campaña"), evento("Coliseo", "Senado", nombre="Juegos")):
+            with self.subTest(evento=invalido.nombre):
+                with self.assertRaises(ValueError):
+                    self.calendario.agregar_evento(invalido)
+                # Nada cambia: ni la lista ni los índices
+                self.assertEqual(ids(self.calendario.eventos), [valido.id])
+                self.assertIsNone(self.calendario.obtener_evento_por_id(invalido.id))
+                self.assertEqual(self.calendario.buscar_por_nombre(invalido.nombre), [])
+                self.assertEqual(ids(self.calendario.buscar_por_fecha(fecha(2))), [valido.id])
+        self.assertEqual(self.calendario.validar_restricciones(), [])
+
+    def test_limpiar_datos_borra_las_reglas(self):
+        self.assertEqual(len(self.calendario.restricciones), 2)
+        self.calendario.limpiar_datos()
+        self.assertFalse(os.path.exists(os.path.join(self.directorio, ARCHIVO_RESTRICCIONES)))
+        self.assertEqual(len(self.calendario.restricciones), 0)
+        self.calendario.agregar_evento(evento("Legión I", nombre="Campaña"))
+        self.assertEqual(self.calendario.total_eventos(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
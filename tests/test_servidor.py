@@ -0,0 +1,182 @@
+# tests/test_servidor.py - Servicio asyncio con escritor único
+import asyncio
+import json
+import threading
+import time
+import unittest
+from modelos.recurso import Recurso
+from nucleo.calendario import Calendario
+from nucleo.persistencia import Persistencia
+from nucleo.servicio import ServicioCalendario
+from servidor import ServidorCalendario
+from tests.ayudas import DirectorioTemporal, fecha
+
+
+async def pedir(conexion, peticion):
+    lector, escritor = conexion
+    escritor.write(json.dumps(peticion).encode('utf-8') + b"\n")
+    await escritor.drain()
+    return json.loads(await lector.readline())
+
+
+async def cerrar(conexion):
+    _, escritor = conexion
+    escritor.close()
+    await escritor.wait_closed()
+
+
+def alta(nombre, dias=0):
+    return {'op': 'agregar', 'evento': {'nombre': nombre, 'inicio': fecha(dias),
+                                        'fin': fecha(dias + 2), 'recursos': ["Senado"]}}
+
+
+class PruebaServidor(unittest.TestCase):
+
+    def setUp(self):
+        directorio = DirectorioTemporal()
+        self.directorio = directorio.__enter__()
+        self.addCleanup(directorio.__exit__)
+        Recurso.inicializar(self.directorio)
+        self.persistencia = Persistencia(self.directorio, diario=True)
+        self.addCleanup(self.persistencia.cerrar)
+        self.servicio = ServicioCalendario(Calendario(self.directorio, persistencia=self.persistencia))
+
+    def _ejecutar(self, escenario):
+        async def con_servidor():
+            servidor = ServidorCalendario(self.servicio, puerto=0)
+            await servidor.iniciar()
+            try:
+                return await escenario(servidor)
+            finally:
+                await servidor.detener()
+        return asyncio.run(con_servidor())
+
+    def test_escrituras_concurrentes_persistidas(self):
+        async def escenario(servidor):
+            async def cliente(numero):
+                conexion = await asyncio.open_connection("127.0.0.1", servidor.puerto)
+                try:
+                    respuestas = [await pedir(conexion, alta(f"Desfile {numero}-{i}", i)) for i in range(5)]
+                    respuestas.append(await pedir(conexion, {'op': 'estadisticas'}))
+                    return respuestas
+                finally:
+                    await cerrar(conexion)
+            return await asyncio.gather(*(cliente(numero) for numero in range(8)))
+
+        respuestas = [respuesta for cliente in self._ejecutar(escenario) for respuesta in cliente]
+        self.assertTrue(all(respuesta['ok'] for respuesta in respuestas))
+        self.persistencia.cerrar()
+        reabierto = Calendario(self.directorio, persistencia=Persistencia(self.directorio, diario=True))
+        self.addCleanup(reabierto.persistencia.cerrar)
+        self.assertEqual(reabierto.total_eventos(), 40)
+
+    def test_id_de_peticion_e_id_de_evento(self):
+        async def escenario(servidor):
+            conexion = await asyncio.open_connection("127.0.0.1", servidor.puerto)
+            try:
+                creados = [await pedir(conexion, dict(alta(nombre), id=i))
+                           for i, nombre in enumerate(["Censo", "Lustro", "Triunfo"])]
+                # El 'id' de la petición no se confunde con el del evento
+                obtenido = await pedir(conexion, {'op': 'obtener', 'nombre': "Lustro", 'id': 7})
+                por_nombre = await pedir(conexion, {'op': 'eliminar', 'nombre': "Censo", 'id': 3})
+                por_id = await pedir(conexion, {'op': 'eliminar', 'id': 4,
+                                                'id_evento': creados[2]['resultado']['id']})
+                restantes = await pedir(conexion, {'op': 'listar'})
+                return creados, obtenido, por_nombre, por_id, restantes
+            finally:
+                await cerrar(conexion)
+
+        creados, obtenido, por_nombre, por_id, restantes = self._ejecutar(escenario)
+        self.assertEqual([respuesta['id'] for respuesta in creados], [0, 1, 2])
+        self.assertEqual((obtenido['id'], obtenido['resultado']['nombre']), (7, "Lustro"))
+        self.assertEqual((por_nombre['id'], por_nombre['resultado']['nombre']), (3, "Censo"))
+        self.assertEqual((por_id['id'], por_id['resultado']['nombre']), (4, "Triunfo"))
+        self.assertEqual([evento['nombre'] for evento in restantes['resultado']['eventos']], ["Lustro"])
+
+    def test_lecturas_simultaneas(self):
+        leer = self.servicio.leer
+        # Las tres lecturas solo pasan si están dentro del servicio a la vez
+        barrera = threading.Barrier(3, timeout=5)
+
+        def leer_juntas(peticion):
+            barrera.wait()
+            return leer(peticion)
+
+        self.servicio.leer = leer_juntas
+
+        async def escenario(servidor):
+            conexiones = [await asyncio.open_connection("127.0.0.1", servidor.puerto) for _ in range(3)]
+            try:
+                return await asyncio.gather(*(pedir(conexion, {'op': 'estadisticas'})
+                                              for conexion in conexiones))
+            finally:
+                for conexion in conexiones:
+                    await cerrar(conexion)
+
+        respuestas = self._ejecutar(escenario)
+        self.assertTrue(all(respuesta['ok'] for respuesta in respuestas), respuestas)
+
+    def test_lectura_espera_al_lote_en_curso(self):
+        escribir_lote = self.servicio.escribir_lote
+        en_curso = threading.Event()
+
+        def escribir_lento(peticiones):
+            en_curso.set()
+            time.sleep(0.3)
+            return escribir_lote(peticiones)
+
+        self.servicio.escribir_lote = escribir_lento
+
+        async def escenario(servidor):
+            escritora = await asyncio.open_connection("127.0.0.1", servidor.puerto)
+            lectora = await asyncio.open_connection("127.0.0.1", servidor.puerto)
+            try:
+                escritura = asyncio.ensure_future(pedir(escritora, alta("Triunfo")))
+                while not en_curso.is_set():
+                    await asyncio.sleep(0.01)
+                # Llega a mitad del lote: se atiende después y ya ve el evento
+                lectura = await pedir(lectora, {'op': 'obtener', 'nombre': "Triunfo"})
+                return await escritura, lectura
+            finally:
+                await cerrar(escritora)
+                await cerrar(lectora)
+
+        escritura, lectura = self._ejecutar(escenario)
+        self.assertTrue(escritura['ok'])
+        self.assertEqual(lectura['resultado'], escritura['resultado'])
+
+    def test_lote_lento_no_bloquea_el_bucle(self):
+        escribir_lote = self.servicio.escribir_lote
+        hilos = []
+
+        def escribir_lento(peticiones):
+            hilos.append(threading.current_thread())
+            time.sleep(0.5)
+            return escribir_lote(peticiones)
+
+        self.servicio.escribir_lote = escribir_lento
+
+        async def escenario(servidor):
+            conexion = await asyncio.open_connection("127.0.0.1", servidor.puerto)
+            try:
+                escritura = asyncio.ensure_future(pedir(conexion, alta("Triunfo")))
+                while not hilos:
+                    await asyncio.sleep(0.01)
+                # Con el lote en curso, el bucle sigue atendiendo otras tareas y conexiones
+                comienzo = time.perf_counter()
+                otra = await asyncio.open_connection("127.0.0.1", servidor.puerto)
+                await asyncio.sleep(0.01)
+                espera = time.perf_counter() - comienzo
+                await cerrar(otra)
+                return espera, await escritura
+            finally:
+                await cerrar(conexion)
+
+        espera, respuesta = self._ejecutar(escenario)
+        self.assertTrue(respuesta['ok'])
+        self.assertLess(espera, 0.25)
+        self.assertIsNot(hilos[0], threading.main_thread())
+
+
+if __name__ == '__main__':
+    unittest.main()